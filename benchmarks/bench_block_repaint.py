@@ -0,0 +1,121 @@
+"""Micro-benchmark: repainting a scene of blocks, old paint path vs current.
+
+Usage: python benchmarks/bench_block_repaint.py [blocks] [repeats]
+
+The old CodeBlock created four resize handles and four connection points
+per block up front and called setVisible on all of them from paint. The
+current block creates them only while needed and paint has no side
+effects. Both scenes are rendered offscreen into the same image.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QGraphicsScene, QGraphicsRectItem
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPainter, QColor
+
+from graphics.code_block import CodeBlock, ResizeHandle
+from graphics.connection_point import ConnectionPoint
+
+
+STYLE = {'color': (None, None, None), 'border': (None, None, None, None),
+         'alpha': None, 'dashed': None}
+
+COLUMNS = 40
+SELECTED = 5
+
+
+class SceneManager:
+    """The DirectoryTab attributes blocks look at"""
+    show_connections = False
+    active_connection_point = None
+
+    def mark_connections_dirty(self, block):
+        pass
+
+
+class EagerCodeBlock(CodeBlock):
+    """CodeBlock as it was: every child item up front, visibility set in paint"""
+
+    def update_decorations(self):
+        if not self.resize_handles:
+            self.create_resize_handles()
+            for handle in self.resize_handles.values():
+                handle.setVisible(False)
+        if self.scene_manager and not self.connection_points:
+            self.create_connection_points()
+            for point in self.connection_points.values():
+                point.setVisible(False)
+
+    def paint(self, painter, option, widget=None):
+        QGraphicsRectItem.paint(self, painter, option, widget)
+
+        is_selected = self.isSelected()
+        for handle in self.resize_handles.values():
+            handle.setVisible(is_selected)
+
+        show_all = self.scene_manager.show_connections
+        for point in self.connection_points.values():
+            point.setVisible(True if show_all else is_selected)
+
+
+def build_scene(block_class, count):
+    scene = QGraphicsScene()
+    manager = SceneManager()
+    for i in range(count):
+        x = (i % COLUMNS) * 170
+        y = (i // COLUMNS) * 80
+        block = block_class(f"b{i}", 'FUNCTION', f"function_{i}", x, y, 150, 60,
+                            STYLE, scene_manager=manager)
+        scene.addItem(block)
+        if i < SELECTED:
+            block.setSelected(True)
+    return scene
+
+
+def child_items(scene):
+    return sum(1 for item in scene.items() if isinstance(item, (ResizeHandle, ConnectionPoint)))
+
+
+def best_of(scene, image, repeats):
+    app = QApplication.instance()
+    rect = scene.itemsBoundingRect()
+    best = float('inf')
+    for _ in range(repeats):
+        image.fill(QColor(255, 255, 255))
+        painter = QPainter(image)
+        start = time.perf_counter()
+        scene.render(painter, QRectF(image.rect()), rect)
+        painter.end()
+        app.processEvents()  # Deliver the updates paint scheduled, as a view would
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    _app = QApplication(sys.argv[:1])  # Must stay alive while painting
+    image = QImage(2400, 1600, QImage.Format_ARGB32_Premultiplied)
+
+    old_scene = build_scene(EagerCodeBlock, count)
+    new_scene = build_scene(CodeBlock, count)
+
+    old = best_of(old_scene, image, repeats)
+    new = best_of(new_scene, image, repeats)
+
+    print(f"{count} blocks, {SELECTED} selected (best of {repeats})")
+    print(f"eager children, setVisible in paint : {old * 1000:8.1f} ms  "
+          f"({child_items(old_scene)} handle/point items)")
+    print(f"lazy children, side-effect-free paint: {new * 1000:8.1f} ms  "
+          f"({child_items(new_scene)} handle/point items)")
+    print(f"speedup                              : {old / new:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Micro-benchmark: single-pass SymbolExtractor vs the old double ast.walk.
+
+Usage: python benchmarks/bench_symbol_extraction.py [directory] [repeats]
+
+Parses every .py file under the directory once (default: the standard
+library), then times only the extraction step of both approaches.
+"""
+import os
+import sys
+import ast
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.symbol_extractor import extract_file_symbols, SNIPPET_LINES
+
+
+def double_walk(tree, lines):
+    """The previous extraction: one ast.walk for definitions, one for imports"""
+    definitions = []
+    imports = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            kind = 'class' if isinstance(node, ast.ClassDef) else 'function'
+            start_line = node.lineno - 1
+            end_line = min(start_line + SNIPPET_LINES, len(lines))
+            definitions.append((node.name, kind, node.lineno, '\n'.join(lines[start_line:end_line])))
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            code = lines[node.lineno - 1] if node.lineno <= len(lines) else ''
+            for alias in node.names:
+                if isinstance(node, ast.ImportFrom):
+                    imports.append((node.module, alias.name, alias.asname or alias.name, node.lineno, code))
+                else:
+                    imports.append((alias.name, None, alias.asname or alias.name, node.lineno, code))
+
+    return definitions, imports
+
+
+def load_trees(directory):
+    trees = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != '__pycache__']
+        for filename in filenames:
+            if not filename.endswith('.py'):
+                continue
+            try:
+                with open(os.path.join(dirpath, filename), 'r', encoding='utf-8') as f:
+                    source = f.read()
+                trees.append((ast.parse(source), source.split('\n')))
+            except (SyntaxError, UnicodeDecodeError, ValueError, OSError):
+                continue
+    return trees
+
+
+def check_same_results(trees):
+    for tree, lines in trees:
+        old_defs, old_imports = double_walk(tree, lines)
+        new = extract_file_symbols(tree, lines)
+        assert sorted((d[0], d[1], d[2]) for d in old_defs) == \
+            sorted((d.name, d.kind, d.line) for d in new.definitions)
+        assert sorted((i[0] or '', i[1] or '', i[3]) for i in old_imports) == \
+            sorted((i.module or '', i.name or '', i.line) for i in new.imports)
+
+
+def best_of(func, trees, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for tree, lines in trees:
+            func(tree, lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.__file__)
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    trees = load_trees(directory)
+    check_same_results(trees)
+
+    old = best_of(double_walk, trees, repeats)
+    new = best_of(extract_file_symbols, trees, repeats)
+
+    print(f"{len(trees)} files from {directory} (best of {repeats})")
+    print(f"double ast.walk   : {old * 1000:8.1f} ms")
+    print(f"SymbolExtractor   : {new * 1000:8.1f} ms  (also collects qualnames, docstrings, spans)")
+    print(f"speedup           : {old / new:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -43,24 +43,17 @@ class AddBlockCommand(QUndoCommand):
                 self.tab.blocks.remove(self.block)
             
             # Remove all connected connections
-            connections_to_remove = [
-                conn for conn in self.tab.connections 
-                if conn.from_block == self.block or conn.to_block == self.block
-            ]
+            connections_to_remove = self.tab.connections_for(self.block)
             
             for conn in connections_to_remove:
-                if conn.arrow_end and conn.arrow_end.scene():
-                    self.tab.scene.removeItem(conn.arrow_end)
-                if conn.arrow_start and conn.arrow_start.scene():
-                    self.tab.scene.removeItem(conn.arrow_start)
                 if conn.scene():
                     self.tab.scene.removeItem(conn)
-                if conn in self.tab.connections:
-                    self.tab.connections.remove(conn)
+                self.tab.detach_connection(conn)
             
             # Remove from scene
             if self.block.scene():
                 self.tab.scene.removeItem(self.block)
+            self.tab.block_removed(self.block)
             
             # Remove directory data for SUBDIRECTORY or CLASS blocks
             if self.block.block_type in ['SUBDIRECTORY', 'CLASS']:
@@ -71,6 +64,96 @@ class AddBlockCommand(QUndoCommand):
 
 
 
+class BulkAddBlocksCommand(QUndoCommand):
+    """Command to add many blocks as a single undo step.
+    
+    Scene signals and subdirectory list refreshes are held back until every
+    block is in, so inserting hundreds of blocks costs one refresh.
+    nested_blocks maps a child directory path (e.g. a class level) to block
+    data that goes inside it.
+    """
+    
+    def __init__(self, tab, blocks_data, main_window, nested_blocks=None, description="Add Blocks"):
+        super().__init__(description)
+        self.tab = tab
+        self.blocks_data = blocks_data
+        self.main_window = main_window
+        self.nested_blocks = nested_blocks or {}
+        self.blocks = []
+        self.created_dirs = []
+    
+    def redo(self):
+        """Add every block"""
+        self.main_window.suppress_subdirectory_refresh += 1
+        self.tab.scene.blockSignals(True)
+        try:
+            self.blocks = [self.tab.add_block(block_data) for block_data in self.blocks_data]
+            
+            for block in self.blocks:
+                self.main_window.connect_block_handlers(block)
+            
+            self.created_dirs = []
+            for block in self.blocks:
+                if block.block_type in ['SUBDIRECTORY', 'CLASS']:
+                    subdir_path = f"{self.tab.directory_path}/{block.name}"
+                    if subdir_path not in self.main_window.directory_data:
+                        self.main_window.directory_data[subdir_path] = {'blocks': [], 'connections': []}
+                        self.created_dirs.append(subdir_path)
+            
+            for dir_path, blocks_data in self.nested_blocks.items():
+                nested_tab = self.main_window.directory_tabs.get(dir_path)
+                if nested_tab is not None:
+                    for block_data in blocks_data:
+                        self.main_window.connect_block_handlers(nested_tab.add_block(block_data))
+                else:
+                    data = self.main_window.directory_data.setdefault(dir_path, {'blocks': [], 'connections': []})
+                    data['blocks'].extend(blocks_data)
+        finally:
+            self.tab.scene.blockSignals(False)
+            self.main_window.suppress_subdirectory_refresh -= 1
+        
+        # sceneRectChanged was blocked along with the per-block signals
+        self.tab.scene_rect_changed()
+        self.tab.scene.update()
+        self.main_window.refresh_subdirectories()
+    
+    def undo(self):
+        """Remove every block added by redo"""
+        self.main_window.suppress_subdirectory_refresh += 1
+        self.tab.scene.blockSignals(True)
+        try:
+            added = set(self.blocks)
+            self.tab.blocks[:] = [block for block in self.tab.blocks if block not in added]
+            
+            for block in self.blocks:
+                if block.scene():
+                    self.tab.scene.removeItem(block)
+                self.tab.block_removed(block)
+            self.blocks = []
+            
+            for dir_path, blocks_data in self.nested_blocks.items():
+                ids = {block_data['id'] for block_data in blocks_data}
+                nested_tab = self.main_window.directory_tabs.get(dir_path)
+                if nested_tab is not None:
+                    for block_id in ids:
+                        nested_tab.discard_block(block_id)
+                elif dir_path in self.main_window.directory_data:
+                    data = self.main_window.directory_data[dir_path]
+                    data['blocks'] = [b for b in data['blocks'] if b['id'] not in ids]
+            
+            for dir_path in self.created_dirs:
+                self.main_window.directory_data.pop(dir_path, None)
+        finally:
+            self.tab.scene.blockSignals(False)
+            self.main_window.suppress_subdirectory_refresh -= 1
+        
+        # sceneRectChanged was blocked along with the per-block signals
+        self.tab.scene_rect_changed()
+        self.tab.scene.update()
+        self.main_window.refresh_subdirectories()
+
+
+
 class DeleteBlockCommand(QUndoCommand):
     """Command to delete a block"""
     
@@ -83,18 +166,20 @@ class DeleteBlockCommand(QUndoCommand):
         
         # Store connections that will be deleted
         self.deleted_connections = []
-        for conn in tab.connections:
-            if conn.from_block == block or conn.to_block == block:
-                self.deleted_connections.append({
-                    'connection': conn,
-                    'from_block': conn.from_block,
-                    'to_block': conn.to_block,
-                    'from_side': conn.from_side,
-                    'to_side': conn.to_side,
-                    'flow_type': conn.flow_type,
-                    'line_style': conn.line_style,
-                    'line_color': QColor(conn.line_color)
-                })
+        for conn in tab.connections_for(block):
+            self.deleted_connections.append({
+                'connection': conn,
+                'from_block': conn.from_block,
+                'to_block': conn.to_block,
+                'from_side': conn.from_side,
+                'to_side': conn.to_side,
+                'flow_type': conn.flow_type,
+                'line_style': conn.line_style,
+                'line_color': QColor(conn.line_color)
+            })
+        
+        # Connections to blocks outside the view of a virtualized tab
+        self.dormant_connections = []
     
     def redo(self):
         """Delete the block"""
@@ -105,18 +190,16 @@ class DeleteBlockCommand(QUndoCommand):
         # Remove all connected connections
         for conn_data in self.deleted_connections:
             conn = conn_data['connection']
-            if conn.arrow_end and conn.arrow_end.scene():
-                self.tab.scene.removeItem(conn.arrow_end)
-            if conn.arrow_start and conn.arrow_start.scene():
-                self.tab.scene.removeItem(conn.arrow_start)
             if conn.scene():
                 self.tab.scene.removeItem(conn)
-            if conn in self.tab.connections:
-                self.tab.connections.remove(conn)
+            self.tab.detach_connection(conn)
         
         # Remove from scene
         if self.block.scene():
             self.tab.scene.removeItem(self.block)
+        # block_removed drops the dormant connections, so keep them for undo
+        self.dormant_connections = self.tab.dormant_connection_data(self.block.block_id)
+        self.tab.block_removed(self.block)
         
         # Remove directory data for SUBDIRECTORY or CLASS blocks
         if self.block.block_type in ['SUBDIRECTORY', 'CLASS']:
@@ -130,6 +213,7 @@ class DeleteBlockCommand(QUndoCommand):
     def undo(self):
         """Restore the block"""
         # Re-add block
+        deleted_block = self.block
         self.block = self.tab.add_block(self.block_data)
         
         # Set up double-click handler
@@ -145,6 +229,11 @@ class DeleteBlockCommand(QUndoCommand):
 
         # Restore connections
         for conn_data in self.deleted_connections:
+            # Reattach to the re-added block, not the deleted instance
+            for end in ('from_block', 'to_block'):
+                if conn_data[end] is deleted_block:
+                    conn_data[end] = self.block
+            
             conn = Connection(
                 conn_data['from_block'],
                 conn_data['to_block'],
@@ -156,9 +245,11 @@ class DeleteBlockCommand(QUndoCommand):
             )
             self.tab.scene.addItem(conn)
             conn.update_path()
-            self.tab.connections.append(conn)
+            self.tab.attach_connection(conn)
             conn_data['connection'] = conn
         
+        self.tab.restore_dormant_connections(self.block.block_id, self.dormant_connections)
+        
         # Update subdirectory and classes list
         if self.block.block_type in ['SUBDIRECTORY', 'CLASS']:
             self.main_window.refresh_subdirectories()
@@ -191,17 +282,12 @@ class AddConnectionCommand(QUndoCommand):
         )
         self.tab.scene.addItem(self.connection)
         self.connection.update_path()
-        self.tab.connections.append(self.connection)
+        self.tab.attach_connection(self.connection)
     
     def undo(self):
         """Remove the connection"""
         if self.connection:
-            if self.connection.arrow_end and self.connection.arrow_end.scene():
-                self.tab.scene.removeItem(self.connection.arrow_end)
-            if self.connection.arrow_start and self.connection.arrow_start.scene():
-                self.tab.scene.removeItem(self.connection.arrow_start)
-            if self.connection in self.tab.connections:
-                self.tab.connections.remove(self.connection)
+            self.tab.detach_connection(self.connection)
             if self.connection.scene():
                 self.tab.scene.removeItem(self.connection)
 
@@ -223,12 +309,7 @@ class DeleteConnectionCommand(QUndoCommand):
     
     def redo(self):
         """Delete the connection"""
-        if self.connection.arrow_end and self.connection.arrow_end.scene():
-            self.tab.scene.removeItem(self.connection.arrow_end)
-        if self.connection.arrow_start and self.connection.arrow_start.scene():
-            self.tab.scene.removeItem(self.connection.arrow_start)
-        if self.connection in self.tab.connections:
-            self.tab.connections.remove(self.connection)
+        self.tab.detach_connection(self.connection)
         if self.connection.scene():
             self.tab.scene.removeItem(self.connection)
     
@@ -245,7 +326,7 @@ class DeleteConnectionCommand(QUndoCommand):
         )
         self.tab.scene.addItem(self.connection)
         self.connection.update_path()
-        self.tab.connections.append(self.connection)
+        self.tab.attach_connection(self.connection)
 
 
 class MoveBlockCommand(QUndoCommand):
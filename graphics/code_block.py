@@ -1,18 +1,14 @@
 import os
+import time
 from PyQt5.QtWidgets import (QGraphicsItem, QGraphicsRectItem,
-                             QGraphicsTextItem, QInputDialog, QLineEdit,
+                             QInputDialog, QLineEdit,
                              QGraphicsEllipseItem)
 from PyQt5.QtCore import Qt, QRectF, QPointF
 from PyQt5.QtGui import QPen, QBrush, QColor, QFont
-from PyQt5.QtGui import QPixmap
 
-
-
-from graphics.connection import Connection
 from graphics.connection_point import ConnectionPoint
-
-from PyQt5.QtSvg import QSvgRenderer
-from PyQt5.QtGui import QPainter
+from graphics.lod import lod_settings, LodTextItem, LodPixmapItem, LOD_MINIMAL
+from graphics.image_cache import image_cache
 
 
 class ResizeHandle(QGraphicsEllipseItem):
@@ -163,11 +159,15 @@ class CodeBlock(QGraphicsRectItem):
 
         self.block_color = None
         self.block_border_color = None
+
+        # GROUP members cached for the length of one mouse drag
+        self.is_dragging = False
+        self.drag_members = None
         
         self.style = {}
         
         if block_type == 'GROUP':
-            self.setZValue(-2)  # Behind directory boundary (-1)
+            self.setZValue(-2)  # Behind connections (-1) and blocks
 
         if 'alias' in self.metadata:
             self.display_name = self.metadata['alias']
@@ -187,7 +187,7 @@ class CodeBlock(QGraphicsRectItem):
         if block_type == 'IMAGE':
             self.create_image_display()
         else:
-            self.text_item = QGraphicsTextItem(self.display_name, self)
+            self.text_item = LodTextItem(self.display_name, self)
             self.text_item.setDefaultTextColor(Qt.black)
             
             # Bold for subdirectories and classes
@@ -197,13 +197,10 @@ class CodeBlock(QGraphicsRectItem):
             
             self.center_text()
         
+        # Handles and connection points are only created while needed
         self.connection_points = {}
-        if scene_manager:
-            self.create_connection_points()
-        
-        # Create resize handles
         self.resize_handles = {}
-        self.create_resize_handles()
+        self.update_decorations()
     
     def set_exists(self, exists):
         """Set whether this block exists in filesystem and update style"""
@@ -228,13 +225,48 @@ class CodeBlock(QGraphicsRectItem):
         else:
             self.style['dashed'] = style['dashed']
 
+    def update_decorations(self):
+        """Create or release resize handles and connection points as needed.
+
+        Handles exist only while the block is selected. Connection points
+        exist while it is selected, while Show Connections is on, or while
+        one of them is the start of a pending connection.
+        """
+        is_selected = self.isSelected()
+
+        if is_selected and not self.resize_handles:
+            self.create_resize_handles()
+        elif not is_selected and self.resize_handles:
+            self.release_child_items(self.resize_handles)
+
+        if self.scene_manager is None:
+            return
+
+        active_point = getattr(self.scene_manager, 'active_connection_point', None)
+        wanted = (is_selected
+                  or getattr(self.scene_manager, 'show_connections', False)
+                  or (active_point is not None and active_point.parent_block is self))
+
+        if wanted and not self.connection_points:
+            self.create_connection_points()
+        elif not wanted and self.connection_points:
+            self.release_child_items(self.connection_points)
+
+    def release_child_items(self, items):
+        """Remove the given child items (a dict) from the block and scene"""
+        scene = self.scene()
+        for item in items.values():
+            item.setParentItem(None)
+            if scene:
+                scene.removeItem(item)
+        items.clear()
+
     def create_resize_handles(self):
         """Create resize handles at corners"""
         positions = ['top-left', 'top-right', 'bottom-left', 'bottom-right']
         for pos in positions:
             handle = ResizeHandle(self, pos)
             self.resize_handles[pos] = handle
-            handle.setVisible(False)  # Hidden by default
     
     def update_resize_handles(self):
         """Update resize handle positions"""
@@ -242,31 +274,28 @@ class CodeBlock(QGraphicsRectItem):
             handle.update_position()
     
     def paint(self, painter, option, widget=None):
-        """Custom paint to show/hide resize handles and connection points based on selection"""
-        super().paint(painter, option, widget)
-        
-        is_selected = self.isSelected()
-        
-        # Show/hide resize handles
-        for handle in self.resize_handles.values():
-            handle.setVisible(is_selected)
-        
-        # Show/hide connection points
-        if self.scene_manager:  # scene_manager is the DirectoryTab
-            show_all = getattr(self.scene_manager, 'show_connections', False)
-            
-            for point in self.connection_points.values():
-                # Always show red/waiting points
-                if show_all:
-                    point.setVisible(True)  # Show all when toggle is on
-                else:
-                    point.setVisible(is_selected)  # Show only when selected
+        """Draw the block at the current level of detail.
+
+        Paint has no side effects: handles and connection points are shown
+        through update_decorations when selection or the toggle changes.
+        """
+        start = time.perf_counter_ns()
+        level = lod_settings.level_for(painter)
+        
+        if level == LOD_MINIMAL:
+            # Zoomed far out: a plain filled rect is all that can be seen
+            painter.setPen(Qt.NoPen)
+            if self.block_type == 'IMAGE':
+                painter.setBrush(QColor(200, 200, 200, 120))
+            else:
+                painter.setBrush(self.brush())
+            painter.drawRect(self.rect())
         else:
-            # Fallback if no scene_manager
-            for point in self.connection_points.values():
-                point.setVisible(is_selected)
-
+            super().paint(painter, option, widget)
         
+        lod_settings.record(level, start)
+
+
     def on_resize(self):
         """Called when block is resized"""
         self.center_text()
@@ -275,18 +304,20 @@ class CodeBlock(QGraphicsRectItem):
         if self.block_type == 'IMAGE':
             self.load_and_scale_image()
         # Update connections
-        if self.scene():
-            for item in self.scene().items():
-                if isinstance(item, Connection):
-                    if item.from_block == self or item.to_block == self:
-                        item.update_path()
+        self.update_connections()
+    
+    def update_connections(self):
+        """Queue the connections attached to this block for re-routing"""
+        if self.scene_manager is None or not self.scene():
+            return
+        self.scene_manager.mark_connections_dirty(self)
+        self.scene_manager.grow_scene_rect(self.sceneBoundingRect())
     
     def create_connection_points(self):
         """Create connection points on all four sides"""
         for side in ['top', 'bottom', 'left', 'right']:
             point = ConnectionPoint(self, side, self.scene_manager)
             self.connection_points[side] = point
-            point.setVisible(False)  # Hide by default
 
     def update_connection_points(self):
         """Update connection point positions after resize"""
@@ -361,19 +392,19 @@ class CodeBlock(QGraphicsRectItem):
         if self.block_type != 'GROUP' or not self.scene():
             return
         
+        # The scene's spatial index returns only items fully inside the rect
         group_rect = self.sceneBoundingRect()
         
-        for item in self.scene().items():
+        for item in self.scene().items(group_rect, Qt.ContainsItemBoundingRect):
             if isinstance(item, CodeBlock) and item != self:
-                item_rect = item.sceneBoundingRect()
-                # Check if item is fully contained
-                if group_rect.contains(item_rect):
-                    item.setSelected(True)
+                item.setSelected(True)
 
 
     def itemChange(self, change, value):
         """Handle item changes"""
         if change == QGraphicsItem.ItemSelectedHasChanged:
+            self.update_decorations()
+            self.drag_members = None
             if value and self.block_type == 'GROUP':  # GROUP was selected
                 self.select_contained_items()
         
@@ -388,11 +419,7 @@ class CodeBlock(QGraphicsRectItem):
                 self.move_contained_items(delta)
         
         if change == QGraphicsItem.ItemPositionHasChanged:
-            if self.scene():
-                for item in self.scene().items():
-                    if isinstance(item, Connection):
-                        if item.from_block == self or item.to_block == self:
-                            item.update_path()
+            self.update_connections()
         
         return super().itemChange(change, value)
 
@@ -401,14 +428,45 @@ class CodeBlock(QGraphicsRectItem):
         if not self.scene():
             return
         
+        # Members move with the group, so during a drag they are looked up once
+        members = self.drag_members
+        if members is None:
+            members = self.contained_blocks()
+            if self.is_dragging:
+                self.drag_members = members
+        
+        for item in members:
+            if item.isSelected() and item.scene() is self.scene():
+                item.moveBy(delta.x(), delta.y())
+
+    def contained_blocks(self):
+        """Blocks whose center lies inside this GROUP, via the scene's spatial index"""
         group_rect = self.sceneBoundingRect()
         
-        for item in self.scene().items():
-            if isinstance(item, CodeBlock) and item != self and item.isSelected():
-                # Check if item is contained
-                item_center = item.sceneBoundingRect().center()
-                if group_rect.contains(item_center):
-                    item.moveBy(delta.x(), delta.y())
+        members = []
+        for item in self.scene().items(group_rect, Qt.IntersectsItemBoundingRect):
+            if isinstance(item, CodeBlock) and item != self:
+                if group_rect.contains(item.sceneBoundingRect().center()):
+                    members.append(item)
+        return members
+
+    def mousePressEvent(self, event):
+        """Start a drag; GROUP membership is cached until release"""
+        if event.button() == Qt.LeftButton:
+            self.is_dragging = True
+            self.drag_members = None
+            if self.scene_manager is not None:
+                self.scene_manager.begin_block_drag()
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        """End a drag and drop the cached GROUP membership"""
+        if event.button() == Qt.LeftButton:
+            self.is_dragging = False
+            self.drag_members = None
+            if self.scene_manager is not None:
+                self.scene_manager.end_block_drag()
+        super().mouseReleaseEvent(event)
 
     
     def keyPressEvent(self, event):
@@ -482,11 +540,9 @@ class CodeBlock(QGraphicsRectItem):
 
     def create_image_display(self):
         """Create and display image for IMAGE block type"""
-        from PyQt5.QtWidgets import QGraphicsPixmapItem
-
         # Create pixmap item for the image
         if self.image_path and os.path.exists(self.image_path):
-            self.image_item = QGraphicsPixmapItem(self)
+            self.image_item = LodPixmapItem(self)
             self.load_and_scale_image()
         else:
             # Show placeholder if no image
@@ -507,49 +563,10 @@ class CodeBlock(QGraphicsRectItem):
         else:
             dpr = 1.0
         
-        if self.image_path.lower().endswith('.svg'):
-            # SVG: Render at physical pixel size for sharpness
-            renderer = QSvgRenderer(self.image_path)
-            
-            # Get SVG aspect ratio
-            svg_size = renderer.defaultSize()
-            aspect_ratio = svg_size.width() / svg_size.height() if svg_size.height() > 0 else 1.0
-            
-            # Calculate display size maintaining aspect ratio
-            if available_width / available_height > aspect_ratio:
-                display_height = available_height
-                display_width = available_height * aspect_ratio
-            else:
-                display_width = available_width
-                display_height = available_width / aspect_ratio
-            
-            # Create pixmap at physical pixel dimensions
-            pixmap = QPixmap(int(display_width * dpr), int(display_height * dpr))
-            pixmap.fill(Qt.transparent)
-            pixmap.setDevicePixelRatio(dpr)
-            
-            # Render SVG to pixmap with antialiasing
-            painter = QPainter(pixmap)
-            painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
-            renderer.render(painter)
-            painter.end()
-        else:
-            # Raster image: Load and scale with DPR
-            pixmap = QPixmap(self.image_path)
-            
-            if pixmap.isNull():
-                print(f"Failed to load image: {self.image_path}")
-                return
-            
-            # Scale to physical pixels
-            scaled_pixmap = pixmap.scaled(
-                int(available_width * dpr),
-                int(available_height * dpr),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
-            scaled_pixmap.setDevicePixelRatio(dpr)
-            pixmap = scaled_pixmap
+        # Shared across blocks, so repeated icons are only rendered once per size
+        pixmap = image_cache.pixmap(self.image_path, available_width, available_height, dpr)
+        if pixmap is None:
+            return
         
         if self.image_item:
             self.image_item.setPixmap(pixmap)
@@ -570,7 +587,6 @@ class CodeBlock(QGraphicsRectItem):
         self.metadata['image_path'] = path
         
         if not self.image_item:
-            from PyQt5.QtWidgets import QGraphicsPixmapItem
-            self.image_item = QGraphicsPixmapItem(self)
+            self.image_item = LodPixmapItem(self)
         
         self.load_and_scale_image()
\ No newline at end of file
@@ -1,12 +1,15 @@
-from PyQt5.QtWidgets import (QGraphicsItem,QGraphicsPathItem,QGraphicsPolygonItem)
+from PyQt5.QtWidgets import (QGraphicsItem,QGraphicsPathItem)
 from PyQt5.QtCore import Qt, QPointF
 from PyQt5.QtGui import QPen, QBrush, QColor, QPainterPath, QPolygonF
 import math
+import time
+
+from graphics.lod import lod_settings, LOD_FULL, LOD_MINIMAL
 
 
 
 class Connection(QGraphicsPathItem):
-    """Connection between blocks with bezier curve and arrows"""
+    """Connection between blocks with a bezier curve or orthogonal route, and arrows"""
     
     def __init__(self, from_block, to_block, from_side='right', to_side='left', 
                  flow_type='one_way', line_style='solid', line_color=None):
@@ -22,8 +25,8 @@ class Connection(QGraphicsPathItem):
         
         self.arrow_size = 15
         
-        self.arrow_end = None
-        self.arrow_start = None
+        # Arrow heads are painted by this item, not separate scene items
+        self.arrow_polygons = []
         
         self.update_style()
         
@@ -67,71 +70,75 @@ class Connection(QGraphicsPathItem):
         return rect.center()
     
     def update_path(self):
-        """Update the bezier curve path with arrows"""
+        """Update the path (bezier curve or orthogonal route) with arrows"""
         start = self.get_connection_point(self.from_block, self.from_side)
         end = self.get_connection_point(self.to_block, self.to_side)
         
         path = QPainterPath()
         path.moveTo(start)
         
-        distance = abs(end.x() - start.x()) + abs(end.y() - start.y())
-        offset = min(distance / 3, 100)
-        
-        if self.from_side == 'right':
-            cp1 = QPointF(start.x() + offset, start.y())
-        elif self.from_side == 'left':
-            cp1 = QPointF(start.x() - offset, start.y())
-        elif self.from_side == 'top':
-            cp1 = QPointF(start.x(), start.y() - offset)
-        elif self.from_side == 'bottom':
-            cp1 = QPointF(start.x(), start.y() + offset)
-        else:
-            cp1 = start
-        
-        if self.to_side == 'left':
-            cp2 = QPointF(end.x() - offset, end.y())
-        elif self.to_side == 'right':
-            cp2 = QPointF(end.x() + offset, end.y())
-        elif self.to_side == 'top':
-            cp2 = QPointF(end.x(), end.y() - offset)
-        elif self.to_side == 'bottom':
-            cp2 = QPointF(end.x(), end.y() + offset)
+        points = self.routed_points(start, end)
+        if points:
+            for x, y in points[1:]:
+                path.lineTo(x, y)
+            # Arrow heads follow the first and last segments
+            cp1 = QPointF(*points[1])
+            cp2 = QPointF(*points[-2])
         else:
-            cp2 = end
-        
-        path.cubicTo(cp1, cp2, end)
-        
-        self.setPath(path)
+            distance = abs(end.x() - start.x()) + abs(end.y() - start.y())
+            offset = min(distance / 3, 100)
+            
+            if self.from_side == 'right':
+                cp1 = QPointF(start.x() + offset, start.y())
+            elif self.from_side == 'left':
+                cp1 = QPointF(start.x() - offset, start.y())
+            elif self.from_side == 'top':
+                cp1 = QPointF(start.x(), start.y() - offset)
+            elif self.from_side == 'bottom':
+                cp1 = QPointF(start.x(), start.y() + offset)
+            else:
+                cp1 = start
+            
+            if self.to_side == 'left':
+                cp2 = QPointF(end.x() - offset, end.y())
+            elif self.to_side == 'right':
+                cp2 = QPointF(end.x() + offset, end.y())
+            elif self.to_side == 'top':
+                cp2 = QPointF(end.x(), end.y() - offset)
+            elif self.to_side == 'bottom':
+                cp2 = QPointF(end.x(), end.y() + offset)
+            else:
+                cp2 = end
+            
+            path.cubicTo(cp1, cp2, end)
+        
+        # Arrows are part of boundingRect(), so announce the change first
+        self.prepareGeometryChange()
         
-        # Clean up old arrows
-        if self.arrow_end:
-            if self.arrow_end.scene():
-                self.scene().removeItem(self.arrow_end)
-            self.arrow_end = None
-        
-        if self.arrow_start:
-            if self.arrow_start.scene():
-                self.scene().removeItem(self.arrow_start)
-            self.arrow_start = None
-        
-        # Create new arrows
         if self.flow_type == 'one_way':
-            self.arrow_end = self.create_arrow_head(end, cp2)
-            # Add to scene immediately if available
-            if self.scene():
-                self.scene().addItem(self.arrow_end)
-        
+            self.arrow_polygons = [self.create_arrow_head(end, cp2)]
         elif self.flow_type == 'bidirectional':
-            self.arrow_end = self.create_arrow_head(end, cp2)
-            self.arrow_start = self.create_arrow_head(start, cp1, reverse=True)
-            # Add to scene immediately if available
-            if self.scene():
-                self.scene().addItem(self.arrow_end)
-                self.scene().addItem(self.arrow_start)
+            self.arrow_polygons = [
+                self.create_arrow_head(end, cp2),
+                self.create_arrow_head(start, cp1, reverse=True)
+            ]
+        else:
+            self.arrow_polygons = []
+        
+        self.setPath(path)
+    
+    def routed_points(self, start, end):
+        """Orthogonal route from the tab's edge router, or None to draw a curve"""
+        tab = self.from_block.scene_manager
+        if tab is None or getattr(tab, 'routing_mode', 'curved') != 'orthogonal':
+            return None
+        return tab.edge_router.route(
+            self, (start.x(), start.y()), self.from_side, (end.x(), end.y()), self.to_side
+        )
 
     
     def create_arrow_head(self, tip, direction_point, reverse=False):
-        """Create an arrow head as a filled polygon"""
+        """Compute an arrow head polygon pointing at tip"""
         dx = tip.x() - direction_point.x()
         dy = tip.y() - direction_point.y()
         
@@ -150,14 +157,43 @@ class Connection(QGraphicsPathItem):
             tip.y() - self.arrow_size * math.sin(angle + math.pi / 6)
         )
         
-        polygon = QPolygonF([arrow_p1, arrow_p2, arrow_p3])
-        
-        arrow_item = QGraphicsPolygonItem(polygon)
-        arrow_item.setBrush(QBrush(self.line_color))
-        arrow_item.setPen(QPen(self.line_color))
-        arrow_item.setZValue(-1)
-        
-        return arrow_item
+        return QPolygonF([arrow_p1, arrow_p2, arrow_p3])
+    
+    def boundingRect(self):
+        """Path bounds plus the arrow heads"""
+        rect = super().boundingRect()
+        for polygon in self.arrow_polygons:
+            rect = rect.united(polygon.boundingRect().adjusted(-1, -1, 1, 1))
+        return rect
+    
+    def shape(self):
+        """Clickable area: the stroked path and the arrow heads"""
+        shape = super().shape()
+        for polygon in self.arrow_polygons:
+            shape.addPolygon(polygon)
+        return shape
+    
+    def paint(self, painter, option, widget=None):
+        """Draw the curve, then the arrow heads on top of it"""
+        start = time.perf_counter_ns()
+        level = lod_settings.level_for(painter)
+        
+        if level == LOD_MINIMAL:
+            # Zoomed far out: a straight line reads the same and is much cheaper
+            path = self.path()
+            first = path.elementAt(0)
+            painter.setPen(self.pen())
+            painter.drawLine(QPointF(first.x, first.y), path.currentPosition())
+        else:
+            super().paint(painter, option, widget)
+            
+            if level == LOD_FULL and self.arrow_polygons:
+                painter.setPen(QPen(self.line_color))
+                painter.setBrush(QBrush(self.line_color))
+                for polygon in self.arrow_polygons:
+                    painter.drawPolygon(polygon)
+        
+        lod_settings.record(level, start)
     
     def set_flow_type(self, flow_type):
         """Change flow type"""
@@ -169,17 +205,3 @@ class Connection(QGraphicsPathItem):
         self.line_style = line_style
         self.update_style()
         self.update_path()
-
-    def itemChange(self, change, value):
-        """Handle item changes - particularly when added to scene"""
-        if change == QGraphicsItem.ItemSceneChange:
-            # When being added to a scene, ensure arrows are also added
-            new_scene = value
-            if new_scene:
-                # Re-create arrows if they exist but aren't in the scene
-                if self.arrow_end and not self.arrow_end.scene():
-                    new_scene.addItem(self.arrow_end)
-                if self.arrow_start and not self.arrow_start.scene():
-                    new_scene.addItem(self.arrow_start)
-        
-        return super().itemChange(change, value)
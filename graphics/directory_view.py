@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import QGraphicsView
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QBrush, QColor, QPainter
+from PyQt5.QtGui import QBrush, QColor, QPainter, QPen
 
 from graphics.code_block import CodeBlock
 from graphics.connection import Connection
@@ -18,6 +18,12 @@ class DirectoryGraphView(QGraphicsView):
         
         self.setDragMode(QGraphicsView.RubberBandDrag)
         
+        # The background (with the directory boundary) is cached as a pixmap
+        # and only redrawn on zoom, theme or scene rect changes
+        self.setCacheMode(QGraphicsView.CacheBackground)
+        self.boundary_brush = QBrush(QColor(74, 144, 226, 30))
+        self.boundary_pen = QPen(QColor(74, 144, 226, 100), 3, Qt.DashLine)
+        
         self.update_theme()
         
         self.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -41,6 +47,21 @@ class DirectoryGraphView(QGraphicsView):
                 self.setBackgroundBrush(QBrush(QColor(45, 45, 45)))
             else:
                 self.setBackgroundBrush(QBrush(QColor(245, 245, 245)))
+            self.resetCachedContent()
+    
+    def drawBackground(self, painter, rect):
+        """Draw the theme background, then the directory boundary over the scene rect"""
+        super().drawBackground(painter, rect)
+        
+        boundary = self.sceneRect()
+        exposed = rect.intersected(boundary)
+        if exposed.isEmpty():
+            return
+        
+        painter.fillRect(exposed, self.boundary_brush)
+        painter.setPen(self.boundary_pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(boundary)
     
     def mousePressEvent(self, event):
         """Handle mouse press for middle-click panning and right-click grouping"""
@@ -182,12 +203,7 @@ class DirectoryGraphView(QGraphicsView):
         """Delete a connection"""
         current_tab = self.parent_window.directory_tabs.get(self.parent_window.current_directory)
         if current_tab and connection in current_tab.connections:
-            current_tab.connections.remove(connection)
-            
-            if connection.arrow_end and connection.arrow_end.scene():
-                self.scene().removeItem(connection.arrow_end)
-            if connection.arrow_start and connection.arrow_start.scene():
-                self.scene().removeItem(connection.arrow_start)
+            current_tab.detach_connection(connection)
             
             self.scene().removeItem(connection)
             self.parent_window.statusBar().showMessage('Connection deleted')
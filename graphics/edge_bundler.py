@@ -0,0 +1,201 @@
+import math
+import time
+from collections import Counter
+
+import numpy as np
+from PyQt5.QtWidgets import QGraphicsItem
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPen, QColor, QPainterPath
+
+from graphics.lod import lod_settings, LOD_MINIMAL
+
+
+KMEANS_ITERATIONS = 12
+
+# Opacity of the thin lines from each end point to its hub
+FAN_ALPHA = 110
+
+
+def bundle_edges(segments, hub_count=None, iterations=KMEANS_ITERATIONS):
+    """Group edges whose end points are close by clustering the end points.
+
+    segments is an (E, 4) array-like of [x1, y1, x2, y2]. Every end point is
+    assigned to one of hub_count hubs (k-means, default sqrt(E) + 1); edges
+    between the same two hubs share a bundle. Returns (hubs, from_hub,
+    to_hub): a (K, 2) array of hub positions and the hub index of each
+    edge's two ends.
+    """
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    count = len(segments)
+    if count == 0:
+        return np.zeros((0, 2)), np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    points = np.concatenate([segments[:, :2], segments[:, 2:]])
+    unique = np.unique(points, axis=0)
+
+    if hub_count is None:
+        hub_count = int(math.sqrt(count)) + 1
+    hub_count = max(1, min(hub_count, len(unique)))
+
+    # Fixed seed, so the same diagram always bundles the same way
+    rng = np.random.default_rng(0)
+    hubs = unique[rng.choice(len(unique), hub_count, replace=False)]
+    point_norms = (points ** 2).sum(axis=1)[:, None]
+
+    def nearest(hubs):
+        # Squared distances without a (points x hubs x 2) temporary
+        distances = point_norms - 2 * points @ hubs.T + (hubs ** 2).sum(axis=1)[None, :]
+        return distances.argmin(axis=1)
+
+    for _ in range(iterations):
+        labels = nearest(hubs)
+        sizes = np.bincount(labels, minlength=hub_count)
+        filled = sizes > 0
+
+        moved = hubs.copy()
+        for axis in (0, 1):
+            sums = np.bincount(labels, weights=points[:, axis], minlength=hub_count)
+            moved[filled, axis] = sums[filled] / sizes[filled]
+
+        converged = np.allclose(moved, hubs)
+        hubs = moved
+        if converged:
+            break
+
+    labels = nearest(hubs)
+    return hubs, labels[:count], labels[count:]
+
+
+class EdgeBundleItem(QGraphicsItem):
+    """Draws all connections of a tab as bundles, in place of the Connection items.
+
+    Each edge is a thin line from its end point to its hub, and edges between
+    the same two hubs share one trunk whose width grows with the edge count.
+    Everything is painted with a handful of paths (one per color and width)
+    instead of one item per connection. Arrow heads are not drawn.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.setZValue(-1)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+
+        self.connections = []
+        self.index = {}  # connection -> row in segments
+        self.segments = np.zeros((0, 4))
+        self.hubs = np.zeros((0, 2))
+        self.from_hub = np.zeros(0, dtype=int)
+        self.to_hub = np.zeros(0, dtype=int)
+
+        self.fan_paths = []  # [(QPen, QPainterPath)]
+        self.trunk_paths = []
+        self.bounds = QRectF()
+
+    @staticmethod
+    def endpoints(conn):
+        """[x1, y1, x2, y2] of a connection's current end points"""
+        start = conn.get_connection_point(conn.from_block, conn.from_side)
+        end = conn.get_connection_point(conn.to_block, conn.to_side)
+        return (start.x(), start.y(), end.x(), end.y())
+
+    def set_bundles(self, connections, segments, hubs, from_hub, to_hub):
+        """Show a freshly computed bundling of connections"""
+        self.connections = list(connections)
+        self.index = {conn: i for i, conn in enumerate(self.connections)}
+        self.segments = np.array(segments, dtype=np.float64).reshape(-1, 4)
+        self.hubs = hubs
+        self.from_hub = from_hub
+        self.to_hub = to_hub
+        self.rebuild()
+
+    def update_endpoints(self, connections):
+        """Follow moved blocks; hubs stay put until the next bundling"""
+        changed = False
+        for conn in connections:
+            row = self.index.get(conn)
+            if row is not None:
+                self.segments[row] = self.endpoints(conn)
+                changed = True
+        if changed:
+            self.rebuild()
+
+    def rebuild(self):
+        """Turn the bundling into a few paths grouped by color and width"""
+        self.prepareGeometryChange()
+
+        fans = {}  # rgb -> QPainterPath
+        trunks = {}  # (hub, hub) -> Counter of rgb
+
+        for row, conn in enumerate(self.connections):
+            x1, y1, x2, y2 = self.segments[row]
+            a = int(self.from_hub[row])
+            b = int(self.to_hub[row])
+            rgb = conn.line_color.rgb()
+
+            path = fans.get(rgb)
+            if path is None:
+                path = fans[rgb] = QPainterPath()
+
+            if a == b:
+                # Both ends share a hub: nothing to bundle with
+                path.moveTo(x1, y1)
+                path.lineTo(x2, y2)
+                continue
+
+            path.moveTo(x1, y1)
+            path.lineTo(*self.hubs[a])
+            path.moveTo(*self.hubs[b])
+            path.lineTo(x2, y2)
+
+            trunks.setdefault((min(a, b), max(a, b)), Counter())[rgb] += 1
+
+        trunk_groups = {}  # (rgb, width) -> QPainterPath
+        for (a, b), colors in trunks.items():
+            width = 2 + 2 * int(math.log2(sum(colors.values())))
+            rgb = colors.most_common(1)[0][0]
+            path = trunk_groups.get((rgb, width))
+            if path is None:
+                path = trunk_groups[(rgb, width)] = QPainterPath()
+            path.moveTo(*self.hubs[a])
+            path.lineTo(*self.hubs[b])
+
+        self.fan_paths = []
+        for rgb, path in fans.items():
+            color = QColor(rgb)
+            color.setAlpha(FAN_ALPHA)
+            self.fan_paths.append((QPen(color, 1), path))
+
+        self.trunk_paths = []
+        widest = 1
+        for (rgb, width), path in trunk_groups.items():
+            pen = QPen(QColor(rgb), width)
+            pen.setCapStyle(Qt.RoundCap)
+            self.trunk_paths.append((pen, path))
+            widest = max(widest, width)
+
+        bounds = QRectF()
+        for _, path in self.fan_paths + self.trunk_paths:
+            bounds = bounds.united(path.boundingRect())
+        self.bounds = bounds.adjusted(-widest, -widest, widest, widest)
+
+        self.update()
+
+    def boundingRect(self):
+        return self.bounds
+
+    def paint(self, painter, option, widget=None):
+        """Draw the fans, then the trunks on top; fans are skipped when zoomed far out"""
+        start = time.perf_counter_ns()
+        level = lod_settings.level_for(painter)
+
+        painter.setBrush(Qt.NoBrush)
+        if level != LOD_MINIMAL:
+            for pen, path in self.fan_paths:
+                painter.setPen(pen)
+                painter.drawPath(path)
+        for pen, path in self.trunk_paths:
+            painter.setPen(pen)
+            painter.drawPath(path)
+
+        lod_settings.record(level, start)
@@ -0,0 +1,580 @@
+import bisect
+import heapq
+import math
+
+
+# Clearance kept between routed edges and block rects
+PADDING = 12
+# Length of the straight piece leaving and entering a block side
+STUB = 24
+# Extra cost per turn, so routes prefer fewer bends over slightly shorter ones
+BEND_PENALTY = 40
+# Free space searched around the two end points
+SEARCH_MARGIN = 240
+# Side length of the spatial hash cells
+CELL_SIZE = 256
+# Give up on the exact search after this many A* steps
+MAX_EXPANSIONS = 3000
+# Channel detours and the retry search look this far around the end points
+RETRY_MARGIN = 960
+# The retry scales the heuristic by this: fewer steps, maybe a longer route
+RETRY_WEIGHT = 2
+RETRY_EXPANSIONS = 40000
+# Lines tried for crossing over to a channel, nearest the end point first
+DETOUR_CROSSINGS = 48
+
+# Travel directions: +x, -x, +y, -y; d ^ 1 is the opposite direction
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+SIDE_DIRECTIONS = {'right': 0, 'left': 1, 'bottom': 2, 'top': 3}
+
+
+def _inflate(rect, amount):
+    x1, y1, x2, y2 = rect
+    return (x1 - amount, y1 - amount, x2 + amount, y2 + amount)
+
+
+def _intersects(a, b):
+    # Closed rects, so an edge running along a padded border still counts
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _contains_point(rect, point):
+    return rect[0] < point[0] < rect[2] and rect[1] < point[1] < rect[3]
+
+
+def _segment_rect(p, q):
+    return (min(p[0], q[0]), min(p[1], q[1]), max(p[0], q[0]), max(p[1], q[1]))
+
+
+def _simplify(points):
+    """Drop repeated points and the middle of straight runs.
+
+    Only runs that keep their direction are merged; a U-turn along one axis
+    (A -> B -> A) keeps its turning point.
+    """
+    result = []
+    for point in points:
+        if result and point == result[-1]:
+            continue
+        if len(result) >= 2:
+            a, b = result[-2], result[-1]
+            vertical = a[0] == b[0] == point[0] and (b[1] - a[1]) * (point[1] - b[1]) > 0
+            horizontal = a[1] == b[1] == point[1] and (b[0] - a[0]) * (point[0] - b[0]) > 0
+            if vertical or horizontal:
+                result[-1] = point
+                continue
+        result.append(point)
+    return result
+
+
+def _min_bends(x, y, d, tx, ty, td):
+    """Fewest turns from (x, y) heading d to (tx, ty) arriving heading td"""
+    ux, uy = DIRECTIONS[d]
+    vx, vy = DIRECTIONS[td]
+    ex, ey = tx - x, ty - y
+    ahead = ex * ux + ey * uy
+    offset = ex * uy - ey * ux  # Distance off the current heading's line
+
+    if d == td:
+        if offset == 0 and ahead >= 0:
+            return 0
+        return 2 if ahead > 0 else 4
+    if d == td ^ 1:
+        return 2 if offset != 0 else 4
+    # Perpendicular headings always need an odd number of turns
+    return 1 if ahead >= 0 and ex * vx + ey * vy >= 0 else 3
+
+
+def _merged_spans(obstacles, line, horizontal):
+    """Sorted, merged spans of the rects a grid line passes strictly through.
+
+    For a horizontal line at y these are x spans, otherwise y spans.
+    Returned as parallel (starts, ends) lists for bisecting.
+    """
+    if horizontal:
+        spans = sorted((r[0], r[2]) for r in obstacles if r[1] < line < r[3])
+    else:
+        spans = sorted((r[1], r[3]) for r in obstacles if r[0] < line < r[2])
+
+    starts = []
+    ends = []
+    for lo, hi in spans:
+        if ends and lo <= ends[-1]:
+            ends[-1] = max(ends[-1], hi)
+        else:
+            starts.append(lo)
+            ends.append(hi)
+    return starts, ends
+
+
+def _free_run(spans, p, lo, hi):
+    """(start, end) of the free stretch of a grid line around p, within lo..hi.
+
+    spans are the line's merged (starts, ends). None when p lies strictly
+    inside a blocked span.
+    """
+    starts, ends = spans
+    k = bisect.bisect_right(ends, p)  # spans[:k] end at or before p
+    if k < len(starts) and starts[k] < p:
+        return None
+    start = max(ends[k - 1], lo) if k else lo
+    end = min(starts[k], hi) if k < len(starts) else hi
+    return start, end
+
+
+def _has_u_turn(points):
+    # Two segments along one axis in opposite directions, e.g. (0, 0) -> (9, 0) -> (4, 0)
+    for a, b, c in zip(points, points[1:], points[2:]):
+        if a[0] == b[0] == c[0] and (b[1] - a[1]) * (c[1] - b[1]) < 0:
+            return True
+        if a[1] == b[1] == c[1] and (b[0] - a[0]) * (c[0] - b[0]) < 0:
+            return True
+    return False
+
+
+def _route_cost(points):
+    length = sum(abs(q[0] - p[0]) + abs(q[1] - p[1]) for p, q in zip(points, points[1:]))
+    return length + BEND_PENALTY * (len(points) - 2)
+
+
+class EdgeRouter:
+    """Orthogonal, obstacle-avoiding routes for one tab's connections.
+
+    Block rects (padded) live in a spatial hash of CELL_SIZE cells, and so
+    do the cells each cached route passes through. Moving a block only
+    touches its own cells: set_obstacle returns the routes that ran through
+    or along its old or new rect, and only those need re-routing.
+
+    A route is found with A* over a sparse grid whose lines are the end
+    points and the padded edges of nearby blocks (a Hanan grid), costing
+    length plus BEND_PENALTY per turn. Long or crowded routes that run out
+    of steps fall back to a detour through one free channel, then to a
+    wider weighted search, and only then to a plain elbow. Points are plain
+    (x, y) tuples. The blocked spans along each grid line are cached per band of
+    CELL_SIZE and shared by all routes until a block in that band moves.
+    """
+
+    def __init__(self):
+        self.obstacles = {}  # key -> padded rect (x1, y1, x2, y2)
+        self._obstacle_cells = {}  # cell -> set of obstacle keys
+        self._band_keys = ({}, {})  # horizontal band (cy) / vertical band (cx) -> obstacle keys
+        self._band_spans = ({}, {})  # same bands -> {grid line: merged spans}
+        self.routes = {}  # key -> (signature, points, cells)
+        self._route_cells = {}  # cell -> set of route keys
+
+    def _cells(self, rect):
+        x1, y1, x2, y2 = rect
+        return [
+            (cx, cy)
+            for cx in range(math.floor(x1 / CELL_SIZE), math.floor(x2 / CELL_SIZE) + 1)
+            for cy in range(math.floor(y1 / CELL_SIZE), math.floor(y2 / CELL_SIZE) + 1)
+        ]
+
+    def _bands(self, rect):
+        # Horizontal bands (rows of cells) first, then vertical ones
+        x1, y1, x2, y2 = rect
+        return (range(math.floor(y1 / CELL_SIZE), math.floor(y2 / CELL_SIZE) + 1),
+                range(math.floor(x1 / CELL_SIZE), math.floor(x2 / CELL_SIZE) + 1))
+
+    # -- Obstacles ---------------------------------------------------------
+
+    def set_obstacle(self, key, rect):
+        """Add or move a block rect; returns the route keys it invalidated"""
+        padded = _inflate(rect, PADDING)
+        old = self.obstacles.get(key)
+        if old == padded:
+            return set()
+
+        affected = set()
+        if old is not None:
+            self._unindex_obstacle(key, old)
+            affected |= self._routes_touching(old)
+
+        self.obstacles[key] = padded
+        for cell in self._cells(padded):
+            self._obstacle_cells.setdefault(cell, set()).add(key)
+        for keys, spans, bands in zip(self._band_keys, self._band_spans, self._bands(padded)):
+            for band in bands:
+                keys.setdefault(band, set()).add(key)
+                spans.pop(band, None)
+        affected |= self._routes_touching(padded)
+
+        for route_key in affected:
+            self.forget_route(route_key)
+        return affected
+
+    def remove_obstacle(self, key):
+        """Drop a block rect; returns the route keys that went around it"""
+        old = self.obstacles.pop(key, None)
+        if old is None:
+            return set()
+
+        self._unindex_obstacle(key, old)
+        affected = self._routes_touching(old)
+        for route_key in affected:
+            self.forget_route(route_key)
+        return affected
+
+    def _unindex_obstacle(self, key, rect):
+        for cell in self._cells(rect):
+            keys = self._obstacle_cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._obstacle_cells[cell]
+        for band_keys, spans, bands in zip(self._band_keys, self._band_spans, self._bands(rect)):
+            for band in bands:
+                spans.pop(band, None)
+                keys = band_keys.get(band)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del band_keys[band]
+
+    def _line_spans(self, line, horizontal):
+        """Merged spans of every block a grid line passes strictly through (cached)"""
+        axis = 0 if horizontal else 1
+        band = math.floor(line / CELL_SIZE)
+        cache = self._band_spans[axis].setdefault(band, {})
+        spans = cache.get(line)
+        if spans is None:
+            keys = self._band_keys[axis].get(band, ())
+            spans = cache[line] = _merged_spans([self.obstacles[key] for key in keys], line, horizontal)
+        return spans
+
+    def obstacles_in(self, region):
+        """Padded obstacle rects intersecting region"""
+        keys = set()
+        for cell in self._cells(region):
+            keys |= self._obstacle_cells.get(cell, set())
+        return [self.obstacles[key] for key in keys if _intersects(self.obstacles[key], region)]
+
+    # -- Route cache -------------------------------------------------------
+
+    def _routes_touching(self, rect):
+        candidates = set()
+        for cell in self._cells(rect):
+            candidates |= self._route_cells.get(cell, set())
+
+        touching = set()
+        for route_key in candidates:
+            points = self.routes[route_key][1]
+            for p, q in zip(points, points[1:]):
+                if _intersects(_segment_rect(p, q), rect):
+                    touching.add(route_key)
+                    break
+        return touching
+
+    def forget_route(self, key):
+        """Drop a cached route, e.g. when its connection is deleted"""
+        entry = self.routes.pop(key, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            keys = self._route_cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._route_cells[cell]
+
+    def clear(self):
+        """Drop every obstacle and cached route"""
+        self.obstacles.clear()
+        self._obstacle_cells.clear()
+        for index in self._band_keys + self._band_spans:
+            index.clear()
+        self.routes.clear()
+        self._route_cells.clear()
+
+    # -- Routing -----------------------------------------------------------
+
+    def route(self, key, start, start_side, end, end_side):
+        """Orthogonal polyline from start to end as a list of points.
+
+        start and end are points on block sides; the route leaves and enters
+        perpendicular to start_side and end_side. Cached under key until a
+        block moves across it or the end points change.
+        """
+        signature = (start, start_side, end, end_side)
+        cached = self.routes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        self.forget_route(key)
+
+        start_dir = SIDE_DIRECTIONS.get(start_side, 0)
+        end_dir = SIDE_DIRECTIONS.get(end_side, 1)
+        sdx, sdy = DIRECTIONS[start_dir]
+        edx, edy = DIRECTIONS[end_dir]
+        start_stub = (start[0] + sdx * STUB, start[1] + sdy * STUB)
+        end_stub = (end[0] + edx * STUB, end[1] + edy * STUB)
+
+        middle = self._search(start_stub, start_dir, end_stub, end_dir ^ 1,
+                              SEARCH_MARGIN, 1, MAX_EXPANSIONS)
+        if middle is None:
+            # Long or crowded: a detour through one free channel is cheap to
+            # find; failing that, look further out and settle for a route
+            # that is not always the shortest
+            middle = self._detour(start_stub, start_dir, end_stub, end_dir ^ 1)
+        if middle is None:
+            middle = self._search(start_stub, start_dir, end_stub, end_dir ^ 1,
+                                  RETRY_MARGIN, RETRY_WEIGHT, RETRY_EXPANSIONS)
+        if middle is None:
+            # Walled in: a plain elbow that ignores blocks
+            if start_dir < 2:
+                mid_x = (start_stub[0] + end_stub[0]) / 2
+                middle = [start_stub, (mid_x, start_stub[1]), (mid_x, end_stub[1]), end_stub]
+            else:
+                mid_y = (start_stub[1] + end_stub[1]) / 2
+                middle = [start_stub, (start_stub[0], mid_y), (end_stub[0], mid_y), end_stub]
+
+        points = _simplify([start] + middle + [end])
+
+        cells = set()
+        for p, q in zip(points, points[1:]):
+            cells.update(self._cells(_segment_rect(p, q)))
+        for cell in cells:
+            self._route_cells.setdefault(cell, set()).add(key)
+        self.routes[key] = (signature, points, cells)
+        return points
+
+    def _area(self, source, target, margin):
+        """Region searched between two points, the blocks in it and a spans lookup.
+
+        spans_on(line, horizontal) gives the merged blocked spans along a
+        grid line, as _merged_spans does.
+        """
+        region = _inflate(_segment_rect(source, target), margin)
+        # Blocks sticking out of the region would wall it off; take them in whole
+        obstacles = self.obstacles_in(region)
+        for rect in obstacles:
+            region = (min(region[0], rect[0] - PADDING), min(region[1], rect[1] - PADDING),
+                      max(region[2], rect[2] + PADDING), max(region[3], rect[3] + PADDING))
+        obstacles = self.obstacles_in(region)
+        # A block overlapping an end point can't be avoided, so it is ignored
+        ignored = [r for r in obstacles if _contains_point(r, source) or _contains_point(r, target)]
+        if ignored:
+            obstacles = [r for r in obstacles if r not in ignored]
+
+        def spans_on(line, horizontal):
+            # Lines through an ignored block can't use the shared cache
+            if any(r[1] < line < r[3] if horizontal else r[0] < line < r[2] for r in ignored):
+                return _merged_spans(obstacles, line, horizontal)
+            return self._line_spans(line, horizontal)
+
+        return region, obstacles, spans_on
+
+    def _detour(self, source, source_dir, target, target_dir):
+        """Cheapest route that crosses over to one free channel line and back.
+
+        The shape is source, run, cross, channel, cross, run, target (at
+        most five bends), with the channel either horizontal or vertical.
+        Returns None when no such route gets through.
+        """
+        area = self._area(source, target, RETRY_MARGIN)
+        best = None
+        for flip in (False, True):
+            best = self._channel_route(source, source_dir, target, target_dir, area, flip, best)
+        return best[1] if best is not None else None
+
+    def _channel_route(self, source, source_dir, target, target_dir, area, flip, best):
+        """Best (cost, points) detour along a channel parallel to x (or y if flip).
+
+        best is the (cost, points) to beat, or None; it is returned when no
+        cheaper detour is found.
+        """
+        region, obstacles, spans_on = area
+
+        # Work in (u, v): u runs along the channel, v across it
+        def swap(p):
+            return (p[1], p[0]) if flip else p
+
+        su, sv = swap(source)
+        tu, tv = swap(target)
+        ulo, vlo = swap(region[:2])
+        uhi, vhi = swap(region[2:])
+        u_index = 1 if flip else 0
+        us = sorted({su, tu} | {r[k] for r in obstacles for k in (u_index, u_index + 2)})
+        vs = sorted({sv, tv} | {r[k] for r in obstacles for k in (1 - u_index, 3 - u_index)})
+
+        def run(line, along_u, p):
+            # Free stretch around p of the line v = line (along_u) or u = line
+            if along_u:
+                return _free_run(spans_on(line, not flip), p, ulo, uhi)
+            return _free_run(spans_on(line, flip), p, vlo, vhi)
+
+        def crossings(pu, pv, direction, leaving):
+            """(u, v_lo, v_hi): lines reachable along v = pv, and how far each runs across.
+
+            Nearest pu first, and at most DETOUR_CROSSINGS of them: crossing
+            far along the run is hardly ever worth it.
+            """
+            du, dv = swap(DIRECTIONS[direction])
+            if not leaving:
+                du, dv = -du, -dv  # Arriving: the run must come from behind
+            stretch = run(pv, True, pu)
+            if stretch is None:
+                return []
+            lo, hi = stretch
+            if du > 0:
+                lo = pu  # No U-turn out of (or into) the stub
+            elif du < 0:
+                hi = pu
+
+            nearby = us[bisect.bisect_left(us, lo):bisect.bisect_right(us, hi)]
+            result = []
+            for u in sorted(nearby, key=lambda u: abs(u - pu)):
+                if len(result) >= DETOUR_CROSSINGS:
+                    break
+                across = run(u, False, pv)
+                if across is None:
+                    continue
+                across_lo, across_hi = across
+                if u == pu and dv > 0:
+                    across_lo = pv
+                elif u == pu and dv < 0:
+                    across_hi = pv
+                result.append((u, across_lo, across_hi))
+            return result
+
+        # Nearest crossings first, so the first one that reaches a channel
+        # is also the shortest way there
+        leaves = crossings(su, sv, source_dir, True)
+        arrivals = crossings(tu, tv, target_dir, False)
+        if not leaves or not arrivals:
+            return best
+
+        # Only channels both ends can cross over to, by how far they stray
+        # from the end points; stop once even a straight run along the
+        # channel can't beat the best route so far
+        low = max(min(l[1] for l in leaves), min(a[1] for a in arrivals))
+        high = min(max(l[2] for l in leaves), max(a[2] for a in arrivals))
+        channels = vs[bisect.bisect_left(vs, low):bisect.bisect_right(vs, high)]
+        channels.sort(key=lambda c: abs(c - sv) + abs(tv - c))
+
+        straight = abs(tu - su)
+        for c in channels:
+            if best is not None and abs(c - sv) + abs(tv - c) + straight >= best[0]:
+                break
+            stretches = []  # (start, end, u1) of each free stretch of the channel line
+            for u1, lo1, hi1 in leaves:
+                if not lo1 <= c <= hi1 or any(start <= u1 <= end for start, end, _ in stretches):
+                    continue
+                stretch = run(c, True, u1)
+                if stretch is not None:
+                    stretches.append(stretch + (u1,))
+
+            for start, end, u1 in stretches:
+                for u2, lo2, hi2 in arrivals:
+                    if not (lo2 <= c <= hi2 and start <= u2 <= end):
+                        continue
+                    points = _simplify([source, swap((u1, sv)), swap((u1, c)),
+                                        swap((u2, c)), swap((u2, tv)), target])
+                    if not _has_u_turn(points):
+                        cost = _route_cost(points)
+                        if best is None or cost < best[0]:
+                            best = (cost, points)
+                    break
+        return best
+
+    def _search(self, source, source_dir, target, target_dir, margin, weight, max_expansions):
+        """A* from source (heading source_dir) to target (arriving heading target_dir).
+
+        Searches margin around the two points. A weight above 1 scales the
+        heuristic: fewer steps, possibly a longer route. Returns None after
+        max_expansions steps or when there is no way through.
+        """
+        if source == target:
+            return [source]
+
+        region, obstacles, spans_on = self._area(source, target, margin)
+        xs = sorted({source[0], target[0], region[0], region[2]}
+                    | {x for r in obstacles for x in (r[0], r[2])})
+        ys = sorted({source[1], target[1], region[1], region[3]}
+                    | {y for r in obstacles for y in (r[1], r[3])})
+
+        # Blocked spans per grid line, built only for lines the search visits
+        rows = {}
+        columns = {}
+
+        def blocked(spans, lines, index, a, b):
+            # Adjacent grid points a < b are blocked when a merged block span covers them
+            if index not in spans:
+                spans[index] = spans_on(lines[index], lines is ys)
+            starts, ends = spans[index]
+            k = bisect.bisect_right(starts, a) - 1
+            return k >= 0 and b <= ends[k]
+
+        x_count, y_count = len(xs), len(ys)
+        si, sj = xs.index(source[0]), ys.index(source[1])
+        ti, tj = xs.index(target[0]), ys.index(target[1])
+        tx, ty = target
+
+        start_state = (si, sj, source_dir)
+        best = {start_state: 0}
+        parents = {start_state: None}
+
+        def estimate(x, y, d):
+            return abs(x - tx) + abs(y - ty) + BEND_PENALTY * _min_bends(x, y, d, tx, ty, target_dir)
+
+        h = estimate(source[0], source[1], source_dir)
+        heap = [(h, h, 0, start_state)]
+        closed = set()
+        counter = 0
+        expansions = 0
+
+        while heap:
+            _, _, _, state = heapq.heappop(heap)
+            if state in closed:
+                continue  # Stale entry, already expanded at a lower cost
+            closed.add(state)
+            i, j, d = state
+            g = best[state]
+
+            if (i, j) == (ti, tj):
+                # Rebuild the node sequence back to the source
+                nodes = []
+                while state is not None:
+                    nodes.append((xs[state[0]], ys[state[1]]))
+                    state = parents[state]
+                nodes.reverse()
+                return nodes
+
+            expansions += 1
+            if expansions > max_expansions:
+                return None
+
+            for nd, (dx, dy) in enumerate(DIRECTIONS):
+                if nd == d ^ 1:
+                    continue  # No U-turns
+                ni, nj = i + dx, j + dy
+                if dx:
+                    if not 0 <= ni < x_count:
+                        continue
+                    a, b = (xs[i], xs[ni]) if dx > 0 else (xs[ni], xs[i])
+                    if blocked(rows, ys, j, a, b):
+                        continue
+                    ng = g + b - a
+                else:
+                    if not 0 <= nj < y_count:
+                        continue
+                    a, b = (ys[j], ys[nj]) if dy > 0 else (ys[nj], ys[j])
+                    if blocked(columns, xs, i, a, b):
+                        continue
+                    ng = g + b - a
+
+                if nd != d:
+                    ng += BEND_PENALTY
+                if ni == ti and nj == tj and nd != target_dir:
+                    ng += BEND_PENALTY  # One more turn to enter the side
+
+                next_state = (ni, nj, nd)
+                if ng < best.get(next_state, float('inf')):
+                    best[next_state] = ng
+                    parents[next_state] = state
+                    counter += 1
+                    h = 0 if (ni, nj) == (ti, tj) else estimate(xs[ni], ys[nj], nd)
+                    # Ties go to the node nearest the target, which keeps
+                    # A* from flooding the many equally short paths
+                    heapq.heappush(heap, (ng + weight * h, h, counter, next_state))
+
+        return None
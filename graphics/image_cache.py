@@ -0,0 +1,167 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QPixmap, QPainter, QImageReader
+from PyQt5.QtSvg import QSvgRenderer
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ImageCache:
+    """Scaled pixmaps for IMAGE blocks and icons, shared across the process.
+
+    SVG files get one QSvgRenderer per path. Scaled pixmaps are kept in an
+    LRU keyed by (path, width, height, device pixel ratio) plus the file's
+    mtime and size, so an edited image is rendered again. Pixmaps are evicted
+    least recently used first once their total size passes max_bytes.
+    Qt pixmaps belong to the GUI thread, so this is not thread safe.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+        self._renderers = {}  # path -> (stamp, QSvgRenderer)
+        self._pixmaps = OrderedDict()  # key -> (QPixmap, cost)
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def renderer(self, path):
+        """The shared QSvgRenderer for an SVG file, or None if it can't be read"""
+        try:
+            stamp = _file_stamp(path)
+        except OSError:
+            return None
+
+        entry = self._renderers.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        renderer = QSvgRenderer(path)
+        if not renderer.isValid():
+            self._renderers.pop(path, None)
+            return None
+        self._renderers[path] = (stamp, renderer)
+        return renderer
+
+    def pixmap(self, path, width, height, dpr=1.0):
+        """The image at path fitted into width x height logical pixels.
+
+        Keeps the aspect ratio and renders at dpr for sharp output. Returns
+        None if the image can't be loaded.
+        """
+        try:
+            stamp = _file_stamp(path)
+        except OSError:
+            return None
+
+        key = (path, int(width), int(height), round(dpr, 2), stamp)
+        entry = self._pixmaps.get(key)
+        if entry is not None:
+            self._pixmaps.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+
+        if path.lower().endswith('.svg'):
+            pixmap = self._render_svg(path, width, height, dpr)
+        else:
+            pixmap = self._read_raster(path, width, height, dpr)
+        if pixmap is None:
+            return None
+
+        cost = pixmap.width() * pixmap.height() * 4
+        if cost <= self.max_bytes:
+            self._pixmaps[key] = (pixmap, cost)
+            self._total_bytes += cost
+            self._evict()
+
+        return pixmap
+
+    def _render_svg(self, path, width, height, dpr):
+        renderer = self.renderer(path)
+        if renderer is None:
+            print(f"Failed to load image: {path}")
+            return None
+
+        # Fit the SVG's aspect ratio into the available size
+        svg_size = renderer.defaultSize()
+        aspect_ratio = svg_size.width() / svg_size.height() if svg_size.height() > 0 else 1.0
+        if width / height > aspect_ratio:
+            display_height = height
+            display_width = height * aspect_ratio
+        else:
+            display_width = width
+            display_height = width / aspect_ratio
+
+        # Render at physical pixel size for sharpness
+        pixmap = QPixmap(max(1, int(display_width * dpr)), max(1, int(display_height * dpr)))
+        pixmap.fill(Qt.transparent)
+        pixmap.setDevicePixelRatio(dpr)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        renderer.render(painter)
+        painter.end()
+        return pixmap
+
+    def _read_raster(self, path, width, height, dpr):
+        target = QSize(max(1, int(width * dpr)), max(1, int(height * dpr)))
+
+        # Decoders that support it (e.g. JPEG) decode straight at the target
+        # size instead of decoding the full image and scaling it down
+        reader = QImageReader(path)
+        source_size = reader.size()
+        if source_size.isValid():
+            reader.setScaledSize(source_size.scaled(target, Qt.KeepAspectRatio))
+
+        image = reader.read()
+        if image.isNull():
+            print(f"Failed to load image: {path}")
+            return None
+
+        if not source_size.isValid():
+            image = image.scaled(target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._pixmaps:
+            _, entry = self._pixmaps.popitem(last=False)
+            self._total_bytes -= entry[1]
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached pixmap and renderer"""
+        self._renderers.clear()
+        self._pixmaps.clear()
+        self._total_bytes = 0
+
+    def stats(self):
+        """Counters for tuning the cache size"""
+        lookups = self.hits + self.misses
+        return {
+            'pixmaps': len(self._pixmaps),
+            'renderers': len(self._renderers),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Single process-wide instance used by IMAGE blocks and the image picker
+image_cache = ImageCache()
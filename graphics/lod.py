@@ -0,0 +1,97 @@
+import time
+
+from PyQt5.QtWidgets import QStyleOptionGraphicsItem, QGraphicsTextItem, QGraphicsPixmapItem
+
+
+# Levels of detail, from most to least expensive
+LOD_FULL = 'full'          # Everything: text, bezier curves, arrow heads
+LOD_REDUCED = 'reduced'    # No text or arrow heads
+LOD_MINIMAL = 'minimal'    # Plain filled rects and straight edges
+
+LOD_LEVELS = (LOD_FULL, LOD_REDUCED, LOD_MINIMAL)
+
+DEFAULT_TEXT_SCALE = 0.4
+DEFAULT_MINIMAL_SCALE = 0.15
+
+
+class LodSettings:
+    """Zoom thresholds that pick the level of detail, plus paint timings.
+
+    Below text_scale blocks stop drawing their text; below minimal_scale
+    they become plain rects and edges become straight lines. Thresholds are
+    stored in QSettings under lod/.
+    """
+
+    def __init__(self):
+        self.text_scale = DEFAULT_TEXT_SCALE
+        self.minimal_scale = DEFAULT_MINIMAL_SCALE
+        self.reset_stats()
+
+    def load(self, settings):
+        self.text_scale = float(settings.value('lod/text_scale', DEFAULT_TEXT_SCALE))
+        self.minimal_scale = float(settings.value('lod/minimal_scale', DEFAULT_MINIMAL_SCALE))
+
+    def save(self, settings):
+        settings.setValue('lod/text_scale', self.text_scale)
+        settings.setValue('lod/minimal_scale', self.minimal_scale)
+
+    def level_for(self, painter):
+        """Level of detail for the painter's current zoom"""
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if scale < self.minimal_scale:
+            return LOD_MINIMAL
+        if scale < self.text_scale:
+            return LOD_REDUCED
+        return LOD_FULL
+
+    def record(self, level, start_ns, paints=1):
+        """Add a paint call that started at start_ns (perf_counter_ns).
+
+        Child items pass paints=0: their time belongs to the parent's paint.
+        """
+        entry = self.paint_stats[level]
+        entry[0] += paints
+        entry[1] += time.perf_counter_ns() - start_ns
+
+    def reset_stats(self):
+        self.paint_stats = {level: [0, 0] for level in LOD_LEVELS}  # level -> [paints, total ns]
+
+    def stats(self):
+        """Per-level paint counts and average cost in microseconds"""
+        return {
+            level: {
+                'paints': paints,
+                'avg_us': total_ns / paints / 1000 if paints else 0.0,
+                'total_ms': total_ns / 1e6,
+            }
+            for level, (paints, total_ns) in self.paint_stats.items()
+        }
+
+
+# Shared by every block and connection
+lod_settings = LodSettings()
+
+
+class LodTextItem(QGraphicsTextItem):
+    """Text item that is skipped entirely when zoomed out past the text threshold"""
+
+    def paint(self, painter, option, widget=None):
+        start = time.perf_counter_ns()
+        level = lod_settings.level_for(painter)
+        if level != LOD_FULL:
+            return  # Text layout is the most expensive part of a block
+        super().paint(painter, option, widget)
+        # Time only: the parent CodeBlock.paint already counts the block once
+        lod_settings.record(level, start, paints=0)
+
+
+class LodPixmapItem(QGraphicsPixmapItem):
+    """Pixmap item that is skipped at the minimal level of detail"""
+
+    def paint(self, painter, option, widget=None):
+        start = time.perf_counter_ns()
+        level = lod_settings.level_for(painter)
+        if level == LOD_MINIMAL:
+            return
+        super().paint(painter, option, widget)
+        lod_settings.record(level, start, paints=0)
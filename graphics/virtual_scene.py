@@ -0,0 +1,113 @@
+import math
+
+from PyQt5.QtCore import QRectF, QPointF
+
+
+# Tabs with at least this many blocks only create items near the viewport
+VIRTUALIZE_THRESHOLD = 1500
+# Blocks created per pass; the rest follow on the next event loop pass
+MATERIALIZE_BATCH = 200
+# Side length of the spatial grid cells
+CELL_SIZE = 512
+
+
+class SpatialGrid:
+    """Uniform grid of keyed rects, for finding what lies near a region"""
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.rects = {}  # key -> (x1, y1, x2, y2)
+        self._cells = {}  # cell -> set of keys
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, key):
+        return key in self.rects
+
+    def _cells_for(self, rect):
+        x1, y1, x2, y2 = rect
+        size = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(math.floor(x1 / size), math.floor(x2 / size) + 1)
+            for cy in range(math.floor(y1 / size), math.floor(y2 / size) + 1)
+        ]
+
+    def insert(self, key, rect):
+        self.remove(key)
+        self.rects[key] = rect
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        rect = self.rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cells_for(rect):
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cell]
+
+    def query(self, rect):
+        """Keys whose rect intersects rect"""
+        x1, y1, x2, y2 = rect
+        found = set()
+        for cell in self._cells_for(rect):
+            for key in self._cells.get(cell, ()):
+                r = self.rects[key]
+                if r[0] <= x2 and x1 <= r[2] and r[1] <= y2 and y1 <= r[3]:
+                    found.add(key)
+        return found
+
+
+def rect_tuple(rect):
+    """QRectF as an (x1, y1, x2, y2) tuple"""
+    return (rect.left(), rect.top(), rect.right(), rect.bottom())
+
+
+class BlockRecord:
+    """A saved block that has no CodeBlock yet.
+
+    Offers the read side of CodeBlock that validation, the subdirectory
+    list and layout helpers use, and writes changes straight into the
+    saved data.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def block_id(self):
+        return self.data['id']
+
+    @property
+    def block_type(self):
+        return self.data['type']
+
+    @property
+    def name(self):
+        return self.data['name']
+
+    @property
+    def metadata(self):
+        return self.data.setdefault('metadata', {})
+
+    def set_exists(self, exists):
+        self.data['exists'] = exists
+
+    def pos(self):
+        return QPointF(self.data['x'], self.data['y'])
+
+    def rect(self):
+        return QRectF(0, 0, self.data['width'], self.data['height'])
+
+    def sceneBoundingRect(self):
+        return QRectF(self.data['x'], self.data['y'], self.data['width'], self.data['height'])
+
+    def to_dict(self):
+        return self.data
@@ -1,7 +1,9 @@
 import sys
 import traceback
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from ui.main_window import CodeGraphWindow
+
+# Keep this module free of Qt imports: the symbol scanner's worker processes
+# are spawned, and spawned workers re-import the main module. PyQt5 and the
+# UI are imported in main() instead, which workers never run.
 
 
 def trace_calls(frame, event, arg):
@@ -36,6 +38,7 @@ def exception_hook(exctype, value, tb):
     print(error_msg)
     print("=" * 80)
     
+    from PyQt5.QtWidgets import QMessageBox
     QMessageBox.critical(
         None,
         "CodeGraph Error",
@@ -57,6 +60,9 @@ def main():
         print("\n🔍 CALL TRACING ENABLED - Click 'Validate Blocks' to see function calls\n")
         sys.settrace(trace_calls)
     
+    from PyQt5.QtWidgets import QApplication
+    from ui.main_window import CodeGraphWindow
+    
     app = QApplication(sys.argv)
     app.setApplicationName('CodeGraph')
     app.setOrganizationName('CodeGraph')
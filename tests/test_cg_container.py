@@ -0,0 +1,99 @@
+import json
+import os
+import stat
+
+import pytest
+
+from utils.cg_container import (LazyDirectoryData, is_container, load_file,
+                                 write_container, write_json)
+
+
+DIRECTORIES = {
+    'root': {'blocks': [{'id': 'a', 'name': 'main.py'}], 'connections': []},
+    'root/utils': {'blocks': [{'id': 'b', 'name': 'helpers.py'}], 'connections': [['a', 'b']]},
+    'root/ui': {'blocks': [], 'connections': []},
+}
+
+
+def test_packed_round_trip(tmp_path):
+    path = str(tmp_path / 'graph.cg')
+    write_container(path, DIRECTORIES, '/project')
+
+    data, root_path, packed = load_file(path)
+    assert packed and is_container(path)
+    assert isinstance(data, LazyDirectoryData)
+    assert root_path == '/project'
+    assert sorted(data) == sorted(DIRECTORIES)
+    assert not any(data.is_decoded(key) for key in data)
+    assert {key: data[key] for key in data} == DIRECTORIES
+
+
+def test_json_round_trip(tmp_path):
+    path = str(tmp_path / 'graph.cg')
+    write_json(path, DIRECTORIES, '/project')
+
+    data, root_path, packed = load_file(path)
+    assert not packed and not is_container(path)
+    assert root_path == '/project'
+    assert data == DIRECTORIES
+
+
+def test_repack_in_place_keeps_untouched_entries(tmp_path):
+    path = str(tmp_path / 'graph.cg')
+    write_container(path, DIRECTORIES, '/project')
+
+    data, root_path, _ = load_file(path)
+    data['root']['blocks'].append({'id': 'c', 'name': 'new.py'})
+    del data['root/ui']
+    data['root/extra'] = {'blocks': [], 'connections': []}
+    write_container(path, data, root_path)
+
+    # The mapping now reads its undecoded entries from the rewritten file
+    assert not data.is_decoded('root/utils')
+    assert data['root/utils'] == DIRECTORIES['root/utils']
+
+    reloaded, _, _ = load_file(path)
+    assert sorted(reloaded) == ['root', 'root/extra', 'root/utils']
+    assert [b['id'] for b in reloaded['root']['blocks']] == ['a', 'c']
+    assert reloaded['root/utils'] == DIRECTORIES['root/utils']
+
+
+def test_unpack_packed_file(tmp_path):
+    packed_path = str(tmp_path / 'graph.cg')
+    plain_path = str(tmp_path / 'plain.cg')
+    write_container(packed_path, DIRECTORIES, '/project')
+
+    data, root_path, _ = load_file(packed_path)
+    write_json(plain_path, dict(data), root_path)
+
+    with open(plain_path, encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved.pop('_root_path') == '/project'
+    assert saved == DIRECTORIES
+
+
+def test_changed_on_disk_is_refused(tmp_path):
+    path = str(tmp_path / 'graph.cg')
+    write_container(path, DIRECTORIES, '/project')
+    data, _, _ = load_file(path)
+
+    write_container(path, {'other': {'blocks': [], 'connections': []}}, '/project')
+    with pytest.raises(ValueError):
+        data['root']
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="POSIX permission bits")
+def test_save_keeps_file_mode(tmp_path):
+    path = str(tmp_path / 'graph.cg')
+    write_json(path, DIRECTORIES, '/project')
+    os.chmod(path, 0o640)
+
+    data, root_path, _ = load_file(path)
+    write_container(path, data, root_path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+    new_path = str(tmp_path / 'new.cg')
+    write_container(new_path, DIRECTORIES, '/project')
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(new_path).st_mode) == 0o666 & ~umask
@@ -0,0 +1,54 @@
+import graphics.edge_router as edge_router
+from graphics.edge_router import EdgeRouter, _segment_rect, _simplify
+
+
+def crosses(points, rect):
+    """Whether any segment of a route passes through the inside of rect"""
+    for p, q in zip(points, points[1:]):
+        x1, y1, x2, y2 = _segment_rect(p, q)
+        if rect[0] < x2 and x1 < rect[2] and rect[1] < y2 and y1 < rect[3]:
+            return True
+    return False
+
+
+def walled_router():
+    router = EdgeRouter()
+    router.set_obstacle('source', (0, 0, 100, 50))
+    router.set_obstacle('target', (400, 0, 500, 50))
+    router.set_obstacle('wall', (200, -300, 260, 300))
+    return router
+
+
+def test_route_goes_around_a_block():
+    router = walled_router()
+    points = router.route('edge', (100, 25), 'right', (400, 25), 'left')
+
+    assert points[0] == (100, 25) and points[-1] == (400, 25)
+    assert not crosses(points, (200, -300, 260, 300))
+    # Orthogonal all the way
+    assert all(p[0] == q[0] or p[1] == q[1] for p, q in zip(points, points[1:]))
+
+
+def test_moving_a_block_invalidates_routes_through_it():
+    router = walled_router()
+    router.route('edge', (100, 25), 'right', (400, 25), 'left')
+
+    assert router.set_obstacle('wall', (200, 100, 260, 300)) == {'edge'}
+    assert router.route('edge', (100, 25), 'right', (400, 25), 'left') == [(100, 25), (400, 25)]
+    # A move far away leaves the cached route alone
+    assert router.set_obstacle('wall', (2000, 2000, 2060, 2200)) == set()
+
+
+def test_detour_when_the_search_runs_out(monkeypatch):
+    monkeypatch.setattr(edge_router, 'MAX_EXPANSIONS', 1)
+    monkeypatch.setattr(edge_router, 'RETRY_EXPANSIONS', 1)
+    router = walled_router()
+    points = router.route('edge', (100, 25), 'right', (400, 25), 'left')
+
+    assert not crosses(points, (200, -300, 260, 300))
+    assert points[0] == (100, 25) and points[-1] == (400, 25)
+
+
+def test_simplify_keeps_u_turns():
+    assert _simplify([(0, 0), (5, 0), (10, 0), (10, 0), (10, 5)]) == [(0, 0), (10, 0), (10, 5)]
+    assert _simplify([(0, 0), (10, 0), (4, 0)]) == [(0, 0), (10, 0), (4, 0)]
@@ -0,0 +1,71 @@
+import os
+
+from utils.module_resolver import ModuleResolver
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # Make every rewrite visible to (mtime_ns, size) fingerprints
+    stamp = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(stamp + 1_000_000_000, stamp + 1_000_000_000))
+
+
+def test_follows_package_reexport(tmp_path):
+    root = str(tmp_path)
+    write(os.path.join(root, 'pkg', '__init__.py'), 'from .impl import helper\n')
+    write(os.path.join(root, 'pkg', 'impl.py'), '\n\ndef helper():\n    pass\n')
+    write(os.path.join(root, 'main.py'), 'from pkg import helper\n')
+
+    resolver = ModuleResolver(root)
+    resolved = resolver.find_definition(os.path.join(root, 'main.py'), 'helper', 'function')
+
+    assert resolved.path == os.path.join(root, 'pkg', 'impl.py')
+    assert resolved.definition.line == 3
+    assert os.path.join(root, 'pkg', '__init__.py') in resolver.dependencies(
+        os.path.join(root, 'main.py'), 'helper', 'function')
+
+
+def test_edit_on_the_chain_is_picked_up(tmp_path):
+    root = str(tmp_path)
+    impl = os.path.join(root, 'impl.py')
+    write(impl, 'def helper():\n    pass\n')
+    write(os.path.join(root, 'main.py'), 'from impl import helper\n')
+
+    resolver = ModuleResolver(root)
+    main = os.path.join(root, 'main.py')
+    assert resolver.find_definition(main, 'helper', 'function').definition.line == 1
+
+    write(impl, '# moved down\n\n\ndef helper():\n    pass\n')
+    assert resolver.find_definition(main, 'helper', 'function').definition.line == 4
+
+
+def test_missing_module_created_later(tmp_path):
+    root = str(tmp_path)
+    main = os.path.join(root, 'main.py')
+    write(main, 'from later import helper\n')
+
+    resolver = ModuleResolver(root)
+    assert resolver.find_definition(main, 'helper', 'function') is None
+    assert resolver.resolve_module('later', 0, main) is None
+
+    write(os.path.join(root, 'later.py'), 'def helper():\n    pass\n')
+    resolved = resolver.find_definition(main, 'helper', 'function')
+    assert resolved is not None and resolved.path == os.path.join(root, 'later.py')
+
+
+def test_invalidate_drops_removed_module(tmp_path):
+    root = str(tmp_path)
+    main = os.path.join(root, 'main.py')
+    module = os.path.join(root, 'gone.py')
+    write(main, 'from gone import helper\n')
+    write(module, 'def helper():\n    pass\n')
+
+    resolver = ModuleResolver(root)
+    assert resolver.resolve_module('gone', 0, main) == module
+
+    os.remove(module)
+    resolver.invalidate([module])
+    assert resolver.resolve_module('gone', 0, main) is None
+    assert resolver.find_definition(main, 'helper', 'function') is None
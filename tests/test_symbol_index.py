@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from utils.symbol_index import SymbolIndex
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # Make every rewrite visible to the (mtime_ns, size) check
+    stamp = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(stamp + 1_000_000_000, stamp + 1_000_000_000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / 'project'
+    root.mkdir()
+    write(str(root / 'shapes.py'), 'class Circle:\n    pass\n\n\ndef area(shape):\n    return 0\n')
+    write(str(root / 'main.py'), 'from shapes import Circle\n\n\ndef run():\n    return Circle()\n')
+    index = SymbolIndex(str(root), db_path=str(tmp_path / 'index.cgindex'))
+    yield str(root), index
+    index.close()
+
+
+def test_search_finds_definitions_and_imports(project):
+    root, index = project
+
+    results = index.search('Circle', root, 'class')
+    assert [(r['file'], r['type']) for r in results] == [
+        ('shapes.py', 'definition'),
+        ('main.py', 'import'),
+    ]
+    assert index.search('area', root, 'function')[0]['line'] == 5
+
+
+def test_refresh_picks_up_changes(project):
+    root, index = project
+    index.build()
+    generation = index.generation
+    assert index.changed_since(generation) == set()
+
+    write(os.path.join(root, 'shapes.py'), 'def perimeter(shape):\n    return 0\n')
+    os.remove(os.path.join(root, 'main.py'))
+
+    assert index.search('area', root, 'function') == []
+    assert index.search('perimeter', root, 'function')[0]['line'] == 1
+    assert index.changed_since(generation) == {
+        os.path.join(root, 'shapes.py'), os.path.join(root, 'main.py')
+    }
+    assert dict(index.iter_definitions('function')) == {
+        'perimeter': (os.path.join(root, 'shapes.py'), 1)
+    }
+
+
+def test_prefilter_skipped_file_keeps_its_rows(project):
+    root, index = project
+    index.build()
+    shapes = os.path.join(root, 'shapes.py')
+
+    # The stale file doesn't mention the name, so it isn't parsed for this lookup
+    write(shapes, 'class Circle:\n    pass\n\n\ndef volume(shape):\n    return 0\n')
+    assert index.search('run', root, 'function')[0]['file'] == 'main.py'
+    assert index.prefilter_stats()['skipped'] == 1
+    assert ('area', (shapes, 5)) in index.iter_definitions('function')
+
+    # A lookup that needs it parses it
+    assert index.search('volume', root, 'function')[0]['file'] == 'shapes.py'
+    assert index.search('area', root, 'function') == []
+
+
+def test_build_limited_to_a_path(project):
+    root, index = project
+    assert index.build(path=os.path.join(root, 'shapes.py')) == 1
+    assert [d['name'] for d in index.definitions_under(root)] == ['Circle', 'area']
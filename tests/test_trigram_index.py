@@ -0,0 +1,33 @@
+from utils.trigram_index import TrigramIndex
+
+
+ENTRIES = [
+    ('render', ('view.py', 1)),
+    ('render_all', ('view.py', 9)),
+    ('prerender', ('cache.py', 3)),
+    ('parse_config', ('config.py', 5)),
+]
+
+
+def names(results):
+    return [name for name, _ in results]
+
+
+def test_search_tiers():
+    index = TrigramIndex(ENTRIES)
+
+    assert names(index.search('render')) == ['render', 'render_all', 'prerender']
+    assert names(index.search('config')) == ['parse_config']
+    assert names(index.search('rendr'))[0] == 'render'
+    assert index.search('   ') == []
+
+
+def test_updated_replaces_changed_files():
+    index = TrigramIndex(ENTRIES)
+    updated = index.updated({'view.py'}, [('render', ('view.py', 20)), ('redraw', ('view.py', 30))])
+
+    assert updated.search('render', limit=1) == [('render', [('view.py', 20)])]
+    assert 'render_all' not in names(updated.search('render'))
+    assert names(updated.search('redraw')) == ['redraw']
+    # The original keeps serving its own results
+    assert names(index.search('render')) == ['render', 'render_all', 'prerender']
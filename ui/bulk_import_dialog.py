@@ -0,0 +1,258 @@
+import os
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QCheckBox, QTreeWidget, QTreeWidgetItem,
+                             QTreeWidgetItemIterator, QDialogButtonBox, QFileDialog)
+from PyQt5.QtCore import Qt
+
+from ui.index_worker import IndexWorker
+
+
+class BulkImportDialog(QDialog):
+    """Pick a file or package and choose which of its symbols become blocks"""
+
+    def __init__(self, symbol_index, root_path, parent=None):
+        super().__init__(parent)
+
+        self.symbol_index = symbol_index
+        self.root_path = root_path
+        self.definitions = []
+        self.index_worker = None
+
+        self.setWindowTitle("Import File/Package as Blocks")
+        self.setMinimumSize(600, 500)
+
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialize UI"""
+        layout = QVBoxLayout()
+
+        # Source file or package
+        path_layout = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        self.path_edit.setReadOnly(True)
+        self.path_edit.setPlaceholderText("Choose a .py file or a package folder...")
+        path_layout.addWidget(self.path_edit)
+
+        file_btn = QPushButton("File...")
+        file_btn.clicked.connect(self.choose_file)
+        path_layout.addWidget(file_btn)
+
+        folder_btn = QPushButton("Folder...")
+        folder_btn.clicked.connect(self.choose_folder)
+        path_layout.addWidget(folder_btn)
+        layout.addLayout(path_layout)
+
+        # Filters
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name...")
+        self.filter_edit.textChanged.connect(self.populate)
+        filter_layout.addWidget(self.filter_edit)
+
+        self.private_check = QCheckBox("Include _private")
+        self.private_check.toggled.connect(self.populate)
+        filter_layout.addWidget(self.private_check)
+        layout.addLayout(filter_layout)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Symbol", "Location"])
+        self.tree.setColumnWidth(0, 300)
+        layout.addWidget(self.tree)
+
+        # Selection helpers
+        select_layout = QHBoxLayout()
+        select_all_btn = QPushButton("Select All")
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(Qt.Checked))
+        select_layout.addWidget(select_all_btn)
+
+        select_none_btn = QPushButton("Select None")
+        select_none_btn.clicked.connect(lambda: self.set_all_checked(Qt.Unchecked))
+        select_layout.addWidget(select_none_btn)
+
+        select_layout.addStretch()
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666;")
+        select_layout.addWidget(self.status_label)
+        layout.addLayout(select_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+        self.setLayout(layout)
+
+    def choose_file(self):
+        """Pick a single .py file"""
+        path, _ = QFileDialog.getOpenFileName(self, "Select Python File", self.root_path,
+                                              "Python Files (*.py)")
+        if path:
+            self.load_path(path)
+
+    def choose_folder(self):
+        """Pick a package or any folder of .py files"""
+        path = QFileDialog.getExistingDirectory(self, "Select Package Folder", self.root_path)
+        if path:
+            self.load_path(path)
+
+    def load_path(self, path):
+        """Bring the index up to date for path, then list its symbols"""
+        path = os.path.abspath(path)
+        if os.path.relpath(path, self.root_path).startswith('..'):
+            self.status_label.setText("Path must be inside the project root")
+            return
+
+        self.stop_worker()
+        self.path_edit.setText(path)
+        self.tree.clear()
+        self.status_label.setText("Indexing...")
+
+        worker = IndexWorker(self.symbol_index, parent=self, path=path)
+        self.index_worker = worker
+        worker.index_done.connect(
+            lambda reparsed, cancelled, w=worker, p=path: self.on_index_done(w, p, cancelled)
+        )
+        worker.start()
+
+    def on_index_done(self, worker, path, cancelled):
+        """List the symbols once the index covers path"""
+        worker.deleteLater()
+        if worker is not self.index_worker:
+            return
+        self.index_worker = None
+
+        if cancelled:
+            return
+
+        self.definitions = self.symbol_index.definitions_under(path)
+        self.populate()
+
+    def stop_worker(self):
+        """Cancel a running index build"""
+        worker = self.index_worker
+        if worker is not None:
+            self.index_worker = None
+            worker.cancel()
+            worker.wait()
+
+    def classify(self):
+        """Split definitions into functions, classes and methods per file.
+
+        Returns {file: [(definition, [method definitions]), ...]}, where
+        methods are only listed under their class.
+        """
+        by_file = {}
+        for definition in self.definitions:
+            by_file.setdefault(definition['file'], []).append(definition)
+
+        grouped = {}
+        for file_path, definitions in by_file.items():
+            classes = {}
+            entries = []
+
+            for definition in definitions:
+                parts = definition['qualname'].split('.')
+                if len(parts) == 1:
+                    methods = []
+                    entries.append((definition, methods))
+                    if definition['kind'] == 'class':
+                        classes[definition['qualname']] = methods
+                elif len(parts) == 2 and parts[0] in classes and definition['kind'] == 'function':
+                    classes[parts[0]].append(definition)
+                # Nested functions and inner classes have no block level
+
+            grouped[file_path] = entries
+
+        return grouped
+
+    def populate(self):
+        """Rebuild the tree from the loaded definitions and filters"""
+        self.tree.clear()
+
+        text = self.filter_edit.text().strip().lower()
+        include_private = self.private_check.isChecked()
+
+        def visible(definition):
+            name = definition['name']
+            dunder = name.startswith('__') and name.endswith('__')
+            if not include_private and name.startswith('_') and not dunder:
+                return False
+            return not text or text in name.lower()
+
+        count = 0
+        self.tree.setUpdatesEnabled(False)
+
+        for file_path, entries in self.classify().items():
+            file_item = None
+
+            for definition, methods in entries:
+                shown_methods = [m for m in methods if visible(m)]
+                if not visible(definition) and not shown_methods:
+                    continue
+
+                if file_item is None:
+                    file_item = QTreeWidgetItem(self.tree, [f"📄 {file_path}", ""])
+                    file_item.setFlags(file_item.flags() | Qt.ItemIsUserCheckable
+                                       | Qt.ItemIsAutoTristate)
+                    file_item.setCheckState(0, Qt.Checked)
+                    file_item.setExpanded(True)
+
+                block_type = 'CLASS' if definition['kind'] == 'class' else 'FUNCTION'
+                symbol_item = self.make_item(file_item, definition, block_type)
+                count += 1
+
+                for method in shown_methods:
+                    self.make_item(symbol_item, method, 'METHOD')
+                    count += 1
+
+        self.tree.setUpdatesEnabled(True)
+        self.status_label.setText(f"{count} symbol(s)")
+
+    def make_item(self, parent_item, definition, block_type):
+        icons = {'FUNCTION': '⚡', 'CLASS': '🟡', 'METHOD': '🟣'}
+
+        item = QTreeWidgetItem(parent_item, [
+            f"{icons[block_type]} {definition['name']}",
+            f"{definition['file']}:{definition['line']}"
+        ])
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(0, Qt.Checked)
+        item.setData(0, Qt.UserRole, (block_type, definition))
+        return item
+
+    def set_all_checked(self, state):
+        iterator = QTreeWidgetItemIterator(self.tree)
+        while iterator.value():
+            iterator.value().setCheckState(0, state)
+            iterator += 1
+
+    def selected_symbols(self):
+        """Checked symbols as [(block_type, definition, [method definitions])].
+
+        A class is included whenever it or one of its methods is checked,
+        since methods live inside their class.
+        """
+        selected = []
+
+        for i in range(self.tree.topLevelItemCount()):
+            file_item = self.tree.topLevelItem(i)
+            for j in range(file_item.childCount()):
+                symbol_item = file_item.child(j)
+                block_type, definition = symbol_item.data(0, Qt.UserRole)
+
+                methods = [
+                    symbol_item.child(k).data(0, Qt.UserRole)[1]
+                    for k in range(symbol_item.childCount())
+                    if symbol_item.child(k).checkState(0) == Qt.Checked
+                ]
+
+                if symbol_item.checkState(0) == Qt.Checked or methods:
+                    selected.append((block_type, definition, methods))
+
+        return selected
+
+    def done(self, result):
+        self.stop_worker()
+        super().done(result)
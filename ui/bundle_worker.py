@@ -0,0 +1,23 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from graphics.edge_bundler import bundle_edges
+
+
+class BundleWorker(QThread):
+    """Clusters connection end points into bundles off the GUI thread"""
+
+    bundles_ready = pyqtSignal(object, int)  # (hubs, from_hub, to_hub), bundling generation
+
+    def __init__(self, segments, generation, parent=None):
+        super().__init__(parent)
+
+        self.segments = segments
+        self.generation = generation
+
+    def run(self):
+        try:
+            result = bundle_edges(self.segments)
+        except Exception as e:
+            print(f"Error bundling connections: {e}")
+            return
+        self.bundles_ready.emit(result, self.generation)
@@ -1,9 +1,9 @@
-from PyQt5.QtWidgets import (QGraphicsScene, QGraphicsRectItem,
+from PyQt5.QtWidgets import (QGraphicsScene,
                              QGraphicsTextItem, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QComboBox, QColorDialog, QSplitter,
                              QTextEdit, QFrame)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPen, QBrush, QColor, QFont
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QFont
 
 
 
@@ -13,11 +13,21 @@ from PyQt5.QtGui import QPen, QBrush, QColor, QFont
 from graphics.directory_view import DirectoryGraphView
 from graphics.connection import Connection
 from graphics.code_block import CodeBlock
+from graphics.edge_router import EdgeRouter
+from graphics.edge_bundler import EdgeBundleItem
+from graphics.virtual_scene import (SpatialGrid, BlockRecord, rect_tuple,
+                                    MATERIALIZE_BATCH)
 
 
 
 
 from commands.graph_commands import AddConnectionCommand,ChangeBlockStyleCommand
+from ui.docstring_loader import DocstringLoader
+from ui.bundle_worker import BundleWorker
+
+
+# Free space kept around blocks when the scene rect grows
+SCENE_MARGIN = 500
 
 
 
@@ -39,6 +49,46 @@ class DirectoryTab(QWidget):
         self.parent_callback = parent_callback
         self.blocks = []
         self.connections = []
+        self.block_connections = {}  # block -> connections touching it, kept in step with connections
+        self.blocks_by_id = {}  # block_id -> block in self.blocks
+        
+        # Virtualized tabs (large maps) only keep blocks near the viewport in
+        # the scene. The rest are saved-data records never turned into items,
+        # or parked CodeBlocks taken out of the scene; both sit in virtual_grid.
+        self.virtualized = False
+        self.block_records = {}  # block_id -> block data
+        self.parked_blocks = {}  # block_id -> CodeBlock
+        self.virtual_grid = SpatialGrid()  # block_id -> rect of records and parked blocks
+        self.dormant_connections = {}  # key -> connection data or parked Connection
+        self.dormant_by_block = {}  # block_id -> keys of its dormant connections
+        self.dormant_counter = 0
+        self.unfollowed_blocks = set()  # Live block ids whose dormant connections weren't woken
+        self.virtual_timer = QTimer(self)
+        self.virtual_timer.setSingleShot(True)
+        self.virtual_timer.setInterval(0)
+        self.virtual_timer.timeout.connect(self.update_virtual_items)
+        
+        # Connections whose blocks moved; re-routed once per event loop pass
+        self.dirty_connections = set()
+        self.edge_update_timer = QTimer(self)
+        self.edge_update_timer.setSingleShot(True)
+        self.edge_update_timer.setInterval(0)
+        self.edge_update_timer.timeout.connect(self.flush_dirty_connections)
+        
+        # 'curved' (bezier), 'orthogonal' (routed around blocks) or 'bundled'
+        self.routing_mode = 'curved'
+        self.edge_router = EdgeRouter()
+        
+        # Bundled mode: one item draws every connection; re-clustered once moves settle
+        self.edge_bundle = None
+        self.bundle_generation = 0
+        self.bundle_workers = set()
+        self.bundle_timer = QTimer(self)
+        self.bundle_timer.setSingleShot(True)
+        self.bundle_timer.setInterval(150)
+        self.bundle_timer.timeout.connect(self.start_bundling)
+        self.bundle_pending = set()  # Moved connections the bundle hasn't followed yet
+        self.drag_in_progress = False
         
         self.active_connection_point = None
         
@@ -46,6 +96,10 @@ class DirectoryTab(QWidget):
         self.current_line_style = 'solid'
         self.current_line_color = QColor(100, 100, 100)  # Default gray
         
+        self.info_block = None  # Block currently shown in the info panel
+        self.docstring_loader = DocstringLoader(parent_window, self)
+        self.docstring_loader.docstring_ready.connect(self.on_docstring_ready)
+        
         self.init_ui()
     
     def showEvent(self, event):
@@ -53,6 +107,11 @@ class DirectoryTab(QWidget):
         super().showEvent(event)
         # Sync the panel state whenever this tab is shown
         self._sync_panel_state()
+        self.schedule_virtual_update()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_virtual_update()
     
     def _sync_panel_state(self):
         """Synchronize panel visibility and splitter with global state"""
@@ -111,6 +170,20 @@ class DirectoryTab(QWidget):
         
         toolbar_layout.addSpacing(10)
         
+        route_label = QLabel("Route:")
+        toolbar_layout.addWidget(route_label)
+        
+        self.route_combo = QComboBox()
+        self.route_combo.addItem("⤳ Curved", "curved")
+        self.route_combo.addItem("⊾ Orthogonal", "orthogonal")
+        self.route_combo.addItem("⫘ Bundled", "bundled")
+        self.route_combo.setToolTip("Orthogonal edges are routed around blocks; "
+                                    "bundled edges with nearby ends share one path")
+        self.route_combo.currentIndexChanged.connect(self.on_routing_mode_changed)
+        toolbar_layout.addWidget(self.route_combo)
+        
+        toolbar_layout.addSpacing(10)
+        
         # Color picker
         color_label = QLabel("Color:")
         toolbar_layout.addWidget(color_label)
@@ -138,7 +211,7 @@ class DirectoryTab(QWidget):
         # Validate button
         validate_btn = QPushButton("🔍 Validate Blocks")
         validate_btn.setToolTip("Check if all blocks exist in filesystem")
-        validate_btn.clicked.connect(self.parent_window.validate_all_blocks)
+        validate_btn.clicked.connect(lambda: self.parent_window.validate_all_blocks())
         toolbar_layout.addWidget(validate_btn)
         
         toolbar_layout.addSpacing(10)
@@ -183,11 +256,17 @@ class DirectoryTab(QWidget):
         
         # Canvas area
         self.scene = QGraphicsScene()
+        # Starts at the default canvas and grows as blocks are placed beyond it
         self.scene.setSceneRect(0, 0, 3000, 3000)
         
         self.draw_directory_boundary()
         
         self.view = DirectoryGraphView(self.scene, self.parent_window)
+        self.scene.sceneRectChanged.connect(lambda rect: self.view.resetCachedContent())
+        
+        # Panning and zooming bring virtualized blocks in and out of the scene
+        self.view.horizontalScrollBar().valueChanged.connect(self.schedule_virtual_update)
+        self.view.verticalScrollBar().valueChanged.connect(self.schedule_virtual_update)
         
         # Connect selection changed to update info panel
         self.scene.selectionChanged.connect(self.on_selection_changed)
@@ -346,16 +425,22 @@ class DirectoryTab(QWidget):
         else:
             self.info_file_label.hide()
 
+        self.info_block = block
+        
         # Update docstring/description
         if block.block_type in ['FUNCTION', 'METHOD', 'CLASS']:
-            docstring = self.parent_window.extract_docstring(block)
-            if docstring:
-                self.info_text.setPlainText(docstring)
-                self.info_text.setStyleSheet("")
+            found, docstring = self.docstring_loader.cached(block)
+            if found:
+                self.docstring_loader.cancel()
+                self.show_docstring(docstring)
             else:
-                self.info_text.setPlainText("No docstring available.")
+                # Parsing can be slow on big files; load in the background
+                self.info_text.setPlainText("Loading…")
                 self.info_text.setStyleSheet("color: #999; font-style: italic;")
+                self.docstring_loader.request(block)
         else:
+            self.docstring_loader.cancel()
+            
             # Show description for subdirectories
             description = block.metadata.get('description', '')
             if description:
@@ -366,8 +451,25 @@ class DirectoryTab(QWidget):
                 self.info_text.setStyleSheet("color: #999; font-style: italic;")
 
     
+    def show_docstring(self, docstring):
+        """Show a loaded docstring in the info panel"""
+        if docstring:
+            self.info_text.setPlainText(docstring)
+            self.info_text.setStyleSheet("")
+        else:
+            self.info_text.setPlainText("No docstring available.")
+            self.info_text.setStyleSheet("color: #999; font-style: italic;")
+    
+    def on_docstring_ready(self, block_id, docstring):
+        """Background docstring lookup finished"""
+        if self.info_block is not None and self.info_block.block_id == block_id:
+            self.show_docstring(docstring)
+    
     def clear_info_panel(self):
         """Clear info panel when nothing is selected"""
+        self.info_block = None
+        self.docstring_loader.cancel()
+        
         self.info_name_label.setText("<i>No block selected</i>")
         self.info_name_label.setStyleSheet("font-size: 13px; color: #666;")
         self.info_type_label.setText("")
@@ -378,14 +480,17 @@ class DirectoryTab(QWidget):
     def zoom_in(self):
         """Zoom in"""
         self.view.scale(1.2, 1.2)
+        self.schedule_virtual_update()
     
     def zoom_out(self):
         """Zoom out"""
         self.view.scale(1/1.2, 1/1.2)
+        self.schedule_virtual_update()
     
     def zoom_reset(self):
         """Reset zoom"""
         self.view.resetTransform()
+        self.schedule_virtual_update()
     
     def on_flow_type_changed(self, index):
         """Handle flow type change"""
@@ -397,6 +502,95 @@ class DirectoryTab(QWidget):
                 item.set_flow_type(self.current_flow_type)
                 self.parent_window.statusBar().showMessage(f'Flow: {self.flow_combo.currentText()}')
     
+    def on_routing_mode_changed(self, index):
+        """Handle routing mode change"""
+        self.set_routing_mode(self.route_combo.itemData(index))
+        self.parent_window.statusBar().showMessage(f'Route: {self.route_combo.currentText()}')
+    
+    def set_routing_mode(self, mode):
+        """Switch every connection of this tab between curves and orthogonal routes"""
+        self.routing_mode = mode
+        
+        index = self.route_combo.findData(mode)
+        if index >= 0 and index != self.route_combo.currentIndex():
+            self.route_combo.blockSignals(True)
+            self.route_combo.setCurrentIndex(index)
+            self.route_combo.blockSignals(False)
+        
+        # Obstacles are only tracked while routing orthogonally
+        self.edge_router.clear()
+        if mode == 'orthogonal':
+            for block in self.blocks:
+                self.update_block_obstacle(block)
+        
+        if mode == 'bundled':
+            for conn in self.connections:
+                conn.setVisible(False)
+            if self.edge_bundle is None:
+                self.edge_bundle = EdgeBundleItem()
+                self.scene.addItem(self.edge_bundle)
+        else:
+            if self.edge_bundle is not None:
+                self.scene.removeItem(self.edge_bundle)
+                self.edge_bundle = None
+            self.bundle_timer.stop()
+            self.bundle_pending = set()
+            self.bundle_generation += 1  # Ignore bundling still running
+            for conn in self.connections:
+                conn.setVisible(True)
+        
+        self.queue_connections(self.connections)
+    
+    def begin_block_drag(self):
+        self.drag_in_progress = True
+    
+    def end_block_drag(self):
+        """Let the bundle catch up with everything moved during the drag"""
+        self.drag_in_progress = False
+        if self.bundle_pending:
+            self.update_bundle()
+    
+    def update_bundle(self):
+        """Move the bundle's ends for the pending connections and re-cluster soon"""
+        pending = self.bundle_pending
+        self.bundle_pending = set()
+        if self.edge_bundle is not None:
+            self.edge_bundle.update_endpoints(pending)
+        self.schedule_bundling()
+    
+    def schedule_bundling(self):
+        """Re-cluster the bundles once blocks stop moving"""
+        self.bundle_generation += 1  # Results for the old layout are dropped
+        self.bundle_timer.start()
+    
+    def start_bundling(self):
+        """Cluster the current connection end points in a background thread"""
+        if self.edge_bundle is None:
+            return
+        
+        connections = list(self.connections)
+        segments = [EdgeBundleItem.endpoints(conn) for conn in connections]
+        
+        self.bundle_generation += 1
+        worker = BundleWorker(segments, self.bundle_generation, self)
+        self.bundle_workers.add(worker)
+        worker.bundles_ready.connect(
+            lambda result, generation, c=connections, s=segments: self.on_bundles_ready(result, generation, c, s)
+        )
+        worker.finished.connect(lambda w=worker: self.on_bundle_worker_finished(w))
+        worker.start()
+    
+    def on_bundles_ready(self, result, generation, connections, segments):
+        """Show a finished bundling unless the layout changed meanwhile"""
+        if generation != self.bundle_generation or self.edge_bundle is None:
+            return
+        hubs, from_hub, to_hub = result
+        self.edge_bundle.set_bundles(connections, segments, hubs, from_hub, to_hub)
+    
+    def on_bundle_worker_finished(self, worker):
+        self.bundle_workers.discard(worker)
+        worker.deleteLater()
+    
     def on_line_style_changed(self, index):
         """Handle line style change"""
         self.current_line_style = self.line_combo.itemData(index)
@@ -472,13 +666,7 @@ class DirectoryTab(QWidget):
 
     
     def draw_directory_boundary(self):
-        """Draw the directory block"""
-        dir_rect = QGraphicsRectItem(0, 0, 3000, 3000)
-        dir_rect.setBrush(QBrush(QColor(74, 144, 226, 30)))
-        dir_rect.setPen(QPen(QColor(74, 144, 226, 100), 3, Qt.DashLine))
-        dir_rect.setZValue(-1)
-        self.scene.addItem(dir_rect)
-        
+        """Draw the directory label; the boundary itself is the view's background"""
         dir_label = QGraphicsTextItem(f"📁 {self.directory_path}")
         dir_label.setDefaultTextColor(QColor(74, 144, 226))
         font = QFont("Arial", 14, QFont.Bold)
@@ -497,6 +685,7 @@ class DirectoryTab(QWidget):
         elif self.active_connection_point == connection_point:
             self.active_connection_point.set_active(False)
             self.active_connection_point = None
+            connection_point.parent_block.update_decorations()
             self.parent_window.statusBar().showMessage('Connection cancelled')
         
         else:
@@ -524,6 +713,7 @@ class DirectoryTab(QWidget):
             
             from_point.set_active(False)
             self.active_connection_point = None
+            from_point.parent_block.update_decorations()
             
             self.parent_window.statusBar().showMessage('Connection created!')
     
@@ -544,8 +734,286 @@ class DirectoryTab(QWidget):
         )
         self.scene.addItem(block)
         self.blocks.append(block)
+        self.blocks_by_id[block.block_id] = block
+        self.grow_scene_rect(block.sceneBoundingRect())
+        self.update_block_obstacle(block)
         return block
     
+    def update_block_obstacle(self, block):
+        """Move a block's rect in the edge router and queue the routes it now affects"""
+        if self.routing_mode != 'orthogonal':
+            return
+        rect = block.sceneBoundingRect()
+        affected = self.edge_router.set_obstacle(
+            block, (rect.left(), rect.top(), rect.right(), rect.bottom())
+        )
+        self.queue_connections(affected)
+    
+    def block_removed(self, block):
+        """Forget a block the caller took out of the tab.
+
+        Drops it from the edge router (routes around it are redone), the id
+        map and the virtual scene, along with its dormant connections.
+        """
+        self.queue_connections(self.edge_router.remove_obstacle(block))
+        
+        block_id = block.block_id
+        if self.blocks_by_id.get(block_id) is block:
+            del self.blocks_by_id[block_id]
+        if self.parked_blocks.get(block_id) is block:
+            del self.parked_blocks[block_id]
+            self.virtual_grid.remove(block_id)
+        self.unfollowed_blocks.discard(block_id)
+        for key in list(self.dormant_by_block.get(block_id, ())):
+            self.drop_dormant_connection(key)
+    
+    def discard_block(self, block_id):
+        """Remove a block by id, whether it is live, parked or still a record"""
+        if block_id in self.block_records:
+            del self.block_records[block_id]
+            self.virtual_grid.remove(block_id)
+            for key in list(self.dormant_by_block.get(block_id, ())):
+                self.drop_dormant_connection(key)
+            return
+        
+        block = self.blocks_by_id.get(block_id) or self.parked_blocks.get(block_id)
+        if block is None:
+            return
+        if block in self.blocks:
+            self.blocks.remove(block)
+        for conn in self.connections_for(block):
+            if conn.scene():
+                self.scene.removeItem(conn)
+            self.detach_connection(conn)
+        if block.scene():
+            self.scene.removeItem(block)
+        self.block_removed(block)
+    
+    def all_blocks(self):
+        """Every block of the tab: live and parked CodeBlocks, then BlockRecords"""
+        return (self.blocks + list(self.parked_blocks.values())
+                + [BlockRecord(data) for data in self.block_records.values()])
+    
+    def block_count(self):
+        return len(self.blocks) + len(self.parked_blocks) + len(self.block_records)
+    
+    # -- Viewport virtualization -------------------------------------------
+    
+    def load_virtual(self, blocks_data, connections_data):
+        """Keep a large map as records; items are created as the view reaches them"""
+        self.virtualized = True
+        
+        for block_data in blocks_data:
+            self.block_records[block_data['id']] = block_data
+            rect = BlockRecord(block_data).sceneBoundingRect()
+            self.virtual_grid.insert(block_data['id'], rect_tuple(rect))
+            self.grow_scene_rect(rect)
+        
+        for conn_data in connections_data:
+            if conn_data['from'] in self.block_records and conn_data['to'] in self.block_records:
+                self.add_dormant_connection(conn_data)
+        
+        self.schedule_virtual_update()
+    
+    def schedule_virtual_update(self, *args):
+        if self.virtualized and not self.virtual_timer.isActive():
+            self.virtual_timer.start()
+    
+    def update_virtual_items(self):
+        """Create items near the viewport and park the ones that drifted far away"""
+        if not self.virtualized or not self.isVisible():
+            return
+        
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        margin = max(visible.width(), visible.height()) / 2
+        near = visible.adjusted(-margin, -margin, margin, margin)
+        # Parking uses a wider rect, so blocks at the edge don't flicker in and out
+        keep = near.adjusted(-margin, -margin, margin, margin)
+        
+        budget = MATERIALIZE_BATCH
+        for block_id in self.virtual_grid.query(rect_tuple(near)):
+            if budget <= 0:
+                break
+            budget -= self.wake_block(block_id, follow=True)
+        
+        for block_id in list(self.unfollowed_blocks):
+            if budget <= 0:
+                break
+            block = self.blocks_by_id.get(block_id)
+            if block is not None and near.intersects(block.sceneBoundingRect()):
+                budget -= self.follow_block(block_id)
+        
+        if budget <= 0:
+            self.virtual_timer.start()  # More to create; continue next pass
+            return
+        
+        for block in list(self.blocks):
+            if self.can_park(block, keep):
+                self.park_block(block)
+    
+    def wake_block(self, block_id, follow):
+        """Bring a record or parked block into the scene; returns items created.
+
+        With follow, blocks at the other end of its connections are woken
+        too (without following theirs), so its connections can be shown.
+        """
+        created = 0
+        block = self.parked_blocks.pop(block_id, None)
+        if block is not None:
+            self.virtual_grid.remove(block_id)
+            self.scene.addItem(block)
+            self.blocks.append(block)
+            self.blocks_by_id[block_id] = block
+            self.update_block_obstacle(block)
+            block.update_decorations()
+            created += 1
+        elif block_id in self.block_records:
+            self.virtual_grid.remove(block_id)
+            block = self.add_block(self.block_records.pop(block_id))
+            self.parent_window.connect_block_handlers(block)
+            created += 1
+        elif block_id not in self.blocks_by_id:
+            return 0
+        
+        if follow:
+            created += self.follow_block(block_id)
+        elif self.dormant_by_block.get(block_id):
+            self.unfollowed_blocks.add(block_id)
+        return created
+    
+    def follow_block(self, block_id):
+        """Wake the far ends of a live block's dormant connections and show them"""
+        self.unfollowed_blocks.discard(block_id)
+        created = 0
+        for key in list(self.dormant_by_block.get(block_id, ())):
+            from_id, to_id = self.dormant_ends(self.dormant_connections[key])
+            other_id = to_id if from_id == block_id else from_id
+            created += self.wake_block(other_id, follow=False)
+            created += self.revive_connection(key)
+        return created
+    
+    def can_park(self, block, keep):
+        """Whether a live block and everything it connects to is out of range"""
+        if block.isSelected() or block.is_dragging:
+            return False
+        active_point = self.active_connection_point
+        if active_point is not None and active_point.parent_block is block:
+            return False
+        if keep.intersects(block.sceneBoundingRect()):
+            return False
+        for conn in self.connections_for(block):
+            other = conn.to_block if conn.from_block is block else conn.from_block
+            if keep.intersects(other.sceneBoundingRect()):
+                return False
+        return True
+    
+    def park_block(self, block):
+        """Take a far away block and its connections out of the scene, keeping the items"""
+        for conn in self.connections_for(block):
+            if conn.scene():
+                self.scene.removeItem(conn)
+            self.detach_connection(conn)
+            self.add_dormant_connection(conn)
+        
+        if self.info_block is block:
+            self.clear_info_panel()
+        
+        self.blocks.remove(block)
+        del self.blocks_by_id[block.block_id]
+        self.unfollowed_blocks.discard(block.block_id)
+        self.scene.removeItem(block)
+        self.queue_connections(self.edge_router.remove_obstacle(block))
+        
+        self.parked_blocks[block.block_id] = block
+        self.virtual_grid.insert(block.block_id, rect_tuple(block.sceneBoundingRect()))
+    
+    def dormant_ends(self, entry):
+        """(from id, to id) of a dormant connection"""
+        if isinstance(entry, Connection):
+            return entry.from_block.block_id, entry.to_block.block_id
+        return entry['from'], entry['to']
+    
+    def add_dormant_connection(self, entry):
+        """Keep connection data or a parked Connection until both its blocks are live"""
+        if isinstance(entry, Connection):
+            key = entry  # Same item comes back, so undo commands holding it stay valid
+        else:
+            self.dormant_counter += 1
+            key = self.dormant_counter
+        
+        self.dormant_connections[key] = entry
+        for block_id in self.dormant_ends(entry):
+            self.dormant_by_block.setdefault(block_id, set()).add(key)
+    
+    def dormant_connection_data(self, block_id):
+        """Saved data of a block's dormant connections, e.g. for undoing its deletion"""
+        data = []
+        for key in self.dormant_by_block.get(block_id, ()):
+            entry = self.dormant_connections[key]
+            data.append(self.connection_data(entry) if isinstance(entry, Connection) else dict(entry))
+        return data
+    
+    def restore_dormant_connections(self, block_id, connections_data):
+        """Re-add dormant connections of a restored block; they show once it is near the view"""
+        for conn_data in connections_data:
+            self.add_dormant_connection(dict(conn_data))
+        if connections_data and block_id in self.blocks_by_id:
+            self.unfollowed_blocks.add(block_id)
+            self.schedule_virtual_update()
+    
+    def drop_dormant_connection(self, key):
+        entry = self.dormant_connections.pop(key, None)
+        if entry is None:
+            return
+        for block_id in self.dormant_ends(entry):
+            keys = self.dormant_by_block.get(block_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.dormant_by_block[block_id]
+    
+    def revive_connection(self, key):
+        """Show a dormant connection once both its blocks are live; returns items created"""
+        entry = self.dormant_connections.get(key)
+        if entry is None:
+            return 0
+        from_id, to_id = self.dormant_ends(entry)
+        from_block = self.blocks_by_id.get(from_id)
+        to_block = self.blocks_by_id.get(to_id)
+        if from_block is None or to_block is None:
+            return 0
+        
+        self.drop_dormant_connection(key)
+        if isinstance(entry, Connection):
+            self.scene.addItem(entry)
+            self.attach_connection(entry)
+            entry.update_path()
+        else:
+            self.add_connection_from_data(from_block, to_block, entry)
+        return 1
+    
+    def add_connection_from_data(self, from_block, to_block, conn_data):
+        """Add a connection described by saved data"""
+        from_side = conn_data.get('from_side', 'right')
+        to_side = conn_data.get('to_side', 'left')
+        flow_type = conn_data.get('flow_type', 'one_way')
+        line_style = conn_data.get('line_style', 'solid')
+        line_color_data = conn_data.get('line_color', {'r': 100, 'g': 100, 'b': 100})
+        line_color = QColor(line_color_data['r'], line_color_data['g'], line_color_data['b'])
+        return self.add_connection(from_block, to_block, from_side, to_side, flow_type, line_style, line_color)
+    
+    def grow_scene_rect(self, rect):
+        """Extend the scene rect so rect plus a margin fits inside it"""
+        wanted = rect.adjusted(-SCENE_MARGIN, -SCENE_MARGIN, SCENE_MARGIN, SCENE_MARGIN)
+        current = self.scene.sceneRect()
+        if not current.contains(wanted):
+            self.scene.setSceneRect(current.united(wanted))
+    
+    def scene_rect_changed(self):
+        """Bring the view up to date with a scene rect grown while scene signals were blocked"""
+        self.view.updateSceneRect(self.scene.sceneRect())
+        self.view.resetCachedContent()
+    
     def add_connection(self, from_block, to_block, from_side='right', to_side='left', 
                       flow_type='one_way', line_style='solid', line_color=None):
         """Add a connection between blocks"""
@@ -553,31 +1021,104 @@ class DirectoryTab(QWidget):
             line_color = QColor(100, 100, 100)  # Default gray
         conn = Connection(from_block, to_block, from_side, to_side, flow_type, line_style, line_color)
         self.scene.addItem(conn)
-        self.connections.append(conn)
+        self.attach_connection(conn)
         return conn
     
+    def attach_connection(self, conn):
+        """Register a connection in the connection list and the per-block index"""
+        # Undo can restore a connection to a block that was parked meanwhile
+        for block in (conn.from_block, conn.to_block):
+            if block.block_id in self.parked_blocks:
+                self.wake_block(block.block_id, follow=False)
+        
+        self.connections.append(conn)
+        if self.routing_mode == 'bundled':
+            conn.setVisible(False)
+            self.schedule_bundling()
+        self.block_connections.setdefault(conn.from_block, []).append(conn)
+        if conn.to_block is not conn.from_block:
+            self.block_connections.setdefault(conn.to_block, []).append(conn)
+    
+    def detach_connection(self, conn):
+        """Unregister a connection; removing its graphics is up to the caller"""
+        if conn in self.connections:
+            self.connections.remove(conn)
+        self.edge_router.forget_route(conn)
+        self.drop_dormant_connection(conn)
+        if self.routing_mode == 'bundled':
+            self.schedule_bundling()
+        for block in (conn.from_block, conn.to_block):
+            attached = self.block_connections.get(block)
+            if attached and conn in attached:
+                attached.remove(conn)
+                if not attached:
+                    del self.block_connections[block]
+    
+    def connections_for(self, block):
+        """Connections starting or ending at block"""
+        return list(self.block_connections.get(block, ()))
+    
+    def mark_connections_dirty(self, block):
+        """Queue the connections of a moved or resized block for one re-route"""
+        self.update_block_obstacle(block)
+        attached = self.block_connections.get(block)
+        if attached:
+            self.queue_connections(attached)
+    
+    def queue_connections(self, connections):
+        """Re-route the given connections on the next event loop pass"""
+        if not connections:
+            return
+        self.dirty_connections.update(connections)
+        if not self.edge_update_timer.isActive():
+            self.edge_update_timer.start()
+    
+    def flush_dirty_connections(self):
+        """Re-route every queued connection once, however many of its blocks moved"""
+        dirty = self.dirty_connections
+        self.dirty_connections = set()
+        
+        if self.routing_mode == 'bundled':
+            # Connections are hidden. Rebuilding the bundle is O(E), so during
+            # a drag it waits for the release instead of running every frame
+            self.bundle_pending |= dirty
+            if not self.drag_in_progress:
+                self.update_bundle()
+            return
+        
+        for conn in dirty:
+            if conn.scene():
+                conn.update_path()
+    
     def get_data(self):
-        """Get all blocks and connections as data"""
+        """Get all blocks and connections as data, including ones not in the scene"""
+        connections = self.connections + [
+            entry for entry in self.dormant_connections.values() if isinstance(entry, Connection)
+        ]
         return {
-            'blocks': [block.to_dict() for block in self.blocks],
-            'connections': [
-                {
-                    'from': conn.from_block.block_id,
-                    'to': conn.to_block.block_id,
-                    'from_side': conn.from_side,
-                    'to_side': conn.to_side,
-                    'flow_type': conn.flow_type,
-                    'line_style': conn.line_style,
-                    'line_color': {
-                        'r': conn.line_color.red(),
-                        'g': conn.line_color.green(),
-                        'b': conn.line_color.blue()
-                    }
-                }
-                for conn in self.connections
+            'routing': self.routing_mode,
+            'blocks': [block.to_dict() for block in self.all_blocks()],
+            'connections': [self.connection_data(conn) for conn in connections] + [
+                entry for entry in self.dormant_connections.values() if not isinstance(entry, Connection)
             ]
         }
     
+    def connection_data(self, conn):
+        """A connection as saved data"""
+        return {
+            'from': conn.from_block.block_id,
+            'to': conn.to_block.block_id,
+            'from_side': conn.from_side,
+            'to_side': conn.to_side,
+            'flow_type': conn.flow_type,
+            'line_style': conn.line_style,
+            'line_color': {
+                'r': conn.line_color.red(),
+                'g': conn.line_color.green(),
+                'b': conn.line_color.blue()
+            }
+        }
+    
     def on_add_function_clicked(self):
         """Handle Add Function/Method button click"""
         # Add function
@@ -589,18 +1130,13 @@ class DirectoryTab(QWidget):
         
         if self.show_connections:
             self.toggle_connections_btn.setText("Hide Connections")
-            # Show all connection points on all blocks
-            for block in self.blocks:
-                for point in block.connection_points.values():
-                    point.setVisible(True)
         else:
             self.toggle_connections_btn.setText("Show Connections")
-            # Hide all connection points on all blocks
-            for block in self.blocks:
-                for point in block.connection_points.values():
-                    # Hide unless it's red/waiting or parent block is selected
-                    if not block.isSelected():
-                        point.setVisible(False)
+        
+        # Points are created on every block, or released again unless
+        # the block is selected or holds the start of a pending connection
+        for block in self.blocks:
+            block.update_decorations()
         
         self.parent_window.statusBar().showMessage(
             f"Connection points {'visible' if self.show_connections else 'hidden'}"
@@ -0,0 +1,140 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+def _fingerprint(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+class _DocstringSignals(QObject):
+    # token, block id, cache key, file fingerprints, docstring
+    finished = pyqtSignal(int, object, object, object, object)
+
+
+class _DocstringTask(QRunnable):
+    """Runs one docstring lookup on the global thread pool"""
+
+    def __init__(self, lookup, resolver, token, block_id, key, block_type, metadata, signals):
+        super().__init__()
+
+        self.lookup = lookup
+        self.resolver = resolver
+        self.token = token
+        self.block_id = block_id
+        self.key = key
+        self.block_type = block_type
+        self.metadata = metadata
+        self.signals = signals
+
+    def run(self):
+        docstring = None
+        _, file_path, name, kind = self.key
+        # Taken before the lookup, so an edit during it makes the entry stale
+        fingerprints = {file_path: _fingerprint(file_path)}
+        try:
+            docstring = self.lookup(self.block_type, self.metadata, self.resolver)
+            fingerprints.update(self.resolver.dependencies(file_path, name, kind))
+        except Exception as e:
+            print(f"Error loading docstring: {e}")
+        self.signals.finished.emit(self.token, self.block_id, self.key, fingerprints, docstring)
+
+
+class DocstringLoader(QObject):
+    """Loads block docstrings off the GUI thread for the info panel.
+
+    Requests are debounced so fast selection changes only look up the block
+    that ends up selected. Every request gets a token; answers carrying an
+    older token are dropped. Docstrings are cached per block id together
+    with the (mtime_ns, size) of every file on the import chain that led to
+    the definition, so editing the module an import points to is noticed.
+    """
+
+    docstring_ready = pyqtSignal(object, object)  # block id, docstring
+
+    DEBOUNCE_MS = 120
+    MAX_CACHED = 512
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+
+        self.main_window = main_window
+
+        self._cache = OrderedDict()  # block id -> (key, fingerprints, docstring)
+        self._token = 0
+        self._pending = None
+
+        self._signals = _DocstringSignals()
+        self._signals.finished.connect(self.on_finished)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.start_pending)
+
+    def _cache_key(self, block_type, metadata):
+        file_path = os.path.join(self.main_window.root_path or '', metadata.get('filePath', ''))
+        name = (metadata.get('functionName') or metadata.get('methodName')
+                or metadata.get('className'))
+        kind = 'class' if block_type == 'CLASS' else 'function'
+        return (block_type, os.path.abspath(file_path), name, kind)
+
+    def cached(self, block):
+        """Return (True, docstring) if the block's docstring is cached and current"""
+        entry = self._cache.get(block.block_id)
+        if entry is None or entry[0] != self._cache_key(block.block_type, block.metadata):
+            return False, None
+        if any(_fingerprint(path) != fingerprint for path, fingerprint in entry[1].items()):
+            return False, None
+        self._cache.move_to_end(block.block_id)
+        return True, entry[2]
+
+    def request(self, block):
+        """Schedule a lookup for block, replacing any request not started yet"""
+        self._token += 1
+        # Copy metadata so the worker never touches the live block
+        self._pending = (self._token, block.block_id, block.block_type, dict(block.metadata))
+        self._debounce.start()
+
+    def cancel(self):
+        """Forget the pending request and ignore any lookup still running"""
+        self._token += 1
+        self._pending = None
+        self._debounce.stop()
+
+    def start_pending(self):
+        if self._pending is None:
+            return
+        token, block_id, block_type, metadata = self._pending
+        self._pending = None
+
+        key = self._cache_key(block_type, metadata)
+        # The resolver is fetched here on the GUI thread; the task only uses it
+        resolver = self.main_window.get_module_resolver()
+        if resolver is None:
+            self.on_finished(token, block_id, key, {}, None)
+            return
+        QThreadPool.globalInstance().start(
+            _DocstringTask(self.main_window.lookup_docstring, resolver, token, block_id, key,
+                           block_type, metadata, self._signals)
+        )
+
+    def on_finished(self, token, block_id, key, fingerprints, docstring):
+        self._cache[block_id] = (key, fingerprints, docstring)
+        self._cache.move_to_end(block_id)
+        while len(self._cache) > self.MAX_CACHED:
+            self._cache.popitem(last=False)
+
+        # The selection moved on while this lookup was running
+        if token != self._token:
+            return
+        self.docstring_ready.emit(block_id, docstring)
+
+    def invalidate(self):
+        """Drop every cached docstring (e.g. after imported files changed)"""
+        self._cache.clear()
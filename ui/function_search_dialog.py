@@ -1,3 +1,5 @@
+import os
+
 from PyQt5.QtWidgets import (QVBoxLayout, QListWidget, QLabel, QListWidgetItem,
                              QDialog, QDialogButtonBox, QTextEdit,)
 from PyQt5.QtCore import Qt
@@ -6,11 +8,12 @@ from PyQt5.QtCore import Qt
 class FunctionSearchDialog(QDialog):
     """Dialog showing search results for functions"""
     
-    def __init__(self, function_name, results, parent=None):
+    def __init__(self, function_name, results, parent=None, kind='function'):
         super().__init__(parent)
         
         self.function_name = function_name
         self.results = results
+        self.kind = kind
         self.selected_result = None
         
         self.init_ui()
@@ -62,7 +65,22 @@ class FunctionSearchDialog(QDialog):
             return
         
         result = current.data(Qt.UserRole)
-        self.preview_text.setPlainText(result.get('code', ''))
+        preview = result.get('code', '')
+        
+        # For imports, also show where the symbol is really defined
+        resolver = getattr(self.parent(), 'resolve_search_result', None)
+        if resolver is not None:
+            try:
+                resolved = resolver(result, self.kind, self.function_name)
+            except Exception as e:
+                print(f"Error resolving import: {e}")
+                resolved = None
+            if resolved:
+                defined_in = os.path.relpath(resolved.path, self.parent().root_path)
+                preview += (f"\n\n# Defined in {defined_in}"
+                            f" (line {resolved.definition.line})\n{resolved.definition.code}")
+        
+        self.preview_text.setPlainText(preview)
     
     def on_item_selected(self, item):
         """Handle item selection"""
@@ -9,6 +9,8 @@ from PyQt5.QtCore import Qt, QSize, QRect, QRectF, QPoint
 from PyQt5.QtGui import QIcon, QPixmap, QIconEngine, QImage, QPainter
 from PyQt5.QtSvg import QSvgRenderer
 
+from graphics.image_cache import image_cache
+
 class SmoothIconEngine(QIconEngine):
     """Custom icon engine with smooth rendering for sharp icons"""
     
@@ -23,8 +25,9 @@ class SmoothIconEngine(QIconEngine):
         
         if self.is_svg:
             # Render SVG directly for vector quality
-            renderer = QSvgRenderer(self.icon_path)
-            renderer.render(painter, QRectF(rect))  # Convert QRect to QRectF
+            renderer = image_cache.renderer(self.icon_path)
+            if renderer is not None:
+                renderer.render(painter, QRectF(rect))  # Convert QRect to QRectF
         else:
             # For raster images, use smooth scaling
             painter.drawImage(rect, QImage(self.icon_path))
@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from utils.trigram_index import TrigramIndex
+
+
+class IndexWorker(QThread):
+    """Builds the project-wide symbol index (or one subtree of it) off the GUI thread"""
+
+    progress = pyqtSignal(int, int)         # done, total
+    index_done = pyqtSignal(int, bool)      # files reparsed, cancelled
+
+    def __init__(self, symbol_index, parent=None, path=None):
+        super().__init__(parent)
+
+        self.symbol_index = symbol_index
+        self.path = path
+        self._cancelled = False
+
+    def cancel(self):
+        """Request cancellation; files already stored stay in the index"""
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        reparsed = 0
+        try:
+            reparsed = self.symbol_index.build(progress=self.progress.emit,
+                                               cancelled=self.is_cancelled,
+                                               path=self.path)
+        except Exception as e:
+            print(f"Error building symbol index: {e}")
+        finally:
+            self.symbol_index.release_thread_connection()
+        self.index_done.emit(reparsed, self._cancelled)
+
+
+class TrigramIndexWorker(QThread):
+    """Brings the symbol index up to date and builds a trigram index from it"""
+
+    index_ready = pyqtSignal(str, object, int)  # kind, TrigramIndex, symbol index generation
+
+    def __init__(self, symbol_index, kind, previous=None, parent=None):
+        super().__init__(parent)
+
+        self.symbol_index = symbol_index
+        self.kind = kind
+        self.previous = previous  # (generation, TrigramIndex) to update, if any
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            self.symbol_index.build(cancelled=self.is_cancelled)
+            if self._cancelled:
+                return
+            generation = self.symbol_index.generation
+            index = self.update_previous()
+            if index is None:
+                index = TrigramIndex(self.symbol_index.iter_definitions(self.kind))
+        except Exception as e:
+            print(f"Error building symbol picker index: {e}")
+            return
+        finally:
+            self.symbol_index.release_thread_connection()
+        self.index_ready.emit(self.kind, index, generation)
+
+    def update_previous(self):
+        """Patch the previous index with the files changed since; None if it can't be"""
+        if self.previous is None:
+            return None
+        previous_generation, previous_index = self.previous
+        changed = self.symbol_index.changed_since(previous_generation)
+        if changed is None:
+            return None
+        if not changed:
+            return previous_index
+        return previous_index.updated(changed, self.symbol_index.iter_definitions(self.kind, changed))
@@ -0,0 +1,51 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLabel,
+                             QSpinBox, QDialogButtonBox)
+
+
+class LodSettingsDialog(QDialog):
+    """Edit the zoom levels at which blocks and connections are simplified"""
+
+    def __init__(self, lod_settings, parent=None):
+        super().__init__(parent)
+
+        self.lod_settings = lod_settings
+
+        self.setWindowTitle("Level of Detail")
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialize UI"""
+        layout = QVBoxLayout()
+
+        info_label = QLabel("Below these zoom levels the diagram is drawn with less detail.")
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        form = QFormLayout()
+
+        self.text_spin = QSpinBox()
+        self.text_spin.setRange(1, 100)
+        self.text_spin.setSuffix(" %")
+        self.text_spin.setValue(round(self.lod_settings.text_scale * 100))
+        form.addRow("Hide text and arrows below:", self.text_spin)
+
+        self.minimal_spin = QSpinBox()
+        self.minimal_spin.setRange(1, 100)
+        self.minimal_spin.setSuffix(" %")
+        self.minimal_spin.setValue(round(self.lod_settings.minimal_scale * 100))
+        form.addRow("Plain boxes and straight lines below:", self.minimal_spin)
+
+        layout.addLayout(form)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+        self.setLayout(layout)
+
+    def accept(self):
+        """Store the thresholds; the minimal level can't start above the text level"""
+        self.lod_settings.text_scale = self.text_spin.value() / 100
+        self.lod_settings.minimal_scale = min(self.minimal_spin.value(), self.text_spin.value()) / 100
+        super().accept()
@@ -1,12 +1,12 @@
 import sys
-import json
 import os
 import subprocess
-import ast
 import uuid
+import math
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QFileDialog, QInputDialog,QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QListWidget, QSplitter, QLabel, QListWidgetItem,
-                             QMessageBox, QDialog, QAction, QActionGroup, QUndoStack)
+                             QMessageBox, QDialog, QAction, QActionGroup, QUndoStack,
+                             QProgressBar)
 from PyQt5.QtCore import Qt, QPointF,QSettings
 from PyQt5.QtGui import QColor, QPalette, QKeySequence
 
@@ -14,14 +14,28 @@ from PyQt5.QtGui import QColor, QPalette, QKeySequence
 
 from graphics.code_block import CodeBlock
 from graphics.connection import Connection
+from graphics.lod import lod_settings
+from graphics.image_cache import image_cache
 
 
 from ui.function_search_dialog import FunctionSearchDialog
 from ui.directory_tab import DirectoryTab
+from graphics.virtual_scene import VIRTUALIZE_THRESHOLD
 from ui.info_dialog import InfoDialog
 from ui.image_picker import ImagePickerDialog
-
-from commands.graph_commands import (AddBlockCommand, DeleteBlockCommand, 
+from ui.bulk_import_dialog import BulkImportDialog
+from ui.lod_settings_dialog import LodSettingsDialog
+from ui.validation_worker import ValidationWorker
+from ui.index_worker import IndexWorker, TrigramIndexWorker
+from ui.symbol_picker_dialog import SymbolPickerDialog
+
+from utils.symbol_index import SymbolIndex
+from utils.project_watcher import ProjectWatcher
+from utils.parse_cache import parse_cache
+from utils.module_resolver import ModuleResolver
+from utils.cg_container import load_file, write_container, write_json
+
+from commands.graph_commands import (AddBlockCommand, BulkAddBlocksCommand, DeleteBlockCommand, 
                                       AddConnectionCommand, DeleteConnectionCommand,
                                       MoveBlockCommand, RenameBlockCommand)
 
@@ -35,9 +49,20 @@ class CodeGraphWindow(QMainWindow):
         
         self.current_file = None
         self.directory_data = {}
+        self.current_file_packed = False  # Save in the packed .cg format the file was opened in
         self.current_directory = "root"
         self.directory_tabs = {}
         self.root_path = None
+        self.symbol_index = None
+        self.module_resolver = None
+        self.validation_worker = None
+        self.validation_counts = [0, 0]
+        self.project_validation = {'blocks': {}, 'missing': {}, 'validated': 0}
+        self.index_worker = None
+        self.project_watcher = None
+        self.suppress_subdirectory_refresh = 0  # > 0 while a bulk insert is running
+        self.trigram_indexes = {}  # kind -> (symbol index generation, TrigramIndex)
+        self.trigram_workers = {}
         
         # Undo stack
         self.undo_stack = QUndoStack(self)
@@ -45,6 +70,7 @@ class CodeGraphWindow(QMainWindow):
         # Load settings
         self.settings = QSettings('CodeGrapher', 'CodeGrapherApp')
         self.current_theme = self.settings.value('theme', 'light')
+        lod_settings.load(self.settings)
         
         self.init_ui()
         self.apply_theme(self.current_theme)
@@ -81,8 +107,30 @@ class CodeGraphWindow(QMainWindow):
         
         self.create_menu_bar()
         
+        # Background validation progress (hidden while idle)
+        self.validation_progress = QProgressBar()
+        self.validation_progress.setMaximumWidth(200)
+        self.validation_progress.setMaximumHeight(16)
+        self.validation_progress.hide()
+        self.statusBar().addPermanentWidget(self.validation_progress)
+        
+        self.validation_cancel_btn = QPushButton("✖ Cancel")
+        self.validation_cancel_btn.setToolTip("Cancel validation / indexing")
+        self.validation_cancel_btn.clicked.connect(self.cancel_background_tasks)
+        self.validation_cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.validation_cancel_btn)
+        
         self.statusBar().showMessage('Ready - Middle-click to pan | Click dots to connect')
     
+    def closeEvent(self, event):
+        """Stop background work before the window goes away"""
+        self.cancel_background_tasks()
+        if self.project_watcher is not None:
+            self.project_watcher.stop()
+        if self.symbol_index is not None:
+            self.symbol_index.close()
+        super().closeEvent(event)
+    
     def auto_load_codegraph(self):
         """Auto-load codegraph.cg if found"""
         # Check in current directory
@@ -155,6 +203,7 @@ class CodeGraphWindow(QMainWindow):
         if root_path:
             self.root_path = root_path
             self.root_path_label.setText(f"Root: {self.root_path}")
+            self.update_watched_directories()
             self.statusBar().showMessage(f'Root path: {self.root_path}')
     
     def create_menu_bar(self):
@@ -167,6 +216,9 @@ class CodeGraphWindow(QMainWindow):
         open_action = file_menu.addAction('Open codegraph.cg')
         open_action.triggered.connect(self.open_file)
         
+        index_action = file_menu.addAction('Index Project Symbols')
+        index_action.triggered.connect(self.index_project_symbols)
+        
         save_action = file_menu.addAction('Save')
         save_action.setShortcut('Ctrl+S')
         save_action.triggered.connect(self.save_file)
@@ -216,6 +268,16 @@ class CodeGraphWindow(QMainWindow):
         add_image_action = edit_menu.addAction('Add Image Block')
         add_image_action.triggered.connect(self.add_image_block)
 
+        bulk_import_action = edit_menu.addAction('Import File/Package as Blocks...')
+        bulk_import_action.setShortcut('Ctrl+Shift+I')
+        bulk_import_action.triggered.connect(self.bulk_import_blocks)
+
+        edit_menu.addSeparator()
+        
+        validate_project_action = edit_menu.addAction('Validate Entire Project')
+        validate_project_action.setShortcut('Ctrl+Shift+V')
+        validate_project_action.triggered.connect(self.validate_project)
+        
         edit_menu.addSeparator()
         
         rename_action = edit_menu.addAction('Rename Selected (Alias)')
@@ -259,6 +321,72 @@ class CodeGraphWindow(QMainWindow):
         
         theme_menu.addAction(light_action)
         theme_menu.addAction(dark_action)
+        
+        pref_menu.addSeparator()
+        
+        lod_action = pref_menu.addAction('Level of Detail...')
+        lod_action.triggered.connect(self.edit_lod_settings)
+        
+        stats_action = pref_menu.addAction('Debug Stats...')
+        stats_action.triggered.connect(self.show_debug_stats)
+    
+    def show_debug_stats(self):
+        """Show cache counters used for performance tuning"""
+        stats = parse_cache.stats()
+        
+        lines = [
+            "<b>Parse cache</b>",
+            f"Files cached: {stats['files']}",
+            f"Memory: {stats['bytes'] / (1024 * 1024):.1f} / {stats['max_bytes'] / (1024 * 1024):.0f} MB (estimated)",
+            f"Hits: {stats['hits']} | Misses: {stats['misses']} | Hit ratio: {stats['hit_ratio']:.0%}",
+            f"Evictions: {stats['evictions']}",
+        ]
+        
+        if self.symbol_index is not None:
+            prefilter = self.symbol_index.prefilter_stats()
+            lines += [
+                "",
+                "<b>Search prefilter</b>",
+                f"Changed files checked: {prefilter['checked']} | "
+                f"Skipped without parsing: {prefilter['skipped']} ({prefilter['skip_ratio']:.0%})",
+            ]
+        
+        images = image_cache.stats()
+        lines += [
+            "",
+            "<b>Image cache</b>",
+            f"Pixmaps: {images['pixmaps']} | SVG renderers: {images['renderers']}",
+            f"Memory: {images['bytes'] / (1024 * 1024):.1f} / {images['max_bytes'] / (1024 * 1024):.0f} MB",
+            f"Hits: {images['hits']} | Misses: {images['misses']} | Hit ratio: {images['hit_ratio']:.0%}",
+            f"Evictions: {images['evictions']}",
+        ]
+        
+        lines += [
+            "",
+            f"<b>Rendering</b> (text below {lod_settings.text_scale:.0%}, "
+            f"minimal below {lod_settings.minimal_scale:.0%} zoom)",
+        ]
+        for level, level_stats in lod_settings.stats().items():
+            lines.append(
+                f"{level.capitalize()}: {level_stats['paints']} paints | "
+                f"avg {level_stats['avg_us']:.1f} µs | total {level_stats['total_ms']:.1f} ms"
+            )
+        
+        QMessageBox.information(self, "Debug Stats", "<br>".join(lines))
+    
+    def edit_lod_settings(self):
+        """Edit the zoom thresholds for simplified rendering"""
+        dialog = LodSettingsDialog(lod_settings, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        lod_settings.save(self.settings)
+        lod_settings.reset_stats()
+        
+        current_tab = self.directory_tabs.get(self.current_directory)
+        if current_tab:
+            current_tab.scene.update()
+        self.statusBar().showMessage('Level of detail thresholds updated')
     
     def set_theme(self, theme):
         """Set application theme"""
@@ -362,310 +490,516 @@ class CodeGraphWindow(QMainWindow):
                     self.undo_stack.push(command)
                 break
     
-    def get_current_search_path(self):
-        """Get search path"""
+    def get_search_path(self, directory_path):
+        """Get the filesystem path the blocks of a directory key are searched in"""
         if not self.root_path:
             return None
         
-        if self.current_directory == "root":
+        if directory_path == "root":
             return self.root_path
         
-        relative_path = self.current_directory.replace("root", "", 1).lstrip("/")
+        relative_path = directory_path.replace("root", "", 1).lstrip("/")
         
         if relative_path:
             return os.path.join(self.root_path, relative_path)
         else:
             return self.root_path
     
-    def search_function_in_directory(self, function_name, search_path):
+    def get_current_search_path(self):
+        """Get search path"""
+        return self.get_search_path(self.current_directory)
+    
+    def get_symbol_index(self):
+        """Get the symbol index for the current root path, opening it if needed
+        
+        GUI thread only: it may close and replace the index. Worker threads
+        are handed the instance instead.
+        """
+        if not self.root_path:
+            return None
+        
+        if self.symbol_index is None or self.symbol_index.root_path != os.path.abspath(self.root_path):
+            if self.symbol_index is not None:
+                self.symbol_index.close()
+            self.symbol_index = SymbolIndex(self.root_path)
+            self.trigram_indexes = {}
+        
+        return self.symbol_index
+    
+    def get_module_resolver(self):
+        """Get the import resolver for the current root path, creating it if needed
+        
+        GUI thread only, like get_symbol_index. Returns None without a root path.
+        """
+        if not self.root_path:
+            return None
+        
+        resolver = self.module_resolver
+        if resolver is None or resolver.root_path != os.path.abspath(self.root_path):
+            resolver = ModuleResolver(self.root_path)
+            self.module_resolver = resolver
+        return resolver
+    
+    def search_function_in_directory(self, function_name, search_path, symbol_index=None):
         """Search for function definitions and imports"""
-        results = []
-
-        if not os.path.exists(search_path):
-            return results
-
-        for filename in os.listdir(search_path):
-            if not filename.endswith('.py'):
-                continue
-
-            file_path = os.path.join(search_path, filename)
-
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    tree = ast.parse(content)
-                    lines = content.split('\n')
-
-                    # Search for function definitions
-                    for node in ast.walk(tree):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            if node.name == function_name:
-                                start_line = node.lineno - 1
-                                end_line = min(start_line + 10, len(lines))
-                                code_snippet = '\n'.join(lines[start_line:end_line])
-
-                                rel_path = os.path.relpath(file_path, self.root_path)
-
-                                results.append({
-                                    'file': rel_path,
-                                    'line': node.lineno,
-                                    'full_path': file_path,
-                                    'code': code_snippet,
-                                    'type': 'definition'
-                                })
-
-                    # Search for imports
-                    for node in ast.walk(tree):
-                        # Handle: from module import function_name
-                        if isinstance(node, ast.ImportFrom):
-                            for alias in node.names:
-                                imported_name = alias.name
-                                alias_name = alias.asname if alias.asname else alias.name
-
-                                if imported_name == function_name or alias_name == function_name:
-                                    line_num = node.lineno
-                                    code_snippet = lines[line_num - 1] if line_num <= len(lines) else ''
-                                    rel_path = os.path.relpath(file_path, self.root_path)
-
-                                    results.append({
-                                        'file': rel_path,
-                                        'line': line_num,
-                                        'full_path': file_path,
-                                        'code': code_snippet,
-                                        'type': 'import'
-                                    })
-
-                        # Handle: import module (where module might contain the function)
-                        # This is less common for functions, but included for completeness
-                        elif isinstance(node, ast.Import):
-                            for alias in node.names:
-                                # Check if function_name might be part of module name
-                                if function_name in alias.name:
-                                    line_num = node.lineno
-                                    code_snippet = lines[line_num - 1] if line_num <= len(lines) else ''
-                                    rel_path = os.path.relpath(file_path, self.root_path)
-
-                                    results.append({
-                                        'file': rel_path,
-                                        'line': line_num,
-                                        'full_path': file_path,
-                                        'code': code_snippet,
-                                        'type': 'import'
-                                    })
-
-            except Exception as e:
-                print(f"Error: {e}")
-                continue
-
-        return results
+        if not search_path or not os.path.exists(search_path):
+            return []
+        
+        if symbol_index is None:
+            symbol_index = self.get_symbol_index()
+        return symbol_index.search(function_name, search_path, 'function')
 
-    def search_class_in_directory(self, class_name, search_path):
+    def search_class_in_directory(self, class_name, search_path, symbol_index=None):
         """Search for class definitions and imports"""
-        results = []
-
-        if not os.path.exists(search_path):
-            return results
-
-        for filename in os.listdir(search_path):
-            if not filename.endswith('.py'):
-                continue
-
-            file_path = os.path.join(search_path, filename)
-
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    tree = ast.parse(content)
-                    lines = content.split('\n')
-
-                    # Search for class definitions
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.ClassDef):
-                            if node.name == class_name:
-                                start_line = node.lineno - 1
-                                end_line = min(start_line + 10, len(lines))
-                                code_snippet = '\n'.join(lines[start_line:end_line])
-
-                                rel_path = os.path.relpath(file_path, self.root_path)
-
-                                results.append({
-                                    'file': rel_path,
-                                    'line': node.lineno,
-                                    'full_path': file_path,
-                                    'code': code_snippet,
-                                    'type': 'definition'
-                                })
-
-                    # Search for imports
-                    for node in ast.walk(tree):
-                        # Handle: from module import ClassName
-                        if isinstance(node, ast.ImportFrom):
-                            for alias in node.names:
-                                imported_name = alias.name
-                                alias_name = alias.asname if alias.asname else alias.name
-
-                                if imported_name == class_name or alias_name == class_name:
-                                    line_num = node.lineno
-                                    code_snippet = lines[line_num - 1] if line_num <= len(lines) else ''
-                                    rel_path = os.path.relpath(file_path, self.root_path)
-
-                                    results.append({
-                                        'file': rel_path,
-                                        'line': line_num,
-                                        'full_path': file_path,
-                                        'code': code_snippet,
-                                        'type': 'import'
-                                    })
-
-                        # Handle: import module (where module might be the class/module name)
-                        elif isinstance(node, ast.Import):
-                            for alias in node.names:
-                                module_name = alias.name
-                                alias_name = alias.asname if alias.asname else alias.name
-
-                                # Check if class_name matches module or alias
-                                if class_name in module_name or class_name == alias_name:
-                                    line_num = node.lineno
-                                    code_snippet = lines[line_num - 1] if line_num <= len(lines) else ''
-                                    rel_path = os.path.relpath(file_path, self.root_path)
-
-                                    results.append({
-                                        'file': rel_path,
-                                        'line': line_num,
-                                        'full_path': file_path,
-                                        'code': code_snippet,
-                                        'type': 'import'
-                                    })
-
-            except Exception as e:
-                print(f"Error: {e}")
-                continue
-
-        return results
+        if not search_path or not os.path.exists(search_path):
+            return []
+        
+        if symbol_index is None:
+            symbol_index = self.get_symbol_index()
+        return symbol_index.search(class_name, search_path, 'class')
     
-    def check_function_exists(self, block):
-        """Check if a function block exists in filesystem"""
-        if block.block_type != 'FUNCTION':
-            return True
+    def check_block_exists(self, block_type, name, metadata, search_path, symbol_index=None):
+        """Check if a block's code element exists, returns (exists, search results)
+        
+        Only reads the filesystem and the symbol index, so it is safe to call
+        from validation worker threads as long as symbol_index is passed in.
+        """
+        if block_type not in ('FUNCTION', 'METHOD', 'CLASS', 'SUBDIRECTORY'):
+            return True, []  # Other blocks always exist
         
-        if 'functionName' not in block.metadata:
+        if not search_path:
+            return False, []
+        
+        if block_type == 'FUNCTION':
+            function_name = metadata.get('functionName')
+            if not function_name:
+                return False, []
+            results = self.search_function_in_directory(function_name, search_path, symbol_index)
+        
+        elif block_type == 'METHOD':
+            # Methods live in the class's directory, one level up
+            method_name = metadata.get('methodName')
+            if not method_name:
+                return False, []
+            results = self.search_function_in_directory(method_name, os.path.dirname(search_path), symbol_index)
+        
+        elif block_type == 'CLASS':
+            class_name = metadata.get('className')
+            if not class_name:
+                return False, []
+            results = self.search_class_in_directory(class_name, search_path, symbol_index)
+        
+        else:
+            subdir_full_path = os.path.join(search_path, name)
+            return os.path.isdir(subdir_full_path), []
+        
+        return len(results) > 0, results
+    
+    def update_watched_directories(self):
+        """Watch every directory the diagram's blocks are validated against"""
+        if not self.root_path:
+            return
+        
+        if self.project_watcher is None or self.project_watcher.root_path != os.path.abspath(self.root_path):
+            if self.project_watcher is not None:
+                self.project_watcher.stop()
+                self.project_watcher.deleteLater()
+            self.project_watcher = ProjectWatcher(self.root_path, self)
+            self.project_watcher.project_changed.connect(self.on_project_files_changed)
+        
+        directories = set()
+        for directory_path in set(self.directory_data) | set(self.directory_tabs):
+            search_path = self.get_search_path(directory_path)
+            directories.add(search_path)
+            directories.add(os.path.dirname(search_path))  # METHOD blocks search here
+        
+        self.project_watcher.set_directories(directories)
+    
+    def on_project_files_changed(self, files, directories):
+        """Reindex touched files and revalidate only the blocks they can affect"""
+        symbol_index = self.get_symbol_index()
+        if symbol_index is None:
+            return
+        
+        if self.module_resolver is not None:
+            self.module_resolver.invalidate(files)
+        
+        old_names, old_modules = symbol_index.symbols_in_files(files)
+        for directory in directories:
+            symbol_index.refresh_directory(directory)
+        new_names, new_modules = symbol_index.symbols_in_files(files)
+        
+        changed = {
+            'dirs': {os.path.abspath(d) for d in directories},
+            'files': {os.path.relpath(f, self.root_path) for f in files},
+            'names': old_names | new_names,
+            'modules': old_modules | new_modules,
+        }
+        
+        revalidated = 0
+        missing = 0
+        
+        for directory_path, tab in self.directory_tabs.items():
+            search_path = self.get_search_path(directory_path)
+            jobs = [
+                self.build_validation_job(block, search_path)
+                for block in tab.all_blocks()
+                if self.is_block_affected(block.block_type, block.name, block.metadata, search_path, changed)
+            ]
+            
+            if jobs:
+                results = [self.run_validation_job(job) for job in jobs]
+                missing += self.apply_validation_results(tab, results)
+                revalidated += len(results)
+            
+            # Docstrings may come from any of the touched files through imports
+            tab.docstring_loader.invalidate()
+        
+        if revalidated:
+            self.statusBar().showMessage(
+                f'Files changed - revalidated {revalidated} block(s), {missing} missing'
+            )
+    
+    def is_block_affected(self, block_type, name, metadata, search_path, changed):
+        """Check whether a filesystem change can alter a block's validation result"""
+        if block_type not in ('FUNCTION', 'METHOD', 'CLASS', 'SUBDIRECTORY') or not search_path:
             return False
         
-        function_name = block.metadata.get('functionName')
-
-        search_path = self.get_current_search_path()
+        block_dir = os.path.abspath(search_path)
+        if block_type == 'METHOD':
+            block_dir = os.path.dirname(block_dir)
         
-        if not search_path:
+        if block_dir not in changed['dirs']:
             return False
         
-        results = self.search_function_in_directory(function_name, search_path)
-        exists = len(results) > 0
-        return exists,results
-
-    def check_method_exists(self, block):
-        """Check if a function block exists in filesystem"""
-        if block.block_type != 'METHOD':
+        if block_type == 'SUBDIRECTORY':
             return True
         
-        if 'methodName' not in block.metadata:
+        symbol_name = metadata.get('functionName') or metadata.get('methodName') or metadata.get('className')
+        if not symbol_name:
             return False
         
-        function_name = block.metadata.get('methodName')
-
-        search_path = os.path.dirname(self.get_current_search_path())
+        if metadata.get('filePath') in changed['files'] or symbol_name in changed['names']:
+            return True
         
-        if not search_path:
-            return False
+        # "import module" lines match when the name is part of the module path
+        return any(symbol_name in module for module in changed['modules'])
+    
+    def build_validation_job(self, block, search_path, directory_path=None):
+        """Snapshot what a worker needs to validate one block"""
+        return self.make_validation_job(block.block_id, block.block_type, block.name,
+                                        block.metadata, search_path, directory_path)
+    
+    def make_validation_job(self, block_id, block_type, name, metadata, search_path, directory_path=None):
+        """Build a validation job from plain block fields"""
+        return {
+            'id': block_id,
+            'type': block_type,
+            'name': name,
+            'metadata': dict(metadata),
+            'search_path': search_path,
+            'directory': directory_path
+        }
+    
+    def run_validation_job(self, job, symbol_index=None):
+        """Validate one block snapshot, returns {'id', 'directory', 'exists', 'results'}"""
+        exists, results = self.check_block_exists(
+            job['type'], job['name'], job['metadata'], job['search_path'], symbol_index
+        )
+        return {'id': job['id'], 'directory': job['directory'], 'exists': exists, 'results': results}
+    
+    def update_line_number(self, block_type, metadata, result):
+        """Keep a block's lineNumber in step with a validation result"""
+        if block_type not in ('FUNCTION', 'METHOD', 'CLASS'):
+            return
         
-        results = self.search_function_in_directory(function_name, search_path)
-        exists = len(results) > 0
-        return exists,results
-
+        if result['exists'] and len(result['results']) == 1:
+            metadata['lineNumber'] = result['results'][0].get('line')
+        elif not result['exists']:
+            metadata['lineNumber'] = None
     
-    def check_class_exists(self, block):
-        """Check if a class block exists in filesystem"""
-        if block.block_type != 'CLASS':
-            return True
+    def apply_validation_results(self, tab, results):
+        """Apply a batch of validation results to the blocks of a tab"""
+        blocks_by_id = {block.block_id: block for block in tab.all_blocks()}
+        missing = 0
+        
+        for result in results:
+            block = blocks_by_id.get(result['id'])
+            if block is None:
+                continue  # Deleted while validation was running
+            
+            self.update_line_number(block.block_type, block.metadata, result)
+            block.set_exists(result['exists'])
+            if not result['exists']:
+                missing += 1
         
-        if 'className' not in block.metadata:
-            return False
+        return missing
+    
+    def show_validation_summary(self, validated_count, missing_count):
+        """Show validation result in the status bar"""
+        if missing_count > 0:
+            self.statusBar().showMessage(
+                f'Validated {validated_count} blocks - {missing_count} missing (red border)'
+            )
+        else:
+            self.statusBar().showMessage(
+                f'✓ All {validated_count} blocks exist in filesystem'
+            )
+    
+    def validate_all_blocks(self, blocking=False):
+        """Validate all blocks in current directory and update their existence status
+        
+        Runs on a background worker pool unless blocking is set (used before
+        saving, where the results must be in place first).
+        """
+        if not self.root_path:
+            QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
+            return
+        
+        current_tab = self.directory_tabs.get(self.current_directory)
+        if not current_tab:
+            return
+        
+        self.cancel_validation()
         
-        class_name = block.metadata.get('className')
         search_path = self.get_current_search_path()
+        jobs = [self.build_validation_job(block, search_path) for block in current_tab.all_blocks()]
         
-        if not search_path:
-            return False
+        if blocking:
+            results = [self.run_validation_job(job) for job in jobs]
+            missing_count = self.apply_validation_results(current_tab, results)
+            self.show_validation_summary(len(results), missing_count)
+            return
         
-        results = self.search_class_in_directory(class_name, search_path)
-        exists = len(results) > 0
-        return exists,results
+        # Open the index here on the GUI thread; workers only use this instance
+        symbol_index = self.get_symbol_index()
+        worker = ValidationWorker(jobs, lambda job: self.run_validation_job(job, symbol_index), parent=self)
+        self.validation_worker = worker
+        self.validation_counts = [0, 0]  # validated, missing
+        
+        worker.batch_ready.connect(lambda batch, w=worker, t=current_tab: self.on_validation_batch(w, t, batch))
+        worker.progress.connect(self.on_validation_progress)
+        worker.validation_done.connect(lambda cancelled, w=worker: self.on_validation_done(w, cancelled))
+        
+        self.validation_progress.setRange(0, max(len(jobs), 1))
+        self.validation_progress.setValue(0)
+        self.validation_progress.show()
+        self.validation_cancel_btn.show()
+        self.statusBar().showMessage(f'Validating {len(jobs)} blocks...')
+        
+        worker.start()
     
-    def check_subdirectory_exists(self, block):
-        """Check if a subdirectory block exists in filesystem"""
-        if block.block_type != 'SUBDIRECTORY':
-            return True
+    def on_validation_batch(self, worker, tab, batch):
+        """Apply results from the validation worker as they arrive"""
+        missing = self.apply_validation_results(tab, batch)
+        if worker is not self.validation_worker:
+            return
+        self.validation_counts[0] += len(batch)
+        self.validation_counts[1] += missing
+    
+    def on_validation_progress(self, done, total):
+        """Update the status bar progress bar"""
+        self.validation_progress.setMaximum(max(total, 1))
+        self.validation_progress.setValue(done)
+    
+    def on_validation_done(self, worker, cancelled):
+        """Hide progress widgets and report once the worker finishes"""
+        worker.deleteLater()
+        if worker is not self.validation_worker:
+            return  # Cancelled or superseded, already reported
+        
+        self.validation_worker = None
+        self.validation_progress.hide()
+        self.validation_cancel_btn.hide()
+        
+        validated_count, missing_count = self.validation_counts
+        self.show_validation_summary(validated_count, missing_count)
+    
+    def cancel_validation(self):
+        """Stop a running background validation"""
+        worker = self.validation_worker
+        if worker is None:
+            return
         
-        search_path = self.get_current_search_path()
+        self.validation_worker = None
+        worker.cancel()
+        worker.wait()
         
-        if not search_path:
-            return False
+        self.validation_progress.hide()
+        self.validation_cancel_btn.hide()
         
-        subdir_full_path = os.path.join(search_path, block.name)
-        return os.path.exists(subdir_full_path) and os.path.isdir(subdir_full_path)
+        validated_count, missing_count = self.validation_counts
+        self.statusBar().showMessage(
+            f'Validation cancelled - {validated_count} blocks checked, {missing_count} missing'
+        )
     
-    def validate_all_blocks(self):
-        """Validate all blocks in current directory and update their existence status"""
+    def validate_project(self):
+        """Validate the blocks of every directory in the diagram, not just the open tab
+        
+        Directories that were never opened are checked straight from their
+        stored data, without creating tabs for them.
+        """
         if not self.root_path:
             QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
             return
         
-        current_tab = self.directory_tabs.get(self.current_directory)
-        if not current_tab:
+        self.cancel_validation()
+        self.save_all_directory_data()
+        
+        jobs = []
+        self.project_validation = {'blocks': {}, 'missing': {}, 'validated': 0}
+        
+        for directory_path, data in self.directory_data.items():
+            search_path = self.get_search_path(directory_path)
+            for block_data in data.get('blocks', []):
+                self.project_validation['blocks'][(directory_path, block_data['id'])] = block_data
+                jobs.append(self.make_validation_job(
+                    block_data['id'], block_data['type'], block_data['name'],
+                    block_data.get('metadata', {}), search_path, directory_path
+                ))
+        
+        # Open the index here on the GUI thread; workers only use this instance
+        symbol_index = self.get_symbol_index()
+        worker = ValidationWorker(jobs, lambda job: self.run_validation_job(job, symbol_index), parent=self)
+        self.validation_worker = worker
+        self.validation_counts = [0, 0]
+        
+        worker.batch_ready.connect(lambda batch, w=worker: self.on_project_validation_batch(w, batch))
+        worker.progress.connect(self.on_validation_progress)
+        worker.validation_done.connect(lambda cancelled, w=worker: self.on_project_validation_done(w, cancelled))
+        
+        self.validation_progress.setRange(0, max(len(jobs), 1))
+        self.validation_progress.setValue(0)
+        self.validation_progress.show()
+        self.validation_cancel_btn.show()
+        self.statusBar().showMessage(
+            f'Validating {len(jobs)} blocks in {len(self.directory_data)} directories...'
+        )
+        
+        worker.start()
+    
+    def on_project_validation_batch(self, worker, batch):
+        """Write project validation results into stored data and open tabs"""
+        if worker is not self.validation_worker:
             return
         
-        validated_count = 0
-        missing_count = 0
-        
-        for block in current_tab.blocks:
-            if block.block_type == 'FUNCTION':
-                exists,metadata = self.check_function_exists(block)
-                if exists and len(metadata) == 1:
-                    block.metadata['lineNumber'] = metadata[0].get('line')
-                elif not exists:
-                    block.metadata['lineNumber'] = None
-            elif block.block_type == 'METHOD':
-                exists,metadata = self.check_method_exists(block)
-                if exists and len(metadata) == 1:
-                    block.metadata['lineNumber'] = metadata[0].get('line')
-                elif not exists:
-                    block.metadata['lineNumber'] = None
-            elif block.block_type == 'CLASS':
-                exists,metadata = self.check_class_exists(block)
-                if exists and len(metadata) == 1:
-                    block.metadata['lineNumber'] = metadata[0].get('line')
-                elif not exists:
-                    block.metadata['lineNumber'] = None
-            elif block.block_type == 'SUBDIRECTORY':
-                exists = self.check_subdirectory_exists(block)
-            elif block.block_type == 'OTHER':
-                exists = True  # Other blocks always exist
-            else:
-                exists = True
+        state = self.project_validation
+        by_directory = {}
+        
+        for result in batch:
+            directory_path = result['directory']
+            block_data = state['blocks'].get((directory_path, result['id']))
+            if block_data is None:
+                continue
             
-            block.set_exists(exists)
-            validated_count += 1
+            self.update_line_number(block_data['type'], block_data.setdefault('metadata', {}), result)
+            block_data['exists'] = result['exists']
+            by_directory.setdefault(directory_path, []).append(result)
             
-            if not exists:
-                missing_count += 1
+            state['validated'] += 1
+            if not result['exists']:
+                display_name = block_data.get('metadata', {}).get('alias', block_data['name'])
+                state['missing'].setdefault(directory_path, []).append(
+                    f"{display_name} ({block_data['type']})"
+                )
         
-        if missing_count > 0:
-            self.statusBar().showMessage(
-                f'Validated {validated_count} blocks - {missing_count} missing (red border)'
-            )
+        # Blocks already on screen get their borders updated too
+        for directory_path, results in by_directory.items():
+            tab = self.directory_tabs.get(directory_path)
+            if tab:
+                self.apply_validation_results(tab, results)
+        
+        self.validation_counts[0] = state['validated']
+        self.validation_counts[1] = sum(len(names) for names in state['missing'].values())
+    
+    def on_project_validation_done(self, worker, cancelled):
+        """Hide progress widgets and show the per-directory report"""
+        worker.deleteLater()
+        if worker is not self.validation_worker:
+            return
+        
+        self.validation_worker = None
+        self.validation_progress.hide()
+        self.validation_cancel_btn.hide()
+        
+        validated_count, missing_count = self.validation_counts
+        self.show_validation_summary(validated_count, missing_count)
+        
+        missing = self.project_validation['missing']
+        summary = (f"Validated {validated_count} blocks in {len(self.directory_data)} directories.\n"
+                   f"{missing_count} missing in {len(missing)} directories.")
+        
+        report = QMessageBox(self)
+        report.setWindowTitle("Project Validation")
+        report.setIcon(QMessageBox.Warning if missing_count else QMessageBox.Information)
+        report.setText(summary)
+        if missing:
+            details = []
+            for directory_path in sorted(missing):
+                details.append(f"{directory_path}:")
+                details.extend(f"    {name}" for name in missing[directory_path])
+            report.setDetailedText("\n".join(details))
+        report.exec_()
+    
+    def index_project_symbols(self):
+        """Index every .py file under the root path in the background"""
+        symbol_index = self.get_symbol_index()
+        if symbol_index is None:
+            QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
+            return
+        
+        if self.index_worker is not None:
+            return  # Already indexing
+        
+        worker = IndexWorker(symbol_index, parent=self)
+        self.index_worker = worker
+        
+        worker.progress.connect(self.on_validation_progress)
+        worker.index_done.connect(lambda reparsed, cancelled, w=worker: self.on_index_done(w, reparsed, cancelled))
+        
+        self.validation_progress.setRange(0, 0)  # Busy until the file count is known
+        self.validation_progress.show()
+        self.validation_cancel_btn.show()
+        self.statusBar().showMessage('Indexing project symbols...')
+        
+        worker.start()
+    
+    def on_index_done(self, worker, reparsed, cancelled):
+        """Report the finished project index build"""
+        worker.deleteLater()
+        if worker is not self.index_worker:
+            return
+        
+        self.index_worker = None
+        if self.validation_worker is None:
+            self.validation_progress.hide()
+            self.validation_cancel_btn.hide()
+        
+        if cancelled:
+            self.statusBar().showMessage(f'Indexing cancelled - {reparsed} files parsed')
         else:
-            self.statusBar().showMessage(
-                f'✓ All {validated_count} blocks exist in filesystem'
-            )
+            self.statusBar().showMessage(f'✓ Symbol index up to date ({reparsed} files parsed)')
+    
+    def cancel_background_tasks(self):
+        """Stop running validation and indexing"""
+        self.cancel_validation()
+        
+        worker = self.index_worker
+        if worker is not None:
+            self.index_worker = None
+            worker.cancel()
+            worker.wait()
+            self.validation_progress.hide()
+            self.validation_cancel_btn.hide()
+            self.statusBar().showMessage('Indexing cancelled')
+        
+        for worker in list(self.trigram_workers.values()):
+            worker.cancel()
+            worker.wait()
+        
+        for tab in self.directory_tabs.values():
+            for worker in list(tab.bundle_workers):
+                worker.wait()
     
     def add_function_from_context(self):
         """Add function from context menu"""
@@ -709,9 +1043,9 @@ class CodeGraphWindow(QMainWindow):
             QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
             return
         
-        name, ok = QInputDialog.getText(self, 'Add Function', 'Function name:')
+        name, location = self.pick_symbol('function', 'Add Function', 'Function name:')
         
-        if not ok or not name:
+        if not name:
             return
         
         search_path = self.get_current_search_path()
@@ -727,17 +1061,20 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 150
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         # Determine if function exists
         exists = len(results) > 0
         selected_result = None
         
         if exists:
-            if len(results) == 1:
+            picked = self.find_picked_result(results, location)
+            if picked:
+                selected_result = picked
+            elif len(results) == 1:
                 selected_result = results[0]
             else:
-                dialog = FunctionSearchDialog(name, results, self)
+                dialog = FunctionSearchDialog(name, results, self, kind='function')
                 if dialog.exec_() == QDialog.Accepted:
                     selected_result = dialog.selected_result
         
@@ -800,7 +1137,7 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 150
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         block_data = {
             'id': block_id,
@@ -857,7 +1194,7 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 150
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         # Extract filename for display name
         filename = os.path.basename(path)
@@ -893,9 +1230,9 @@ class CodeGraphWindow(QMainWindow):
             QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
             return
         
-        name, ok = QInputDialog.getText(self, 'Add Class', 'Class name:')
+        name, location = self.pick_symbol('class', 'Add Class', 'Class name:')
         
-        if not ok or not name:
+        if not name:
             return
         
         search_path = self.get_current_search_path()
@@ -911,17 +1248,20 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 300
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         # Determine if class exists
         exists = len(results) > 0
         selected_result = None
         
         if exists:
-            if len(results) == 1:
+            picked = self.find_picked_result(results, location)
+            if picked:
+                selected_result = picked
+            elif len(results) == 1:
                 selected_result = results[0]
             else:
-                dialog = FunctionSearchDialog(name, results, self)
+                dialog = FunctionSearchDialog(name, results, self, kind='class')
                 if dialog.exec_() == QDialog.Accepted:
                     selected_result = dialog.selected_result
         
@@ -973,9 +1313,9 @@ class CodeGraphWindow(QMainWindow):
             QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
             return
         
-        name, ok = QInputDialog.getText(self, 'Add Method', 'Method name:')
+        name, location = self.pick_symbol('function', 'Add Method', 'Method name:')
         
-        if not ok or not name:
+        if not name:
             return
         
         search_path = os.path.dirname(self.get_current_search_path())
@@ -991,17 +1331,20 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 150
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         # Determine if function exists
         exists = len(results) > 0
         selected_result = None
         
         if exists:
-            if len(results) == 1:
+            picked = self.find_picked_result(results, location)
+            if picked:
+                selected_result = picked
+            elif len(results) == 1:
                 selected_result = results[0]
             else:
-                dialog = FunctionSearchDialog(name, results, self)
+                dialog = FunctionSearchDialog(name, results, self, kind='function')
                 if dialog.exec_() == QDialog.Accepted:
                     selected_result = dialog.selected_result
         
@@ -1040,6 +1383,149 @@ class CodeGraphWindow(QMainWindow):
         else:
             self.statusBar().showMessage(f'⚠ Added: {name} (not found - red border)')
 
+    def pick_symbol(self, kind, title, label):
+        """Ask for a symbol name with the fuzzy picker, returns (name, location or None)"""
+        dialog = SymbolPickerDialog(self, kind, title, label, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return None, None
+        return dialog.selected_name, dialog.selected_location
+    
+    def find_picked_result(self, results, location):
+        """The search result at the location picked in the symbol picker, if any"""
+        if location is None:
+            return None
+        full_path, line = location
+        for result in results:
+            if result['full_path'] == full_path and result['line'] == line:
+                return result
+        return None
+    
+    def refresh_trigram_index(self, kind):
+        """Update (or build) the picker's trigram index for kind in the background"""
+        worker = self.trigram_workers.get(kind)
+        if worker is None:
+            worker = TrigramIndexWorker(self.get_symbol_index(), kind, self.trigram_indexes.get(kind), self)
+            self.trigram_workers[kind] = worker
+            worker.index_ready.connect(
+                lambda kind, index, generation, w=worker: self.on_trigram_index_ready(w, kind, index, generation)
+            )
+            worker.finished.connect(lambda k=kind, w=worker: self.on_trigram_worker_finished(k, w))
+            worker.start()
+        return worker
+    
+    def on_trigram_index_ready(self, worker, kind, index, generation):
+        """Cache a freshly built trigram index"""
+        if worker.symbol_index is self.symbol_index:  # Root path may have changed meanwhile
+            self.trigram_indexes[kind] = (generation, index)
+    
+    def on_trigram_worker_finished(self, kind, worker):
+        if self.trigram_workers.get(kind) is worker:
+            del self.trigram_workers[kind]
+        worker.deleteLater()
+    
+    def bulk_import_blocks(self):
+        """Add blocks for many functions, classes and methods of a file or package at once"""
+        symbol_index = self.get_symbol_index()
+        if symbol_index is None:
+            QMessageBox.warning(self, "No Root Path", "Please set a root path first!")
+            return
+        
+        current_tab = self.directory_tabs.get(self.current_directory)
+        if not current_tab:
+            return
+        
+        dialog = BulkImportDialog(symbol_index, self.root_path, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        
+        selected = dialog.selected_symbols()
+        if not selected:
+            return
+        
+        blocks_data = []
+        nested_blocks = {}
+        search_path = self.get_current_search_path()
+        positions = self.grid_positions(len(selected), self.blocks_bottom(current_tab.all_blocks()))
+        
+        for (block_type, definition, methods), (x, y) in zip(selected, positions):
+            blocks_data.append(self.make_imported_block_data(block_type, definition, x, y, search_path))
+            
+            if methods:
+                class_path = f"{self.current_directory}/{definition['name']}"
+                class_search_path = self.get_search_path(class_path)
+                class_tab = self.directory_tabs.get(class_path)
+                existing = class_tab.all_blocks() if class_tab else []
+                method_positions = self.grid_positions(len(methods), self.blocks_bottom(existing))
+                nested_blocks.setdefault(class_path, []).extend(
+                    self.make_imported_block_data('METHOD', method, mx, my, class_search_path)
+                    for method, (mx, my) in zip(methods, method_positions)
+                )
+        
+        total = len(blocks_data) + sum(len(b) for b in nested_blocks.values())
+        command = BulkAddBlocksCommand(current_tab, blocks_data, self, nested_blocks,
+                                       f"Import {total} Blocks")
+        self.undo_stack.push(command)
+        
+        missing = sum(not data['exists'] for data in blocks_data)
+        missing += sum(not data['exists'] for datas in nested_blocks.values() for data in datas)
+        if missing:
+            self.statusBar().showMessage(
+                f'Imported {total} block(s) - {missing} not found from this directory (red border)'
+            )
+        else:
+            self.statusBar().showMessage(f'✓ Imported {total} block(s)')
+    
+    def blocks_bottom(self, blocks):
+        """Y coordinate just below the lowest of the given blocks"""
+        if not blocks:
+            return 150
+        return max(block.pos().y() + block.rect().height() for block in blocks) + 60
+    
+    def grid_positions(self, count, top, left=150):
+        """Lay count blocks out in a roughly square grid starting at (left, top)"""
+        columns = max(1, math.ceil(math.sqrt(count)))
+        return [
+            (left + (i % columns) * 280, top + (i // columns) * 140)
+            for i in range(count)
+        ]
+    
+    def make_imported_block_data(self, block_type, definition, x, y, search_path):
+        """Block data for a symbol picked from the index
+        
+        The symbol may come from anywhere under the root path, so it gets the
+        same existence check as the tab it lands in (search_path) would run.
+        """
+        name = definition['name']
+        name_key = {'FUNCTION': 'functionName', 'CLASS': 'className', 'METHOD': 'methodName'}[block_type]
+        prefix = {'FUNCTION': 'func', 'CLASS': 'class', 'METHOD': 'mthd'}[block_type]
+        
+        block_data = {
+            'id': f"{prefix}_{uuid.uuid4().hex}",
+            'type': block_type,
+            'name': name if block_type == 'CLASS' else f"{name}()",
+            'x': x,
+            'y': y,
+            'width': 250 if block_type == 'CLASS' else 200,
+            'height': 100 if block_type == 'CLASS' else 80,
+            'style': {
+                'color': (None,None,None),
+                'border': (None,None,None,None),
+                'alpha': None,
+                'dashed': None,
+            },
+            'metadata': {
+                name_key: name,
+                'filePath': definition['file'],
+                'lineNumber': definition['line']
+            },
+            'exists': True
+        }
+        
+        exists, _ = self.check_block_exists(block_type, block_data['name'],
+                                            block_data['metadata'], search_path)
+        block_data['exists'] = exists
+        return block_data
+    
     def add_subdirectory_block(self, x=None, y=None):
         """Add subdirectory block - always creates, marks as non-existent if not found"""
         if not self.root_path:
@@ -1065,7 +1551,7 @@ class CodeGraphWindow(QMainWindow):
         
         if x is None or y is None:
             x = 400
-            y = 150 + len(current_tab.blocks) * 100
+            y = 150 + current_tab.block_count() * 100
         
         block_data = {
             'id': block_id,
@@ -1100,7 +1586,7 @@ class CodeGraphWindow(QMainWindow):
         if not current_tab:
             return
         
-        block_id = f"group_{len(current_tab.blocks) + 1}"
+        block_id = f"group_{current_tab.block_count() + 1}"
         
         block_data = {
             'id': block_id,
@@ -1150,6 +1636,7 @@ class CodeGraphWindow(QMainWindow):
         self.main_layout.addWidget(tab)
         
         self.refresh_subdirectories()
+        self.update_watched_directories()
         
         if self.root_path:
             self.root_path_label.setText(f"Root: {self.root_path}")
@@ -1158,33 +1645,38 @@ class CodeGraphWindow(QMainWindow):
     
     def load_directory_data(self, tab, data):
         """Load directory data"""
+        blocks_data = data.get('blocks', [])
+        tab.set_routing_mode(data.get('routing', 'curved'))
+        
+        # Large maps only create the blocks near the viewport
+        if len(blocks_data) >= VIRTUALIZE_THRESHOLD:
+            tab.load_virtual(blocks_data, data.get('connections', []))
+            return
+        
         block_map = {}
         
-        for block_data in data.get('blocks', []):
+        for block_data in blocks_data:
             block = tab.add_block(block_data)
             block_map[block_data['id']] = block
-            
-            if block.block_type == 'SUBDIRECTORY':
-                block.mouseDoubleClickEvent = lambda event, b=block: self.open_subdirectory(b)
-            elif block.block_type == 'CLASS':
-                block.mouseDoubleClickEvent = lambda event, b=block: self.open_class(b)
-            elif block.block_type == 'FUNCTION':
-                block.mouseDoubleClickEvent = lambda event, b=block: self.open_function(b)
-            elif block.block_type == 'METHOD':
-                block.mouseDoubleClickEvent = lambda event, b=block: self.open_function(b)
-                
+            self.connect_block_handlers(block)
+        
         for conn_data in data.get('connections', []):
             from_block = block_map.get(conn_data['from'])
             to_block = block_map.get(conn_data['to'])
             
             if from_block and to_block:
-                from_side = conn_data.get('from_side', 'right')
-                to_side = conn_data.get('to_side', 'left')
-                flow_type = conn_data.get('flow_type', 'one_way')
-                line_style = conn_data.get('line_style', 'solid')
-                line_color_data = conn_data.get('line_color', {'r': 100, 'g': 100, 'b': 100})
-                line_color = QColor(line_color_data['r'], line_color_data['g'], line_color_data['b'])
-                tab.add_connection(from_block, to_block, from_side, to_side, flow_type, line_style, line_color)
+                tab.add_connection_from_data(from_block, to_block, conn_data)
+    
+    def connect_block_handlers(self, block):
+        """Hook up double-click navigation for a loaded block"""
+        if block.block_type == 'SUBDIRECTORY':
+            block.mouseDoubleClickEvent = lambda event, b=block: self.open_subdirectory(b)
+        elif block.block_type == 'CLASS':
+            block.mouseDoubleClickEvent = lambda event, b=block: self.open_class(b)
+        elif block.block_type == 'FUNCTION':
+            block.mouseDoubleClickEvent = lambda event, b=block: self.open_function(b)
+        elif block.block_type == 'METHOD':
+            block.mouseDoubleClickEvent = lambda event, b=block: self.open_function(b)
 
     def open_subdirectory(self, block):
         """Open subdirectory"""
@@ -1211,6 +1703,13 @@ class CodeGraphWindow(QMainWindow):
             self.statusBar().showMessage(f"File not found: {full_path}")
             return
         
+        # Blocks found through an import jump to the real definition
+        resolved = self.resolve_block_definition(block.block_type, block.metadata)
+        if resolved:
+            full_path = resolved.path
+            line_number = resolved.definition.line
+            file_path = os.path.relpath(full_path, self.root_path)
+        
         command = f'code --goto "{full_path}:{line_number}"'
         
         try:
@@ -1234,6 +1733,9 @@ class CodeGraphWindow(QMainWindow):
     
     def refresh_subdirectories(self):
         """Refresh subdirectories and classes"""
+        if self.suppress_subdirectory_refresh:
+            return
+        
         self.subdir_list.clear()
         
         current_tab = self.directory_tabs.get(self.current_directory)
@@ -1241,14 +1743,14 @@ class CodeGraphWindow(QMainWindow):
             return
         
         # Get subdirectories
-        subdirs = [block for block in current_tab.blocks if block.block_type == 'SUBDIRECTORY']
+        subdirs = [block for block in current_tab.all_blocks() if block.block_type == 'SUBDIRECTORY']
         for subdir in subdirs:
             item = QListWidgetItem(f"📁 {subdir.name}")
             item.setData(Qt.UserRole, subdir)
             self.subdir_list.addItem(item)
         
         # Get classes
-        classes = [block for block in current_tab.blocks if block.block_type == 'CLASS']
+        classes = [block for block in current_tab.all_blocks() if block.block_type == 'CLASS']
         for cls in classes:
             item = QListWidgetItem(f"🟡 {cls.name}")
             item.setData(Qt.UserRole, cls)
@@ -1315,14 +1817,14 @@ class CodeGraphWindow(QMainWindow):
     def load_from_file(self, file_path):
         """Load from file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Packed files only decode a directory when it is first opened
+            data, root_path, packed = load_file(file_path)
             
-            if '_root_path' in data:
-                self.root_path = data['_root_path']
-                del data['_root_path']
+            if root_path is not None:
+                self.root_path = root_path
             
             self.directory_data = data
+            self.current_file_packed = packed
             self.directory_tabs.clear()
             
             self.current_directory = "root"
@@ -1338,7 +1840,7 @@ class CodeGraphWindow(QMainWindow):
     def save_file(self):
         """Save file"""
         try:
-            self.validate_all_blocks()
+            self.validate_all_blocks(blocking=True)
         except Exception as e:
             pass
         if self.current_file:
@@ -1349,7 +1851,7 @@ class CodeGraphWindow(QMainWindow):
     def save_file_as(self):
         """Save as"""
         try:
-            self.validate_all_blocks()
+            self.validate_all_blocks(blocking=True)
         except Exception as e:
             pass
         file_path, _ = QFileDialog.getSaveFileName(
@@ -1365,17 +1867,17 @@ class CodeGraphWindow(QMainWindow):
     def save_to_file(self, file_path):
         """Save to file"""
         try:
-            self.validate_all_blocks()
+            self.validate_all_blocks(blocking=True)
         except Exception as e:
             pass
         try:
             self.save_all_directory_data()
             
-            save_data = dict(self.directory_data)
-            save_data['_root_path'] = self.root_path
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2)
+            # Packed files copy directories that were never opened as they are
+            if self.current_file_packed:
+                write_container(file_path, self.directory_data, self.root_path)
+            else:
+                write_json(file_path, self.directory_data, self.root_path)
             
             self.current_file = file_path
             self.statusBar().showMessage(f'Saved: {file_path}')
@@ -1410,145 +1912,40 @@ class CodeGraphWindow(QMainWindow):
     
     def extract_docstring(self, block):
         """Extract docstring from function or class, including imported symbols"""
-        if 'filePath' not in block.metadata:
-            return None
-        
-        file_path = block.metadata.get('filePath', '')
-        full_path = os.path.join(self.root_path, file_path)
+        return self.lookup_docstring(block.block_type, block.metadata)
+    
+    def lookup_docstring(self, block_type, metadata, resolver=None):
+        """Docstring lookup on plain block data
         
-        if not os.path.exists(full_path):
+        Safe to run off the GUI thread when resolver is passed in.
+        """
+        resolved = self.resolve_block_definition(block_type, metadata, resolver)
+        return resolved.definition.docstring if resolved else None
+    
+    def resolve_block_definition(self, block_type, metadata, resolver=None):
+        """Find the real definition behind a block, following imports and re-exports"""
+        if resolver is None:
+            resolver = self.get_module_resolver()
+        if resolver is None or 'filePath' not in metadata:
             return None
         
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                tree = ast.parse(content)
-                
-                target_name = block.metadata.get('functionName') or block.metadata.get('className')
-                
-                # First, try to find the definition in the current file
-                for node in ast.walk(tree):
-                    if block.block_type in ('FUNCTION', 'METHOD'):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            if node.name == target_name:
-                                return ast.get_docstring(node)
-                    elif block.block_type == 'CLASS':
-                        if isinstance(node, ast.ClassDef):
-                            if node.name == target_name:
-                                return ast.get_docstring(node)
-                
-                # If not found, check if it's imported and resolve the import
-                docstring = self._resolve_imported_docstring(tree, target_name, block.block_type, full_path)
-                if docstring:
-                    return docstring
-        
-        except Exception as e:
-            print(f"Error extracting docstring: {e}")
+        full_path = os.path.join(resolver.root_path, metadata.get('filePath', ''))
+        if not os.path.exists(full_path):
             return None
         
-        return None
-    
-    def _resolve_imported_docstring(self, tree, target_name, block_type, current_file_path):
-        """Resolve imports and extract docstring from the original definition"""
-        import_info = None
-        
-        # Search for import statements
-        for node in ast.walk(tree):
-            # Handle: from module import target_name
-            if isinstance(node, ast.ImportFrom):
-                for alias in node.names:
-                    imported_name = alias.name
-                    alias_name = alias.asname if alias.asname else alias.name
-                    
-                    if alias_name == target_name:
-                        # Found the import
-                        import_info = {
-                            'module': node.module,
-                            'name': imported_name,
-                            'level': node.level  # For relative imports
-                        }
-                        break
-            
-            # Handle: import module (less common but possible)
-            elif isinstance(node, ast.Import):
-                for alias in node.names:
-                    module_name = alias.name
-                    alias_name = alias.asname if alias.asname else alias.name
-                    
-                    if alias_name == target_name or target_name in module_name:
-                        import_info = {
-                            'module': module_name,
-                            'name': target_name,
-                            'level': 0
-                        }
-                        break
-            
-            if import_info:
-                break
-        
-        if not import_info:
-            return None
+        target_name = (metadata.get('functionName') or metadata.get('methodName')
+                       or metadata.get('className'))
+        kind = 'class' if block_type == 'CLASS' else 'function'
         
-        # Resolve the module path to a file
         try:
-            resolved_path = self._resolve_module_path(
-                import_info['module'], 
-                import_info['level'], 
-                current_file_path
-            )
-            
-            if not resolved_path or not os.path.exists(resolved_path):
-                return None
-            
-            # Parse the resolved file and extract docstring
-            with open(resolved_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                import_tree = ast.parse(content)
-                
-                for node in ast.walk(import_tree):
-                    if block_type in ('FUNCTION', 'METHOD'):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            if node.name == import_info['name']:
-                                return ast.get_docstring(node)
-                    elif block_type == 'CLASS':
-                        if isinstance(node, ast.ClassDef):
-                            if node.name == import_info['name']:
-                                return ast.get_docstring(node)
-        
+            return resolver.find_definition(full_path, target_name, kind)
         except Exception as e:
-            print(f"Error resolving import: {e}")
+            print(f"Error extracting docstring: {e}")
             return None
-        
-        return None
     
-    def _resolve_module_path(self, module_name, level, current_file_path):
-        """Convert module name to file path"""
-        if not module_name:
+    def resolve_search_result(self, result, kind, name):
+        """Definition an import search result points to, or None"""
+        resolver = self.get_module_resolver()
+        if result.get('type') != 'import' or resolver is None:
             return None
-        
-        # Get the directory of the current file
-        current_dir = os.path.dirname(current_file_path)
-        
-        # Handle relative imports (level > 0 means relative)
-        if level > 0:
-            # Go up 'level' directories
-            for _ in range(level):
-                current_dir = os.path.dirname(current_dir)
-        else:
-            # Absolute import - start from root_path
-            current_dir = self.root_path
-        
-        # Convert module.path.name to module/path/name.py
-        module_parts = module_name.split('.')
-        module_path = os.path.join(current_dir, *module_parts)
-        
-        # Try as a .py file first
-        if os.path.exists(module_path + '.py'):
-            return module_path + '.py'
-        
-        # Try as a package (__init__.py)
-        init_path = os.path.join(module_path, '__init__.py')
-        if os.path.exists(init_path):
-            return init_path
-        
-        return None
\ No newline at end of file
+        return resolver.find_definition(result['full_path'], name, kind)
@@ -0,0 +1,163 @@
+import os
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QLabel, QLineEdit, QListWidget,
+                             QListWidgetItem, QTextEdit, QDialogButtonBox)
+from PyQt5.QtCore import Qt, QEvent
+
+
+class SymbolPickerDialog(QDialog):
+    """Quick-open style picker that fuzzy-matches project symbols as you type.
+
+    Any typed name can be accepted, even one that is not in the project
+    yet. selected_location is (full path, line) when a listed symbol was
+    picked, otherwise None.
+    """
+
+    MAX_ROWS = 100
+
+    def __init__(self, main_window, kind, title, label, parent=None):
+        super().__init__(parent)
+
+        self.main_window = main_window
+        self.kind = kind
+        self.label = label
+        self.index = None
+        self.worker = None
+
+        self.selected_name = None
+        self.selected_location = None
+
+        self.setWindowTitle(title)
+        self.setMinimumSize(600, 420)
+
+        self.init_ui()
+        self.load_index()
+
+    def init_ui(self):
+        """Initialize UI"""
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel(self.label))
+
+        self.name_edit = QLineEdit()
+        self.name_edit.setPlaceholderText("Start typing to search the project...")
+        self.name_edit.textChanged.connect(self.update_results)
+        self.name_edit.installEventFilter(self)
+        layout.addWidget(self.name_edit)
+
+        self.results_list = QListWidget()
+        self.results_list.currentItemChanged.connect(self.update_preview)
+        self.results_list.itemDoubleClicked.connect(lambda item: self.accept())
+        layout.addWidget(self.results_list)
+
+        self.preview_text = QTextEdit()
+        self.preview_text.setReadOnly(True)
+        self.preview_text.setMaximumHeight(130)
+        layout.addWidget(self.preview_text)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.status_label)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+        self.setLayout(layout)
+
+    def load_index(self):
+        """Use the cached trigram index now and refresh it in the background if stale"""
+        symbol_index = self.main_window.get_symbol_index()
+        if symbol_index is None:
+            return
+
+        cached = self.main_window.trigram_indexes.get(self.kind)
+        if cached is not None:
+            self.index = cached[1]
+            if cached[0] == symbol_index.generation:
+                return
+
+        self.status_label.setText("Indexing project symbols...")
+        self.worker = self.main_window.refresh_trigram_index(self.kind)
+        self.worker.index_ready.connect(self.on_index_ready)
+
+    def on_index_ready(self, kind, index, generation):
+        """Swap in the freshly built index"""
+        self.index = index
+        self.status_label.setText(f"{len(index)} names indexed")
+        self.update_results(self.name_edit.text())
+
+    def update_results(self, text):
+        """Refill the result list for the typed text"""
+        self.results_list.clear()
+        if self.index is None or not text.strip():
+            return
+
+        typed = text.strip()
+        root_path = self.main_window.root_path
+        rows = 0
+        exact_row = None
+        for name, locations in self.index.search(text):
+            for full_path, line in locations:
+                item = QListWidgetItem(f"{name}    {os.path.relpath(full_path, root_path)}:{line}")
+                item.setData(Qt.UserRole, (name, (full_path, line)))
+                self.results_list.addItem(item)
+                if exact_row is None and name == typed:
+                    exact_row = rows
+                rows += 1
+                if rows >= self.MAX_ROWS:
+                    break
+            if rows >= self.MAX_ROWS:
+                break
+
+        # The typed name can always be used as is, e.g. for code not written yet
+        item = QListWidgetItem(f"➕ Use \"{typed}\" as typed")
+        item.setData(Qt.UserRole, (typed, None))
+        self.results_list.addItem(item)
+
+        # Enter takes an exact match, else the name as typed, never a mere fuzzy match
+        self.results_list.setCurrentRow(exact_row if exact_row is not None else rows)
+
+    def update_preview(self, current, previous):
+        """Show the code of the highlighted symbol"""
+        if not current:
+            self.preview_text.clear()
+            return
+
+        _, location = current.data(Qt.UserRole)
+        if location is None:
+            self.preview_text.clear()
+            return
+
+        full_path, line = location
+        symbol_index = self.main_window.get_symbol_index()
+        self.preview_text.setPlainText(symbol_index.definition_code(full_path, line))
+
+    def eventFilter(self, obj, event):
+        # Arrow keys in the name field move through the results
+        if obj is self.name_edit and event.type() == QEvent.KeyPress:
+            if event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+                self.results_list.keyPressEvent(event)
+                return True
+        return super().eventFilter(obj, event)
+
+    def accept(self):
+        """Take the highlighted symbol, or the typed name if nothing is listed"""
+        current_item = self.results_list.currentItem()
+        if current_item:
+            self.selected_name, self.selected_location = current_item.data(Qt.UserRole)
+        else:
+            self.selected_name = self.name_edit.text().strip()
+            self.selected_location = None
+        super().accept()
+
+    def done(self, result):
+        # The build keeps running for next time; just stop listening to it
+        if self.worker is not None:
+            try:
+                self.worker.index_ready.disconnect(self.on_index_ready)
+            except (TypeError, RuntimeError):
+                pass  # Already finished and deleted
+            self.worker = None
+        super().done(result)
@@ -0,0 +1,83 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class ValidationWorker(QThread):
+    """Runs block validation jobs on a thread pool off the GUI thread.
+
+    Results are delivered in batches through batch_ready so the GUI can apply
+    them incrementally while the rest of the jobs are still running.
+    """
+
+    progress = pyqtSignal(int, int)         # done, total
+    batch_ready = pyqtSignal(list)          # list of result dicts
+    validation_done = pyqtSignal(bool)      # cancelled
+
+    BATCH_SIZE = 50
+    BATCH_INTERVAL = 0.1  # seconds
+    MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+    # One pool for every run: its threads, and the SQLite connection each one
+    # opens on the symbol index, are reused instead of piling up per run
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, jobs, check_job, parent=None):
+        super().__init__(parent)
+
+        self.jobs = jobs
+        self.check_job = check_job
+        self._cancelled = False
+
+    @classmethod
+    def executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS)
+            return cls._executor
+
+    def cancel(self):
+        """Request cancellation; jobs already running finish, the rest are dropped"""
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        total = len(self.jobs)
+        done = 0
+        batch = []
+        last_emit = time.monotonic()
+
+        self.progress.emit(0, total)
+
+        executor = self.executor()
+        futures = [executor.submit(self.check_job, job) for job in self.jobs]
+
+        for future in as_completed(futures):
+            if self._cancelled:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+            try:
+                batch.append(future.result())
+            except Exception as e:
+                print(f"Error validating block: {e}")
+            done += 1
+
+            now = time.monotonic()
+            if len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL:
+                self.batch_ready.emit(batch)
+                self.progress.emit(done, total)
+                batch = []
+                last_emit = now
+
+        if batch and not self._cancelled:
+            self.batch_ready.emit(batch)
+        self.progress.emit(done, total)
+        self.validation_done.emit(self._cancelled)
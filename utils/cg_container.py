@@ -0,0 +1,251 @@
+import os
+import sys
+import stat
+import json
+import argparse
+import tempfile
+from collections.abc import MutableMapping
+
+
+# First bytes of a packed .cg file; plain .cg files are a JSON object
+MAGIC = b'CGPACK 1\n'
+# The index length is written as a fixed width decimal so it can be read back
+# without parsing anything else
+INDEX_LENGTH_DIGITS = 16
+
+
+def is_container(file_path):
+    """Whether file_path is a packed .cg file rather than plain JSON"""
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_index(file_path):
+    """Read a packed file's header.
+
+    Returns (root_path, entries, data_start): entries maps each directory
+    key to the (offset, length) of its JSON, relative to data_start.
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a packed CodeGraph file: {file_path}")
+        length_line = f.read(INDEX_LENGTH_DIGITS + 1)
+        try:
+            index_length = int(length_line)
+        except ValueError:
+            raise ValueError(f"Corrupt index header in {file_path}")
+        index = json.loads(f.read(index_length).decode('utf-8'))
+        data_start = f.tell()
+
+    entries = {key: (offset, length) for key, offset, length in index['directories']}
+    return index.get('root_path'), entries, data_start
+
+
+class LazyDirectoryData(MutableMapping):
+    """directory_data backed by a packed .cg file.
+
+    Keys come from the file's index; a directory's blocks and connections are
+    only decoded the first time it is looked up. Decoded or assigned entries
+    are held in memory as plain dicts and may be changed in place, so they
+    are always written out again. Untouched entries are copied byte for byte
+    when saving (see write_container).
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.root_path, self._entries, self._data_start = read_index(file_path)
+        self._stamp = _file_stamp(file_path)
+        self._loaded = {}  # key -> decoded data
+
+    def __getitem__(self, key):
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._entries:
+            raise KeyError(key)
+
+        data = json.loads(self.read_raw([key])[key].decode('utf-8'))
+        del self._entries[key]
+        self._loaded[key] = data
+        return data
+
+    def __setitem__(self, key, value):
+        self._entries.pop(key, None)
+        self._loaded[key] = value
+
+    def __delitem__(self, key):
+        if key in self._loaded:
+            del self._loaded[key]
+        elif key in self._entries:
+            del self._entries[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        yield from list(self._loaded)
+        yield from list(self._entries)
+
+    def __len__(self):
+        return len(self._loaded) + len(self._entries)
+
+    def __contains__(self, key):
+        # Without this, MutableMapping would decode the entry to answer
+        return key in self._loaded or key in self._entries
+
+    def is_decoded(self, key):
+        return key in self._loaded
+
+    def read_raw(self, keys):
+        """The stored JSON bytes of undecoded entries, read in file order"""
+        if _file_stamp(self.file_path) != self._stamp:
+            raise ValueError(f"{self.file_path} was changed on disk since it was opened")
+
+        raw = {}
+        with open(self.file_path, 'rb') as f:
+            for key in sorted(keys, key=lambda k: self._entries[k][0]):
+                offset, length = self._entries[key]
+                f.seek(self._data_start + offset)
+                raw[key] = f.read(length)
+        return raw
+
+    def rebind(self, file_path, entries, data_start):
+        """Point undecoded entries at a freshly written copy of the file"""
+        self.file_path = file_path
+        self._entries = {key: entries[key] for key in self._entries}
+        self._data_start = data_start
+        self._stamp = _file_stamp(file_path)
+
+
+def load_file(file_path):
+    """Open a .cg file of either format.
+
+    Returns (directory_data, root_path, packed). Packed files give a
+    LazyDirectoryData, plain JSON files a dict.
+    """
+    if is_container(file_path):
+        data = LazyDirectoryData(file_path)
+        return data, data.root_path, True
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    root_path = data.pop('_root_path', None)
+    return data, root_path, False
+
+
+def _file_mode(file_path):
+    """Permission bits a replacement for file_path should get.
+
+    Those of the existing file, or what open() would give a new one under
+    the current umask (mkstemp always creates 0600).
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _replace_atomically(file_path, write):
+    """Write a file through a temp file in the same folder, then swap it in"""
+    folder = os.path.dirname(os.path.abspath(file_path))
+    mode = _file_mode(file_path)
+    fd, temp_path = tempfile.mkstemp(prefix='.cg-', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            result = write(f)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return result
+
+
+def write_container(file_path, directory_data, root_path=None):
+    """Write directory_data as a packed .cg file.
+
+    If directory_data is a LazyDirectoryData, its undecoded entries are
+    copied from the source file without decoding them, and it is afterwards
+    pointed at the new file (which may be the file it was read from).
+    """
+    lazy = directory_data if isinstance(directory_data, LazyDirectoryData) else None
+    raw = {}
+    if lazy is not None:
+        raw = lazy.read_raw([key for key in lazy if not lazy.is_decoded(key)])
+
+    payloads = []
+    entries = {}
+    offset = 0
+    for key in directory_data:
+        if key in raw:
+            payload = raw[key]
+        else:
+            payload = json.dumps(directory_data[key], separators=(',', ':')).encode('utf-8')
+        payloads.append(payload)
+        entries[key] = (offset, len(payload))
+        offset += len(payload)
+
+    index = json.dumps({
+        'root_path': root_path,
+        'directories': [[key, start, length] for key, (start, length) in entries.items()],
+    }, separators=(',', ':')).encode('utf-8')
+    length_line = str(len(index)).zfill(INDEX_LENGTH_DIGITS).encode('ascii') + b'\n'
+
+    def write(f):
+        f.write(MAGIC)
+        f.write(length_line)
+        f.write(index)
+        data_start = f.tell()
+        for payload in payloads:
+            f.write(payload)
+        return data_start
+
+    data_start = _replace_atomically(file_path, write)
+    if lazy is not None:
+        lazy.rebind(file_path, entries, data_start)
+
+
+def write_json(file_path, directory_data, root_path=None):
+    """Write directory_data as a plain JSON .cg file"""
+    save_data = dict(directory_data)
+    save_data['_root_path'] = root_path
+    text = json.dumps(save_data, indent=2).encode('utf-8')
+    _replace_atomically(file_path, lambda f: f.write(text))
+
+
+def main(argv=None):
+    """Convert .cg files between plain JSON and the packed format"""
+    parser = argparse.ArgumentParser(
+        prog='python -m utils.cg_container',
+        description='Convert CodeGraph (.cg) files between plain JSON and the packed format'
+    )
+    parser.add_argument('mode', choices=['pack', 'unpack'],
+                        help='pack: JSON -> packed, unpack: packed -> JSON')
+    parser.add_argument('source', help='File to convert')
+    parser.add_argument('target', help='File to write (may be the same as source)')
+    args = parser.parse_args(argv)
+
+    try:
+        directory_data, root_path, packed = load_file(args.source)
+        if args.mode == 'pack':
+            write_container(args.target, directory_data, root_path)
+        else:
+            write_json(args.target, dict(directory_data), root_path)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Wrote {len(directory_data)} directories to {args.target}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import os
+import threading
+from collections import namedtuple
+
+from utils.parse_cache import parse_cache
+from utils.symbol_extractor import find_definition
+
+
+ResolvedDefinition = namedtuple('ResolvedDefinition', ['path', 'definition'])
+
+# Longest chain of re-exports followed before giving up
+MAX_IMPORT_HOPS = 16
+
+
+class ModuleResolver:
+    """Maps imports to the files and definitions they refer to.
+
+    Dotted module names (absolute from the project root, or relative to the
+    importing file) are resolved to a .py file or package __init__.py once
+    and memoized. Symbol lookups follow `from x import y` and `import *`
+    re-exports, e.g. through package __init__ files, until they reach the
+    real definition. Memoized symbol results remember the (mtime_ns, size)
+    of every file on the chain, so an edit anywhere on it is picked up, and
+    the files an unresolved import could have been (fingerprint None), so
+    creating one of them is picked up too.
+    """
+
+    def __init__(self, root_path):
+        self.root_path = os.path.abspath(root_path)
+
+        self._modules = {}   # (base dir, dotted name) -> file path; misses are not kept
+        self._symbols = {}   # (file path, name, kind) -> (ResolvedDefinition or None, fingerprints)
+        self._lock = threading.Lock()
+
+    def resolve_module(self, module_name, level, current_file_path, missing=None):
+        """File for an import of module_name at the given relative level, or None
+
+        On a miss, the files that would have satisfied the import are added
+        to the missing dict (path -> None).
+        """
+        if level > 0:
+            # from . import x -> current package, from .. import x -> its parent
+            base_dir = os.path.dirname(os.path.abspath(current_file_path))
+            for _ in range(level - 1):
+                base_dir = os.path.dirname(base_dir)
+        else:
+            base_dir = self.root_path
+
+        key = (base_dir, module_name or '')
+        with self._lock:
+            if key in self._modules:
+                return self._modules[key]
+
+        module_path = os.path.join(base_dir, *module_name.split('.')) if module_name else base_dir
+
+        candidates = [os.path.join(module_path, '__init__.py')]
+        if module_name:
+            candidates.insert(0, module_path + '.py')
+
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                with self._lock:
+                    self._modules[key] = candidate
+                return candidate
+
+        # Not memoized: the module may be created later
+        if missing is not None:
+            for candidate in candidates:
+                missing[candidate] = None
+        return None
+
+    def find_definition(self, file_path, name, kind):
+        """Find where name (as seen from file_path) is really defined.
+
+        Returns a ResolvedDefinition or None.
+        """
+        file_path = os.path.abspath(file_path)
+        key = (file_path, name, kind)
+
+        with self._lock:
+            cached = self._symbols.get(key)
+        if cached is not None and all(self._fingerprint(p) == f for p, f in cached[1].items()):
+            return cached[0]
+
+        fingerprints = {}
+        resolved = self._follow(file_path, name, kind, fingerprints, set())
+
+        with self._lock:
+            self._symbols[key] = (resolved, fingerprints)
+        return resolved
+
+    def dependencies(self, file_path, name, kind):
+        """{path: (mtime_ns, size)} of the files the last find_definition result depends on"""
+        with self._lock:
+            cached = self._symbols.get((os.path.abspath(file_path), name, kind))
+        return dict(cached[1]) if cached is not None else {}
+
+    def _fingerprint(self, path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _follow(self, file_path, name, kind, fingerprints, visited):
+        if (file_path, name) in visited or len(visited) >= MAX_IMPORT_HOPS:
+            return None  # Import cycle or absurdly long chain
+        visited.add((file_path, name))
+
+        fingerprints[file_path] = self._fingerprint(file_path)
+        try:
+            symbols = parse_cache.symbols(file_path)
+        except Exception as e:
+            print(f"Error resolving import: {e}")
+            return None
+
+        definition = find_definition(symbols, name, kind)
+        if definition:
+            return ResolvedDefinition(file_path, definition)
+
+        star_imports = []
+        for imported in symbols.imports:
+            if imported.name == '*':
+                star_imports.append(imported)
+            elif imported.name is not None:
+                # from module import name [as alias]
+                if imported.alias == name:
+                    target = self.resolve_module(imported.module, imported.level, file_path, fingerprints)
+                    if target:
+                        return self._follow(target, imported.name, kind, fingerprints, visited)
+                    return None
+            elif imported.alias == name or name in imported.module:
+                # import module (less common but possible)
+                target = self.resolve_module(imported.module, 0, file_path, fingerprints)
+                if target:
+                    resolved = self._follow(target, name, kind, fingerprints, visited)
+                    if resolved:
+                        return resolved
+
+        # from module import * re-exports everything public
+        for imported in star_imports:
+            target = self.resolve_module(imported.module, imported.level, file_path, fingerprints)
+            if target:
+                resolved = self._follow(target, name, kind, fingerprints, visited)
+                if resolved:
+                    return resolved
+
+        return None
+
+    def invalidate(self, file_paths):
+        """Forget results that may depend on the given (changed, added or removed) files"""
+        changed = {os.path.abspath(p) for p in file_paths}
+        with self._lock:
+            self._modules = {
+                key: path for key, path in self._modules.items() if path not in changed
+            }
+            self._symbols = {
+                key: value for key, value in self._symbols.items()
+                if not changed.intersection(value[1])
+            }
+
+    def clear(self):
+        """Forget everything"""
+        with self._lock:
+            self._modules.clear()
+            self._symbols.clear()
@@ -0,0 +1,125 @@
+import os
+import ast
+import threading
+from collections import OrderedDict, namedtuple
+
+from utils.symbol_extractor import extract_file_symbols
+
+
+ParsedFile = namedtuple('ParsedFile', ['path', 'tree', 'source', 'lines'])
+
+# Rough in-memory size of an AST relative to its source text
+AST_COST_FACTOR = 12
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    """LRU cache of parsed .py files shared by every AST consumer.
+
+    Entries are keyed by (path, mtime_ns, size), so an edited file is reparsed
+    on its next lookup. The total estimated memory of cached trees is capped
+    at max_bytes; least recently used files are evicted first.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # path -> [key, ParsedFile, cost, FileSymbols or None]
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path):
+        """Return the ParsedFile for file_path, parsing it if needed.
+
+        Raises OSError, UnicodeDecodeError or SyntaxError like a plain
+        open() + ast.parse() would.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Parse outside the lock so worker threads don't serialize on it
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        tree = ast.parse(source)
+        parsed = ParsedFile(path, tree, source, source.split('\n'))
+        cost = len(source) * AST_COST_FACTOR
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            if cost <= self.max_bytes:
+                self._entries[path] = [key, parsed, cost, None]
+                self._total_bytes += cost
+                self._evict()
+
+        return parsed
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry[2]
+            self.evictions += 1
+
+    def symbols(self, file_path):
+        """Return the FileSymbols record of a file, extracted once per parse"""
+        parsed = self.get(file_path)
+
+        with self._lock:
+            entry = self._entries.get(parsed.path)
+            if entry is not None and entry[1] is parsed and entry[3] is not None:
+                return entry[3]
+
+        symbols = extract_file_symbols(parsed.tree, parsed.lines)
+
+        with self._lock:
+            entry = self._entries.get(parsed.path)
+            if entry is not None and entry[1] is parsed:
+                entry[3] = symbols
+
+        return symbols
+
+    def invalidate(self, file_path):
+        """Drop a single file from the cache"""
+        with self._lock:
+            entry = self._entries.pop(os.path.abspath(file_path), None)
+            if entry is not None:
+                self._total_bytes -= entry[2]
+
+    def clear(self):
+        """Drop every cached file"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Counters for tuning the cache size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'files': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Single process-wide instance used by search, validation and docstrings
+parse_cache = ParseCache()
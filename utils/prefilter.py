@@ -0,0 +1,25 @@
+import os
+import mmap
+
+
+# Files at least this big are searched through mmap instead of read()
+MMAP_THRESHOLD = 256 * 1024
+
+
+def file_contains(file_path, needle):
+    """Check whether the raw bytes of a file contain needle (bytes).
+
+    A file that cannot be read counts as a candidate, so the parser gets to
+    report the error as usual.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return False
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped.find(needle) != -1
+            return needle in f.read()
+    except (OSError, ValueError):
+        return True
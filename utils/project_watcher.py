@@ -0,0 +1,110 @@
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+class ProjectWatcher(QObject):
+    """Watches the project directories the diagram refers to.
+
+    Only directories that blocks search in (and the .py files directly
+    inside them) are watched, which keeps the number of OS watches small on
+    big trees. Bursts of events are debounced and reported once through
+    project_changed(files, directories).
+    """
+
+    project_changed = pyqtSignal(list, list)  # touched .py files, touched directories
+
+    DEBOUNCE_MS = 300
+
+    def __init__(self, root_path, parent=None):
+        super().__init__(parent)
+
+        self.root_path = os.path.abspath(root_path)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+
+        self._directories = set()
+        self._files = {}  # directory -> set of watched .py paths
+
+        self._pending_files = set()
+        self._pending_dirs = set()
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.flush)
+
+    def set_directories(self, directories):
+        """Watch exactly these directories (and their .py files)"""
+        wanted = {os.path.abspath(d) for d in directories if os.path.isdir(d)}
+
+        for directory in self._directories - wanted:
+            self.watcher.removePath(directory)
+            files = self._files.pop(directory, set())
+            if files:
+                self.watcher.removePaths(list(files))
+
+        for directory in wanted - self._directories:
+            self.watcher.addPath(directory)
+            files = self._list_py_files(directory)
+            self._files[directory] = files
+            if files:
+                self.watcher.addPaths(list(files))
+
+        self._directories = wanted
+
+    def _list_py_files(self, directory):
+        try:
+            with os.scandir(directory) as entries:
+                return {
+                    os.path.abspath(entry.path) for entry in entries
+                    if entry.name.endswith('.py') and entry.is_file()
+                }
+        except OSError:
+            return set()
+
+    def on_directory_changed(self, path):
+        """A file or folder was added, removed or renamed in a watched directory"""
+        directory = os.path.abspath(path)
+        if directory not in self._directories:
+            return
+
+        old_files = self._files.get(directory, set())
+        new_files = self._list_py_files(directory)
+
+        added = new_files - old_files
+        if added:
+            self.watcher.addPaths(list(added))
+        self._files[directory] = new_files
+
+        self._pending_files |= added | (old_files - new_files)
+        self._pending_dirs.add(directory)
+        self._debounce.start()
+
+    def on_file_changed(self, path):
+        """A watched .py file was modified, replaced or deleted"""
+        file_path = os.path.abspath(path)
+
+        # Editors that save by replacing the file drop the watch; re-add it
+        if os.path.exists(file_path) and file_path not in self.watcher.files():
+            self.watcher.addPath(file_path)
+
+        self._pending_files.add(file_path)
+        self._debounce.start()
+
+    def flush(self):
+        """Report everything touched since the last flush"""
+        files = sorted(self._pending_files)
+        directories = sorted(self._pending_dirs | {os.path.dirname(f) for f in files})
+        self._pending_files = set()
+        self._pending_dirs = set()
+
+        if files or directories:
+            self.project_changed.emit(files, directories)
+
+    def stop(self):
+        """Stop watching everything"""
+        self._debounce.stop()
+        self.set_directories([])
@@ -0,0 +1,111 @@
+import os
+import ast
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.parse_cache import parse_cache
+from utils.symbol_extractor import extract_file_symbols
+
+
+def parse_file_symbols(file_path):
+    """Parse a file through the shared parse cache, returning its FileSymbols"""
+    return parse_cache.symbols(file_path)
+
+
+def scan_file(file_path):
+    """Parse one file into a compact symbol table (runs in worker processes).
+
+    Returns (path, definitions, imports, error). The tree itself never leaves
+    the worker; only the plain tuples are pickled back.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        tree = ast.parse(content)
+        definitions, imports = extract_file_symbols(tree, content.split('\n'))
+        return file_path, definitions, imports, None
+    except Exception as e:
+        return file_path, [], [], f"{type(e).__name__}: {e}"
+
+
+def _scan_file_cached(file_path):
+    """In-process variant that keeps the tree in the shared parse cache"""
+    try:
+        definitions, imports = parse_file_symbols(file_path)
+        return file_path, definitions, imports, None
+    except Exception as e:
+        return file_path, [], [], f"{type(e).__name__}: {e}"
+
+
+class SymbolScanner:
+    """Fans file parsing out across CPU cores with a process pool.
+
+    Small batches are parsed in-process: starting and feeding worker
+    processes costs more than it saves for a handful of files, and in-process
+    parses also warm the shared parse cache.
+    """
+
+    # Below this many files, parse in the calling process
+    PARALLEL_THRESHOLD = 32
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawn, not fork: forking a process that runs Qt threads
+                # and holds an sqlite connection can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def scan(self, paths, cancelled=None):
+        """Yield (path, definitions, imports, error) for every path.
+
+        cancelled is an optional callable; once it returns True the
+        remaining files are skipped, including ones already handed to the
+        worker processes.
+        """
+        paths = list(paths)
+
+        if len(paths) < self.PARALLEL_THRESHOLD or self.max_workers == 1:
+            for path in paths:
+                if cancelled and cancelled():
+                    return
+                yield _scan_file_cached(path)
+            return
+
+        # Several chunks per worker keeps cores busy when file sizes vary
+        chunksize = max(1, min(64, len(paths) // (self.max_workers * 4)))
+
+        done = 0  # map yields in order, so paths[done:] are still pending
+        try:
+            for result in self._get_executor().map(scan_file, paths, chunksize=chunksize):
+                if cancelled and cancelled():
+                    # map submitted every chunk up front; drop the ones not started
+                    self.shutdown(cancel_futures=True)
+                    return
+                yield result
+                done += 1
+        except BrokenProcessPool as e:
+            # A crashed worker takes the pool down; start fresh next time
+            print(f"Scanner pool failed ({e}), parsing in-process")
+            self.shutdown()
+            for path in paths[done:]:
+                if cancelled and cancelled():
+                    return
+                yield _scan_file_cached(path)
+
+    def shutdown(self, cancel_futures=False):
+        """Stop the worker processes, optionally dropping work not yet started"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+                self._executor = None
@@ -0,0 +1,92 @@
+import ast
+from collections import namedtuple
+
+
+SNIPPET_LINES = 10
+
+# Field order matches the symbol index columns
+Definition = namedtuple('Definition', ['name', 'qualname', 'kind', 'line', 'end_line', 'docstring', 'code'])
+Import = namedtuple('Import', ['module', 'name', 'alias', 'level', 'line', 'code'])
+FileSymbols = namedtuple('FileSymbols', ['definitions', 'imports'])
+
+# Statement lists are the only places definitions and imports can appear
+STATEMENT_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+
+class SymbolExtractor(ast.NodeVisitor):
+    """Collects definitions, imports, docstrings and line spans in one pass.
+
+    Only statement bodies are descended into; expressions can never hold a
+    def, class or import, so skipping them is what makes this pass cheap.
+    """
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.definitions = []
+        self.imports = []
+        self._scope = []
+
+    def generic_visit(self, node):
+        for field in STATEMENT_FIELDS:
+            children = getattr(node, field, None)
+            if children:
+                for child in children:
+                    self.visit(child)
+
+    def visit_FunctionDef(self, node):
+        self._add_definition(node, 'function')
+
+    def visit_AsyncFunctionDef(self, node):
+        self._add_definition(node, 'function')
+
+    def visit_ClassDef(self, node):
+        self._add_definition(node, 'class')
+
+    def _add_definition(self, node, kind):
+        self._scope.append(node.name)
+
+        start_line = node.lineno - 1
+        end_line = min(start_line + SNIPPET_LINES, len(self.lines))
+        self.definitions.append(Definition(
+            node.name,
+            '.'.join(self._scope),
+            kind,
+            node.lineno,
+            getattr(node, 'end_lineno', None) or node.lineno,
+            ast.get_docstring(node),
+            '\n'.join(self.lines[start_line:end_line])
+        ))
+
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def _line(self, line_num):
+        return self.lines[line_num - 1] if line_num <= len(self.lines) else ''
+
+    def visit_Import(self, node):
+        # import module [as alias]
+        code = self._line(node.lineno)
+        for alias in node.names:
+            self.imports.append(Import(alias.name, None, alias.asname or alias.name, 0, node.lineno, code))
+
+    def visit_ImportFrom(self, node):
+        # from module import name [as alias]
+        code = self._line(node.lineno)
+        for alias in node.names:
+            self.imports.append(Import(node.module, alias.name, alias.asname or alias.name,
+                                       node.level, node.lineno, code))
+
+
+def extract_file_symbols(tree, lines):
+    """Run the extractor over a parsed file and return its FileSymbols"""
+    extractor = SymbolExtractor(lines)
+    extractor.visit(tree)
+    return FileSymbols(extractor.definitions, extractor.imports)
+
+
+def find_definition(symbols, name, kind):
+    """First definition of name with the given kind ('function' or 'class')"""
+    for definition in symbols.definitions:
+        if definition.name == name and definition.kind == kind:
+            return definition
+    return None
@@ -0,0 +1,477 @@
+import os
+import sqlite3
+import threading
+import hashlib
+import tempfile
+from collections import deque
+
+from utils.scanner import SymbolScanner
+from utils.prefilter import file_contains
+
+
+INDEX_FILENAME = 'codegraph.cgindex'
+
+# Bump whenever the table layout or the extracted data changes
+SCHEMA_VERSION = 2
+
+# How many generations of changed paths are remembered for changed_since()
+CHANGE_LOG_SIZE = 64
+
+# Directories never worth indexing during a whole-project build
+SKIP_DIRS = {'__pycache__', 'node_modules', 'venv', '.venv', 'env', 'site-packages', 'build', 'dist'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+
+CREATE TABLE IF NOT EXISTS definitions (
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    docstring TEXT,
+    code TEXT
+);
+CREATE INDEX IF NOT EXISTS definitions_name ON definitions(name);
+CREATE INDEX IF NOT EXISTS definitions_path ON definitions(path);
+
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT NOT NULL,
+    module TEXT,
+    name TEXT,
+    alias TEXT,
+    level INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    code TEXT
+);
+CREATE INDEX IF NOT EXISTS imports_name ON imports(name);
+CREATE INDEX IF NOT EXISTS imports_alias ON imports(alias);
+CREATE INDEX IF NOT EXISTS imports_path ON imports(path);
+"""
+
+
+class SymbolIndex:
+    """Persistent SQLite index of definitions and imports per .py file.
+
+    Files are keyed by path + mtime + size, so only files that changed since
+    the last lookup get reparsed. Parsing goes through a SymbolScanner, which
+    spreads large batches across processes. Each thread gets its own
+    connection.
+    """
+
+    def __init__(self, root_path, db_path=None, scanner=None):
+        self.root_path = os.path.abspath(root_path)
+        self.db_path = db_path or os.path.join(self.root_path, INDEX_FILENAME)
+        self.scanner = scanner or SymbolScanner()
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._dir_locks = {}
+        self._connections = []
+
+        self.prefilter_checked = 0
+        self.prefilter_skipped = 0
+
+        # Bumped whenever stored symbols change, so derived caches know to rebuild
+        self.generation = 0
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (generation, changed paths)
+
+        try:
+            self._init_schema()
+        except sqlite3.Error as e:
+            # Read-only project folders still get an index, just not next to the .cg
+            print(f"Symbol index unavailable at {self.db_path}: {e}")
+            digest = hashlib.sha1(self.root_path.encode('utf-8')).hexdigest()[:12]
+            self.db_path = os.path.join(tempfile.gettempdir(), f"codegraph_{digest}.cgindex")
+            self._local = threading.local()
+            self._init_schema()
+
+    def _connection(self):
+        """Get the SQLite connection for the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._write_lock:
+                self._connections.append(conn)
+        return conn
+
+    def release_thread_connection(self):
+        """Close the calling thread's connection; call before a worker thread ends"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._write_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _init_schema(self):
+        """Create tables, rebuilding them if the schema version changed"""
+        conn = self._connection()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.executescript("""
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS definitions;
+                DROP TABLE IF EXISTS imports;
+            """)
+        conn.executescript(SCHEMA)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+
+    def close(self):
+        """Close all connections opened by this index and stop the scanner"""
+        self.scanner.shutdown()
+        for conn in self._connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._connections = []
+        self._local = threading.local()
+
+    def _directory_lock(self, directory):
+        """Per-directory lock so concurrent lookups don't reparse the same files"""
+        with self._write_lock:
+            lock = self._dir_locks.get(directory)
+            if lock is None:
+                lock = self._dir_locks[directory] = threading.Lock()
+            return lock
+
+    def refresh_directory(self, search_path, name=None):
+        """Reparse new or changed .py files directly inside search_path
+
+        With a name, stale files whose raw bytes don't contain it are not
+        parsed at all: they cannot define or import it. Their rows and
+        mtime/size are left as they are, so they stay stale and get parsed
+        by a later lookup that needs them. Returns the set of skipped paths,
+        whose old rows must be ignored for this lookup.
+        """
+        directory = os.path.abspath(search_path)
+
+        with self._directory_lock(directory):
+            conn = self._connection()
+
+            on_disk = {}
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.py') and entry.is_file():
+                            stat = entry.stat()
+                            on_disk[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                on_disk = {}
+
+            indexed = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute(
+                    'SELECT path, mtime_ns, size FROM files WHERE dir = ?', (directory,)
+                )
+            }
+
+            stale = {path: key for path, key in on_disk.items() if indexed.get(path) != key}
+            removed = [path for path in indexed if path not in on_disk]
+
+            skipped = set()
+            if name and stale:
+                needle = name.encode('utf-8')
+                skipped = {path for path in stale if not file_contains(path, needle)}
+                self._count_prefilter(len(stale), len(skipped))
+                for path in skipped:
+                    del stale[path]
+
+            if stale or removed:
+                self._store(conn, stale, removed)
+
+            return skipped
+
+    def _count_prefilter(self, checked, skipped):
+        with self._write_lock:
+            self.prefilter_checked += checked
+            self.prefilter_skipped += skipped
+
+    def prefilter_stats(self):
+        """How many stale files the byte prefilter looked at and skipped"""
+        checked = self.prefilter_checked
+        skipped = self.prefilter_skipped
+        return {
+            'checked': checked,
+            'skipped': skipped,
+            'skip_ratio': skipped / checked if checked else 0.0,
+        }
+
+    def build(self, progress=None, cancelled=None, path=None):
+        """Index every .py file under the root path, reparsing only changed files.
+
+        path limits the build to one file or subtree of the root.
+        progress(done, total) is called as files are stored; cancelled() is
+        polled between files. Returns the number of files reparsed.
+        """
+        top = os.path.abspath(path or self.root_path)
+
+        on_disk = {}
+        if os.path.isfile(top):
+            stat = os.stat(top)
+            on_disk[top] = (stat.st_mtime_ns, stat.st_size)
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS]
+            for filename in filenames:
+                if not filename.endswith('.py'):
+                    continue
+                file_path = os.path.abspath(os.path.join(dirpath, filename))
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                on_disk[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        conn = self._connection()
+        indexed = {
+            file_path: (mtime_ns, size)
+            for file_path, mtime_ns, size in conn.execute(
+                'SELECT path, mtime_ns, size FROM files WHERE ' + self._under_clause(),
+                self._under_params(top)
+            )
+        }
+
+        stale = {file_path: key for file_path, key in on_disk.items() if indexed.get(file_path) != key}
+        removed = [file_path for file_path in indexed if file_path not in on_disk]
+
+        return self._store(conn, stale, removed, progress, cancelled)
+
+    def _under_clause(self, column='path'):
+        # A file itself, or anything below a directory (index-friendly range)
+        return f'({column} = ? OR ({column} >= ? AND {column} < ?))'
+
+    def _under_params(self, top):
+        return (top, top + os.sep, top + chr(ord(os.sep) + 1))
+
+    def _store(self, conn, stale, removed, progress=None, cancelled=None):
+        """Scan stale files (in parallel when there are many) and write them.
+
+        Returns the number of files parsed.
+        """
+        total = len(stale)
+        done = 0
+        pending = []
+
+        with self._write_lock:
+            for path in removed:
+                self._delete_file(conn, path)
+            conn.commit()
+
+        try:
+            for result in self.scanner.scan(list(stale), cancelled):
+                pending.append(result)
+                done += 1
+                # Commit in chunks so a cancelled build keeps what it finished
+                if len(pending) >= 500:
+                    self._write_results(conn, pending, stale)
+                    pending = []
+                    if progress:
+                        progress(done, total)
+
+            if pending:
+                self._write_results(conn, pending, stale)
+            if progress:
+                progress(done, total)
+        finally:
+            # Bumped once the rows are written, so a reader that saw the new
+            # generation also sees the new rows
+            if stale or removed:
+                with self._write_lock:
+                    self.generation += 1
+                    self._changes.append((self.generation, set(stale) | set(removed)))
+
+        return done
+
+    def changed_since(self, generation):
+        """Paths whose symbols changed after generation.
+
+        Returns None when that is too far back to know, so derived caches
+        have to be rebuilt from scratch.
+        """
+        with self._write_lock:
+            if generation == self.generation:
+                return set()
+            if generation > self.generation or not self._changes or self._changes[0][0] > generation + 1:
+                return None
+            changed = set()
+            for changed_generation, paths in self._changes:
+                if changed_generation > generation:
+                    changed.update(paths)
+            return changed
+
+    def _write_results(self, conn, results, keys):
+        with self._write_lock:
+            for path, definitions, imports, error in results:
+                if error:
+                    # Keep the row so a broken file is not reparsed until it changes
+                    print(f"Error: {error}")
+                self._index_file(conn, path, keys[path], definitions, imports)
+            conn.commit()
+
+    def _delete_file(self, conn, path):
+        conn.execute('DELETE FROM files WHERE path = ?', (path,))
+        conn.execute('DELETE FROM definitions WHERE path = ?', (path,))
+        conn.execute('DELETE FROM imports WHERE path = ?', (path,))
+
+    def _index_file(self, conn, path, key, definitions, imports):
+        """Replace the stored symbols of one file"""
+        self._delete_file(conn, path)
+        conn.execute(
+            'INSERT INTO files (path, dir, mtime_ns, size) VALUES (?, ?, ?, ?)',
+            (path, os.path.dirname(path), key[0], key[1])
+        )
+        conn.executemany(
+            'INSERT INTO definitions (path, name, qualname, kind, line, end_line, docstring, code) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(path,) + row for row in definitions]
+        )
+        conn.executemany(
+            'INSERT INTO imports (path, module, name, alias, level, line, code) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(path,) + row for row in imports]
+        )
+
+    def symbols_in_files(self, paths):
+        """Names and imported modules currently indexed for the given files.
+
+        Returns (names, modules): names holds definition names plus imported
+        names and aliases.
+        """
+        conn = self._connection()
+        names = set()
+        modules = set()
+
+        for path in paths:
+            path = os.path.abspath(path)
+            for (name,) in conn.execute('SELECT name FROM definitions WHERE path = ?', (path,)):
+                names.add(name)
+            for module, name, alias in conn.execute(
+                'SELECT module, name, alias FROM imports WHERE path = ?', (path,)
+            ):
+                names.update(n for n in (name, alias) if n)
+                if module:
+                    modules.add(module)
+
+        return names, modules
+
+    def iter_definitions(self, kind, paths=None):
+        """(name, (full path, line)) for every indexed definition of a kind.
+
+        paths limits it to those files.
+        """
+        conn = self._connection()
+        if paths is None:
+            rows = conn.execute('SELECT name, path, line FROM definitions WHERE kind = ?', (kind,))
+        else:
+            rows = (
+                row for path in paths for row in conn.execute(
+                    'SELECT name, path, line FROM definitions WHERE path = ? AND kind = ?', (path, kind)
+                )
+            )
+        for name, path, line in rows:
+            yield name, (path, line)
+
+    def definition_code(self, path, line):
+        """Stored code snippet of the definition starting at path:line"""
+        row = self._connection().execute(
+            'SELECT code FROM definitions WHERE path = ? AND line = ?', (os.path.abspath(path), line)
+        ).fetchone()
+        return row[0] if row else ''
+
+    def definitions_under(self, path):
+        """Every indexed definition in a file or below a directory.
+
+        Call build(path=...) first so the rows are current. Returns dicts
+        ordered by file and line.
+        """
+        top = os.path.abspath(path)
+        conn = self._connection()
+
+        return [
+            {
+                'file': os.path.relpath(file_path, self.root_path),
+                'full_path': file_path,
+                'name': name,
+                'qualname': qualname,
+                'kind': kind,
+                'line': line,
+                'docstring': docstring,
+            }
+            for file_path, name, qualname, kind, line, docstring in conn.execute(
+                'SELECT path, name, qualname, kind, line, docstring FROM definitions WHERE '
+                + self._under_clause() + ' ORDER BY path, line',
+                self._under_params(top)
+            )
+        ]
+
+    def search(self, name, search_path, kind):
+        """Find definitions and imports of name in the .py files of search_path.
+
+        kind is 'function' or 'class'. Returns result dicts in the same shape
+        the search dialogs have always used.
+        """
+        directory = os.path.abspath(search_path)
+        # Skipped files can't mention name now, whatever their old rows say
+        skipped = self.refresh_directory(directory, name)
+        conn = self._connection()
+
+        results = []
+
+        for path, line, code in conn.execute(
+            """SELECT d.path, d.line, d.code FROM definitions d
+               JOIN files f ON f.path = d.path
+               WHERE f.dir = ? AND d.name = ? AND d.kind = ?
+               ORDER BY d.path, d.line""",
+            (directory, name, kind)
+        ):
+            if path not in skipped:
+                results.append(self._result(path, line, code, 'definition'))
+
+        # from module import name  -> name or alias must match
+        # import module            -> name may be part of the module path
+        if kind == 'class':
+            plain_import_match = 'instr(i.module, ?) > 0 OR i.alias = ?'
+            params = (directory, name, name, name, name)
+        else:
+            plain_import_match = 'instr(i.module, ?) > 0'
+            params = (directory, name, name, name)
+
+        for path, line, code in conn.execute(
+            f"""SELECT i.path, i.line, i.code FROM imports i
+                JOIN files f ON f.path = i.path
+                WHERE f.dir = ? AND (
+                    (i.name IS NOT NULL AND (i.name = ? OR i.alias = ?))
+                    OR (i.name IS NULL AND ({plain_import_match}))
+                )
+                ORDER BY i.path, i.line""",
+            params
+        ):
+            if path not in skipped:
+                results.append(self._result(path, line, code, 'import'))
+
+        return results
+
+    def _result(self, path, line, code, result_type):
+        return {
+            'file': os.path.relpath(path, self.root_path),
+            'line': line,
+            'full_path': path,
+            'code': code,
+            'type': result_type
+        }
@@ -0,0 +1,193 @@
+import bisect
+import copy
+import heapq
+from array import array
+from collections import Counter
+
+
+def trigrams(text):
+    """Distinct 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """In-memory fuzzy name index for type-ahead symbol pickers.
+
+    Distinct names are numbered shortest first, so posting lists (trigram ->
+    name ids) come out length-ordered and the first hits are also the best
+    ones to show. Lookups go exact/prefix (bisect over the sorted names),
+    then substring (rarest posting list), then fuzzy (names sharing
+    most of the query's trigrams), stopping as soon as limit is reached.
+    """
+
+    # Most posting entries counted per fuzzy lookup
+    FUZZY_BUDGET = 30000
+    # Most names updated() keeps in the overlay before asking for a rebuild
+    OVERLAY_LIMIT = 20000
+
+    def __init__(self, entries):
+        """entries: iterable of (name, location); a name may repeat"""
+        locations = {}
+        for name, location in entries:
+            locations.setdefault(name, []).append(location)
+
+        self.names = sorted(locations, key=lambda n: (len(n), n.lower()))
+        self.locations = [locations[name] for name in self.names]
+        self.lowered = [name.lower() for name in self.names]
+
+        # Sorted (lowercase name, id) pairs for exact and prefix lookups
+        self._sorted = sorted(zip(self.lowered, range(len(self.names))))
+        self._sorted_keys = [key for key, _ in self._sorted]
+
+        self._postings = {}
+        for name_id, name in enumerate(self.lowered):
+            for gram in trigrams(name):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array('I')
+                postings.append(name_id)
+
+        self.overlay = None  # Names added by updated()
+        self._ids = None  # name -> id, built on first update
+        self._path_ids = None  # path -> ids of names defined there
+
+    def __len__(self):
+        return len(self.names) + (len(self.overlay) if self.overlay is not None else 0)
+
+    def updated(self, paths, entries):
+        """A copy with the locations in paths replaced by entries.
+
+        entries: (name, location) of every definition now in those files.
+        Known names keep their ids; new names go into a small overlay index
+        searched next to this one. self is left untouched, so it can keep
+        serving searches meanwhile. Returns None once the overlay would grow
+        past OVERLAY_LIMIT names, as a full rebuild is then due.
+        """
+        paths = set(paths)
+        if self._ids is None:
+            self._ids = {name: name_id for name_id, name in enumerate(self.names)}
+            self._path_ids = {}
+            for name_id, locs in enumerate(self.locations):
+                for location in locs:
+                    self._path_ids.setdefault(location[0], set()).add(name_id)
+
+        # Only the location lists of touched names are copied
+        index = copy.copy(self)
+        index.locations = list(self.locations)
+        index._path_ids = dict(self._path_ids)
+        fresh = set()
+        for path in paths:
+            for name_id in index._path_ids.pop(path, ()):
+                index.locations[name_id] = [loc for loc in index.locations[name_id] if loc[0] not in paths]
+                fresh.add(name_id)
+
+        overlay = {}
+        if self.overlay is not None:
+            for name, locs in zip(self.overlay.names, self.overlay.locations):
+                kept = [loc for loc in locs if loc[0] not in paths]
+                if kept:
+                    overlay[name] = kept
+
+        for name, location in entries:
+            name_id = self._ids.get(name)
+            if name_id is not None:
+                if name_id not in fresh:
+                    index.locations[name_id] = list(index.locations[name_id])
+                    fresh.add(name_id)
+                index.locations[name_id].append(location)
+                index._path_ids.setdefault(location[0], set()).add(name_id)
+            else:
+                overlay.setdefault(name, []).append(location)
+
+        if len(overlay) > self.OVERLAY_LIMIT:
+            return None
+        index.overlay = TrigramIndex(
+            (name, location) for name, locs in overlay.items() for location in locs
+        ) if overlay else None
+        return index
+
+    def search(self, query, limit=50):
+        """Best matching (name, locations) for query, best first"""
+        matches = [(rank, self.names[name_id], self.locations[name_id])
+                   for rank, name_id in self._ranked(query, limit)]
+        if self.overlay is not None:
+            overlay = self.overlay
+            matches += [(rank, overlay.names[name_id], overlay.locations[name_id])
+                        for rank, name_id in overlay._ranked(query, limit)]
+            matches.sort(key=lambda m: (m[0], len(m[1]), m[1].lower()))
+        return [(name, locations) for _, name, locations in matches[:limit]]
+
+    def _ranked(self, query, limit):
+        """(rank, name id) of the best matches, best first.
+
+        rank is 0 for exact/prefix, 1 for substring and 2 or more for fuzzy
+        matches (higher is fewer shared trigrams), so results of the overlay
+        can be merged in. Names whose every location was removed are left out.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        results = []
+        seen = set()
+        locations = self.locations
+
+        def take(name_ids, rank):
+            for name_id in name_ids:
+                if name_id not in seen and locations[name_id]:
+                    seen.add(name_id)
+                    results.append((rank, name_id))
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        # Exact and prefix matches, shortest first. Both ends come from
+        # bisect so only the matching slice of the sorted names is copied.
+        start = bisect.bisect_left(self._sorted_keys, query)
+        end = bisect.bisect_left(self._sorted_keys, query + '\U0010ffff', start)
+        prefix_ids = [name_id for _, name_id in self._sorted[start:min(end, start + limit * 4)]]
+        if take(sorted(prefix_ids), 0):
+            return results
+
+        if len(query) < 3:
+            return results  # Too short for trigrams; prefixes are all we offer
+
+        grams = sorted(trigrams(query), key=lambda g: len(self._postings.get(g, ())))
+        postings = [self._postings.get(g) for g in grams]
+
+        # Substring matches: every query trigram must be present, so the
+        # rarest list holds all of them. A plain substring test per id is
+        # cheaper than intersecting it with the other lists.
+        if all(postings):
+            lowered = self.lowered
+            if take([name_id for name_id in postings[0] if query in lowered[name_id]], 1):
+                return results
+
+        # Fuzzy matches: names sharing most of the query's trigrams. The
+        # rarest lists are counted first. A list too long for the remaining
+        # budget is only counted up to it; ids are shortest name first, so
+        # that keeps the likeliest matches (a typo in a common word like
+        # "rendr" still finds "render"). Lists after the budget is spent
+        # are skipped and not counted towards the threshold.
+        counts = Counter()
+        counted = 0
+        budget = self.FUZZY_BUDGET
+        for p in postings:
+            if not p:
+                continue
+            if budget <= 0:
+                break
+            counts.update(p if len(p) <= budget else p[:budget])
+            budget -= len(p)
+            counted += 1
+
+        # Most shared trigrams first; within a count shorter names win.
+        # Counts only go up to counted, so a pass per count is cheap and
+        # usually the first one or two fill the results.
+        needed = max(1, (counted + 1) // 2)
+        for count in range(counted, needed - 1, -1):
+            name_ids = [name_id for name_id, c in counts.items() if c == count]
+            if take(heapq.nsmallest(limit - len(results), name_ids), 2 + counted - count):
+                break
+
+        return results